@@ -1,7 +1,11 @@
 import os
 import math
 import ezdxf
-from ezdxf.math import Matrix44
+
+from lmxBlocks import block_name, profile_block, row_key, unique_rows
+from lmxLayout import text_box, union_boxes
+from lmxPatch import row_handles, save_row_map
+from lmxProfile import Profile
 
 def draw_single(a, b, c, d, h, n):
     """
@@ -80,7 +84,82 @@ def draw_single(a, b, c, d, h, n):
     return points
 
 
-def draw_multiple_in_one_file(data, output_file="all_shapes.dxf", x_offset=5000, y_offset=0, text_height=100):
+def _profiles(uniques):
+    # 每组参数一个 Profile，参数无效时为 None
+    profiles = []
+    for row in uniques:
+        points = draw_single(*row)
+        profiles.append(Profile.from_points(points, row, variant=None) if points else None)
+    return profiles
+
+
+def _row_offsets(profiles, inverse, x_offset=5000, y_offset=0, text_height=100, sheet=None, numbers=None):
+    # 每行的平移量，参数无效的行为 None; numbers 为每行的编号，默认从 1 起
+    offsets = [None] * len(inverse)
+    valid = [i for i, pos in enumerate(inverse) if profiles[pos] is not None]
+    if sheet is not None:
+        numbers = range(1, len(inverse) + 1) if numbers is None else numbers
+        # 每行的外框 = 图形外框 + 下方的编号文字
+        boxes = union_boxes([profiles[inverse[i]].bbox() for i in valid],
+                            [text_box(0, -text_height * 2, f"{numbers[i]}号", text_height) for i in valid])
+        for i, offset in zip(valid, sheet.place(boxes).tolist()):
+            offsets[i] = offset
+    else:
+        for k, i in enumerate(valid):
+            offsets[i] = (k * x_offset, k * y_offset)
+    return offsets
+
+
+def layout_rows(data, x_offset=5000, y_offset=0, text_height=100, sheet=None, numbers=None):
+    """每行图形在 draw_multiple_in_one_file 中的平移量 [(dx, dy) 或 None, ...]，不生成文件(见 lmxShard)"""
+    uniques, inverse = unique_rows(data)
+    return _row_offsets(_profiles(uniques), inverse, x_offset, y_offset, text_height, sheet, numbers)
+
+
+def _row_block(doc, profile, row):
+    # 块名; 这组参数的块还不存在时先定义
+    name = block_name(row, "Gemini2.5")
+    if name not in doc.blocks:
+        profile_block(doc, profile, "Gemini2.5")
+    return name
+
+
+def _add_row(msp, profile, offset, label, text_height, block=None):
+    # 一行的图形(或块引用)和编号
+    current_x, current_y = offset
+
+    if block is not None:
+        # 块引用放到当前偏移位置
+        msp.add_blockref(block, (current_x, current_y))
+    else:
+        # 平移图形的点并添加到模型空间
+        profile.translated(current_x, current_y).add_to(msp)
+
+    # 在图形旁边添加编号
+    # **这里是修正的部分**
+    text_position = (current_x, current_y - text_height * 2) # 将文本放在图形下方
+    msp.add_text(
+        label,
+        dxfattribs={
+            'style': 'Standard',
+            'height': text_height,
+            'insert': text_position  # 使用 'insert' 属性直接指定位置
+        }
+    )
+
+
+def redraw_row(doc, msp, row, offset, number, use_blocks=True, text_height=100):
+    """lmxPatch 用: 按 draw_multiple_in_one_file 的方式把一行画到 offset 处，编号为 number"""
+    row = row_key(row)
+    profile = _profiles([row])[0]
+    if profile is None:
+        raise ValueError(f"第 {number} 行参数无效")
+    block = _row_block(doc, profile, row) if use_blocks else None
+    _add_row(msp, profile, offset, f"{number}号", text_height, block)
+
+
+def draw_multiple_in_one_file(data, output_file="all_shapes.dxf", x_offset=5000, y_offset=0, text_height=100,
+                              use_blocks=True, sheet=None, offsets=None, start=0, row_map=False, numbers=None):
     """
     将多个图形绘制到单个DXF文件中，并在每个图形旁边添加编号。
 
@@ -90,50 +169,51 @@ def draw_multiple_in_one_file(data, output_file="all_shapes.dxf", x_offset=5000,
         x_offset (float): 每个图形在x轴上的间距
         y_offset (float): 每个图形在y轴上的间距
         text_height (float): 编号文本的高度
+        use_blocks (bool): 相同参数的图形只定义一次块(BLOCK)，每行用块引用(INSERT)放置
+        sheet (lmxLayout.Sheet): 给定时按图形实际大小排进固定大小的图纸，不再用 x_offset/y_offset
+        offsets (list): 已经排好的每行平移量(见 layout_rows)，给定时不再排版
+        start (int): 编号从 start + 1 开始
+        row_map (bool): 另写 <文件名>.rows.json，记录每行的实体句柄，之后可以用 lmxPatch 只更新改动的行
+        numbers (list): 每行的编号，给定时代替 start(lmxShard 跳过坏行后其余行保留原来的行号)
     """
     doc = ezdxf.new()
     msp = doc.modelspace()
 
-    # 初始偏移量
-    current_x = 0
-    current_y = 0
+    # 相同参数只计算一次
+    uniques, inverse = unique_rows(data)
+    profiles = _profiles(uniques)
+    if numbers is None:
+        numbers = range(start + 1, start + len(inverse) + 1)
+    names = []
+    for row, profile in zip(uniques, profiles):
+        if profile is not None and use_blocks:
+            names.append(_row_block(doc, profile, row))
+        else:
+            names.append(None)
 
-    for i, params in enumerate(data):
-        # 解包参数
-        a, b, c, d, h, n = params
+    if offsets is None:
+        offsets = _row_offsets(profiles, inverse, x_offset, y_offset, text_height, sheet, numbers)
 
-        # 绘制单个图形
-        points = draw_single(a, b, c, d, h, n)
+    first = len(msp)
+    counts = []
+    for i, params in enumerate(data):
+        profile = profiles[inverse[i]]
 
-        if not points:
-            print(f"跳过第 {i + 1} 个图形，因为参数无效。")
+        if profile is None:
+            print(f"跳过第 {numbers[i]} 个图形，因为参数无效。")
+            counts.append(0)
             continue
 
-        # 为当前图形创建平移矩阵
-        transform = Matrix44.translate(current_x, current_y, 0)
-
-        # 平移图形的点并添加到模型空间
-        transformed_points = list(transform.transform_vertices(points))
-        msp.add_lwpolyline(transformed_points, close=True)
-
-        # 在图形旁边添加编号
-        # **这里是修正的部分**
-        text_position = (current_x, current_y - text_height * 2) # 将文本放在图形下方
-        msp.add_text(
-            f"{i + 1}号",
-            dxfattribs={
-                'style': 'Standard',
-                'height': text_height,
-                'insert': text_position  # 使用 'insert' 属性直接指定位置
-            }
-        )
-
-        # 更新下一个图形的偏移量
-        current_x += x_offset
-        current_y += y_offset
+        before = len(msp)
+        _add_row(msp, profile, offsets[i], f"{numbers[i]}号", text_height, names[inverse[i]])
+        counts.append(len(msp) - before)
 
     # 保存到单个DXF文件
     doc.saveas(output_file)
+    if row_map:
+        save_row_map(output_file, "Gemini2.5", {"use_blocks": use_blocks, "text_height": text_height},
+                     [uniques[pos] for pos in inverse], numbers, offsets,
+                     row_handles(msp, first, counts))
     print(f"所有图形已成功保存到 {output_file}")
 
 
@@ -172,4 +252,5 @@ data = [
 ]
 
 # 调用优化后的函数
-draw_multiple_in_one_file(data, output_file="lmx_combined.dxf")
\ No newline at end of file
+if __name__ == '__main__':
+    draw_multiple_in_one_file(data, output_file="lmx_combined.dxf")
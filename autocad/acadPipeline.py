@@ -0,0 +1,402 @@
+"""Draws the stairs in AutoCAD with a producer thread and grouped, retried COM calls.
+
+    python autocad/acadPipeline.py                          # 连接 AutoCAD 绘制内置数据
+    python autocad/acadPipeline.py rows.json --record --latency 0.002 --compare
+
+A producer thread computes the profiles, dimension and label points
+(stairs_plan) chunk by chunk and converts them to APoint ahead of time,
+while the calling thread issues the COM calls of the previous chunk:
+first all entities of one kind, then each property for all of them. The
+model space is looked up once instead of once per entity. Calls that
+AutoCAD rejects because it is busy (RPC_E_CALL_REJECTED) are retried with
+a growing pause. Recorder stands in for Autocad with the same calls, so
+the pipeline runs and can be timed without Windows (--record).
+"""
+import argparse
+import json
+import queue
+import random
+import threading
+import time
+from collections import Counter
+
+from stairs import DATA, stairs_plan
+
+try:
+    from pyautocad import Autocad, APoint
+except ImportError:  # 没有 pyautocad 时只能用 Recorder
+    Autocad = APoint = None
+
+RPC_E_CALL_REJECTED = -2147418111        # 0x80010001 AutoCAD 正忙(命令进行中、对话框打开)
+RPC_E_SERVERCALL_RETRYLATER = -2147417846  # 0x8001010A
+RETRY_CODES = (RPC_E_CALL_REJECTED, RPC_E_SERVERCALL_RETRYLATER)
+KINDS = ("polyline", "dim_aligned", "dim_rotated", "text")
+
+
+def _point(p):
+    if APoint is not None:
+        return APoint(*p)
+    return (float(p[0]), float(p[1]), 0.0)
+
+
+def draw_op(acad, op, point=None):
+    """Issues the COM calls for one stairs_plan operation."""
+    point = point or _point
+    kind = op[0]
+    if kind == "polyline":
+        # 坐标缓冲区本身就是 array('d')，直接交给 COM
+        poly = acad.model.AddLightWeightPolyline(op[1])
+        poly.Closed = True
+    elif kind == "dim_aligned":
+        _, p1, p2, location, text_position, color = op
+        dim = acad.model.AddDimAligned(point(p1), point(p2), point(location))
+        if text_position is not None:
+            dim.TextPosition = point(text_position)
+        dim.Color = color
+    elif kind == "dim_rotated":
+        # 使用 AddDimRotated 替代 AddDimLinear
+        _, p1, p2, location, angle, color = op
+        dim = acad.model.AddDimRotated(point(p1), point(p2), point(location), angle)
+        dim.Color = color
+    elif kind == "text":
+        _, text, insert, height, color = op
+        text_obj = acad.model.AddText(text, point(insert), height)
+        text_obj.Color = color
+    else:
+        raise ValueError(f"未知的绘图操作: {kind}")
+
+
+def _hresult(e):
+    # comtypes.COMError 有 hresult 属性，pywintypes.com_error 的 args[0] 是 hresult
+    code = getattr(e, "hresult", None)
+    if code is None and e.args and isinstance(e.args[0], int):
+        code = e.args[0]
+    return code
+
+
+class _Caller:
+    """Runs COM calls, retrying the ones AutoCAD rejects while busy."""
+
+    def __init__(self, retries=8, delay=0.05):
+        self.retries = retries
+        self.delay = delay
+        self.calls = 0
+        self.retried = 0
+
+    def __call__(self, function, *args):
+        pause = self.delay
+        for attempt in range(self.retries + 1):
+            self.calls += 1
+            try:
+                return function(*args)
+            except Exception as e:
+                if _hresult(e) not in RETRY_CODES or attempt == self.retries:
+                    raise
+            self.retried += 1
+            time.sleep(pause)
+            pause = min(pause * 2, 1.0)
+
+    def set(self, obj, name, value):
+        self(setattr, obj, name, value)
+
+
+def prepare(plan, point=None):
+    """Groups the ops of stairs_plan entries by kind, with all points already converted.
+
+    Returns {kind: [op arguments, ...]} for the kinds in KINDS.
+    """
+    point = point or _point
+    groups = {kind: [] for kind in KINDS}
+    for _, ops in plan:
+        for op in ops:
+            kind = op[0]
+            if kind == "polyline":
+                groups[kind].append((op[1],))
+            elif kind == "dim_aligned":
+                _, p1, p2, location, text_position, color = op
+                groups[kind].append((point(p1), point(p2), point(location),
+                                     None if text_position is None else point(text_position), color))
+            elif kind == "dim_rotated":
+                _, p1, p2, location, angle, color = op
+                groups[kind].append((point(p1), point(p2), point(location), angle, color))
+            elif kind == "text":
+                _, text, insert, height, color = op
+                groups[kind].append((text, point(insert), height, color))
+            else:
+                raise ValueError(f"未知的绘图操作: {kind}")
+    return groups
+
+
+def plan_chunks(data, chunk=50, base_x=0.0, base_y=0.0, gap=1000.0, sheet=None, avoid_overlaps=False):
+    """Yields (start, plan) with stairs_plan entries for chunk rows at a time.
+
+    Stacked shapes are planned chunk by chunk, each starting below the
+    previous one; with a sheet or avoid_overlaps the layout needs all rows,
+    so the whole plan is computed first and then handed out in chunks.
+    """
+    if chunk < 1:
+        raise ValueError("chunk 必须至少为 1")
+    rows = [list(row) for row in data]
+    if sheet is not None or avoid_overlaps:
+        plan = stairs_plan(rows, base_x, base_y, gap, sheet, avoid_overlaps)
+        for start in range(0, len(plan), chunk):
+            yield start, plan[start:start + chunk]
+        return
+    for start in range(0, len(rows), chunk):
+        part = rows[start:start + chunk]
+        yield start, stairs_plan(part, base_x, base_y, gap, start=start)
+        # 和 stairs_plan 一样逐行往下移，坐标与一次算完完全相同
+        for row in part:
+            base_y -= (row[4] + gap)
+
+
+def _issue(model, groups, call):
+    # 先建同一种实体，再逐个属性统一设置
+    polylines = [call(model.AddLightWeightPolyline, coords) for coords, in groups["polyline"]]
+    aligned = [call(model.AddDimAligned, p1, p2, location) for p1, p2, location, _, _ in groups["dim_aligned"]]
+    rotated = [call(model.AddDimRotated, p1, p2, location, angle)
+               for p1, p2, location, angle, _ in groups["dim_rotated"]]
+    texts = [call(model.AddText, text, insert, height) for text, insert, height, _ in groups["text"]]
+    for poly in polylines:
+        call.set(poly, "Closed", True)
+    for dim, (_, _, _, text_position, _) in zip(aligned, groups["dim_aligned"]):
+        if text_position is not None:
+            call.set(dim, "TextPosition", text_position)
+    for objects, kind in ((aligned, "dim_aligned"), (rotated, "dim_rotated"), (texts, "text")):
+        for obj, args in zip(objects, groups[kind]):
+            call.set(obj, "Color", args[-1])
+    return len(polylines) + len(aligned) + len(rotated) + len(texts)
+
+
+def draw_pipelined(acad, data=DATA, chunk=50, depth=2, retries=8, delay=0.05, point=None, progress=None,
+                   **plan_kwargs):
+    """Draws data into acad (an Autocad or Recorder) with planning and COM calls overlapped.
+
+    A producer thread prepares chunks of chunk rows (plan_chunks, prepare)
+    and keeps at most depth of them queued; the COM calls are all issued
+    on the calling thread, which owns the COM connection. Rejected calls
+    are retried up to retries times, pausing delay seconds and doubling.
+    progress(first, last), if given, is called after each chunk with
+    1-based row numbers. Other keyword arguments go to plan_chunks.
+
+    Returns stats: rows, entities, calls, retries, seconds, and the time
+    spent planning (produce_seconds) and waiting for the planner
+    (wait_seconds).
+    """
+    point = point or _point
+    chunks = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    produced = {"seconds": 0.0}
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            planned = plan_chunks(data, chunk, **plan_kwargs)
+            while True:
+                t0 = time.perf_counter()
+                start, plan = next(planned, (None, None))
+                if plan is None:
+                    break
+                groups = prepare(plan, point)
+                produced["seconds"] += time.perf_counter() - t0
+                if not put((start, len(plan), groups)):
+                    return
+            put(None)
+        except Exception as e:  # 交给绘图线程抛出
+            put(e)
+
+    call = _Caller(retries, delay)
+    stats = {"rows": 0, "entities": 0, "wait_seconds": 0.0}
+    t0 = time.perf_counter()
+    producer = threading.Thread(target=produce, name="stairs-plan", daemon=True)
+    producer.start()
+    try:
+        # pyautocad 的 acad.model 每次都是两次 COM 调用，只取一次
+        model = call(lambda: acad.model)
+        while True:
+            t1 = time.perf_counter()
+            item = chunks.get()
+            stats["wait_seconds"] += time.perf_counter() - t1
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            start, count, groups = item
+            stats["entities"] += _issue(model, groups, call)
+            stats["rows"] += count
+            if progress is not None:
+                progress(start + 1, start + count)
+    finally:
+        stop.set()
+        producer.join()
+    stats.update(calls=call.calls, retries=call.retried, seconds=time.perf_counter() - t0,
+                 produce_seconds=produced["seconds"])
+    return stats
+
+
+class RecordedEntity:
+    """An entity created through a Recorder; property sets are recorded as COM calls."""
+
+    def __init__(self, recorder, method, args):
+        self.__dict__.update(_recorder=recorder, method=method, args=args, properties={})
+
+    def __setattr__(self, name, value):
+        self._recorder._call("put_" + name)
+        self.properties[name] = value
+
+
+class _RecordedDocument:
+    Name = "Recorder.dwg"
+
+    def __init__(self, recorder):
+        self._recorder = recorder
+
+    @property
+    def ModelSpace(self):
+        self._recorder._call("ModelSpace")
+        return self._recorder._model
+
+
+class _RecordedModel:
+    def __init__(self, recorder):
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        if not name.startswith("Add"):
+            raise AttributeError(name)
+
+        def add(*args):
+            self._recorder._call(name)
+            entity = RecordedEntity(self._recorder, name, args)
+            self._recorder.entities.append(entity)
+            return entity
+        return add
+
+
+class RejectedCall(Exception):
+    """What comtypes raises when AutoCAD is busy: COMError with hresult RPC_E_CALL_REJECTED."""
+
+    def __init__(self):
+        super().__init__(RPC_E_CALL_REJECTED, "Call was rejected by callee.", None)
+        self.hresult = RPC_E_CALL_REJECTED
+
+
+class Recorder:
+    """Stands in for pyautocad.Autocad: counts COM calls instead of making them.
+
+    acad.doc and acad.model cost one and two calls like in pyautocad, Add*
+    methods return RecordedEntity objects (kept in entities). Every call
+    sleeps latency seconds and, with probability reject, raises RejectedCall
+    before doing anything, so retries can be exercised (seeded, repeatable).
+    """
+
+    def __init__(self, latency=0.0, reject=0.0, seed=0):
+        self.latency = latency
+        self.reject = reject
+        self.entities = []
+        self.counts = Counter()
+        self.rejected = 0
+        self.busy_seconds = 0.0
+        self._random = random.Random(seed)
+        self._doc = _RecordedDocument(self)
+        self._model = _RecordedModel(self)
+        self._lock = threading.Lock()
+
+    def _call(self, name):
+        with self._lock:
+            self.counts[name] += 1
+            rejected = self.reject and self._random.random() < self.reject
+            if rejected:
+                self.rejected += 1
+        if self.latency:
+            t0 = time.perf_counter()
+            time.sleep(self.latency)
+            self.busy_seconds += time.perf_counter() - t0
+        if rejected:
+            raise RejectedCall()
+
+    @property
+    def doc(self):
+        self._call("ActiveDocument")
+        return self._doc
+
+    @property
+    def model(self):
+        return self.doc.ModelSpace
+
+    def drawing(self):
+        """The recorded entities as comparable tuples (method, args, properties), sorted."""
+        def plain(value):
+            if isinstance(value, (tuple, list)) or hasattr(value, "tolist"):
+                return tuple(round(float(v), 6) for v in value)
+            return value
+        return sorted((entity.method, tuple(plain(arg) for arg in entity.args),
+                       tuple(sorted((name, plain(value)) for name, value in entity.properties.items())))
+                      for entity in self.entities)
+
+    def summary(self):
+        return {"calls": sum(self.counts.values()), "rejected": self.rejected,
+                "busy_seconds": round(self.busy_seconds, 3), "by_method": dict(self.counts)}
+
+
+def draw_sequential(acad, data=DATA, point=None, **plan_kwargs):
+    """The plain loop: plan everything, then one draw_op per operation. Returns the seconds taken."""
+    t0 = time.perf_counter()
+    for _, ops in stairs_plan([list(row) for row in data], **plan_kwargs):
+        for op in ops:
+            draw_op(acad, op, point)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="流水线方式用 pyautocad 绘制楼梯图形")
+    parser.add_argument("input", nargs="?", help="[a, b, c, d, h, n] 行的 JSON 文件，默认内置数据")
+    parser.add_argument("--chunk", type=int, default=50, help="每批计算和绘制的行数")
+    parser.add_argument("--record", action="store_true", help="不连接 AutoCAD，用 Recorder 记录调用")
+    parser.add_argument("--latency", type=float, default=0.0, help="Recorder 每次调用的模拟耗时，秒")
+    parser.add_argument("--reject", type=float, default=0.0, help="Recorder 模拟 AutoCAD 正忙拒绝调用的比例")
+    parser.add_argument("--compare", action="store_true", help="同时用 Recorder 跑逐个调用的旧流程做对比")
+    args = parser.parse_args()
+    if args.compare and not args.record:
+        parser.error("--compare 需要 --record")
+    data = DATA
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            data = json.load(f)
+
+    if args.record:
+        acad = Recorder(args.latency, args.reject)
+    elif Autocad is None:
+        raise SystemExit("需要安装 pyautocad(仅 Windows)，或加 --record 使用 Recorder")
+    else:
+        acad = Autocad(create_if_not_exists=True)
+        print(f"已连接到 AutoCAD: {acad.doc.Name}")
+    try:
+        stats = draw_pipelined(acad, data, args.chunk,
+                               progress=lambda first, last: print(f"已绘制第 {first}-{last} 个图形"))
+    except ValueError as e:
+        raise SystemExit(f"无法绘制: {e}")
+    print(f"{stats['rows']} 个图形，{stats['entities']} 个实体，{stats['calls']} 次调用"
+          f"(重试 {stats['retries']} 次)，{stats['seconds']:.3f} s，"
+          f"其中计算 {stats['produce_seconds']:.3f} s、等待计算 {stats['wait_seconds']:.3f} s")
+    if args.record:
+        print("Recorder:", acad.summary())
+    if args.compare:
+        # 旧流程不重试，对比时不模拟拒绝
+        sequential = Recorder(args.latency)
+        seconds = draw_sequential(sequential, data)
+        same = sequential.drawing() == acad.drawing()
+        print(f"逐个调用: {sum(sequential.counts.values())} 次调用，{seconds:.3f} s，"
+              f"实体{'一致' if same else '不一致'}")
+
+
+if __name__ == "__main__":
+    main()
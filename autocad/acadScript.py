@@ -0,0 +1,120 @@
+"""Writes the stairs drawing as one AutoLISP file instead of per-entity COM calls.
+
+    python autocad/acadScript.py                    # 内置数据 -> stairs.lsp
+    python autocad/acadScript.py rows.json -o out.lsp
+
+rows.json is a list of [a, b, c, d, h, n] rows. In AutoCAD load the result
+with APPLOAD or (load "D:/path/stairs.lsp"); the whole drawing is built in a
+single load. No pyautocad or Windows needed to generate it.
+"""
+import argparse
+import json
+
+from stairs import DATA, stairs_plan
+
+# 辅助函数只定义一次，后面每个实体一行调用
+PRELUDE = """\
+(vl-load-com)
+(setq lmx-doc (vla-get-ActiveDocument (vlax-get-acad-object)))
+(setq lmx-ms (vla-get-ModelSpace lmx-doc))
+(defun lmx-pt (p) (vlax-3d-point (car p) (cadr p) 0.0))
+(defun lmx-pline (coords / arr obj)
+  (setq arr (vlax-make-safearray vlax-vbDouble (cons 0 (1- (length coords)))))
+  (vlax-safearray-fill arr coords)
+  (setq obj (vla-AddLightWeightPolyline lmx-ms arr))
+  (vla-put-Closed obj :vlax-true)
+  obj)
+(defun lmx-dim-aligned (p1 p2 loc tp color / obj)
+  (setq obj (vla-AddDimAligned lmx-ms (lmx-pt p1) (lmx-pt p2) (lmx-pt loc)))
+  (if tp (vla-put-TextPosition obj (lmx-pt tp)))
+  (vla-put-Color obj color)
+  obj)
+(defun lmx-dim-rotated (p1 p2 loc angle color / obj)
+  (setq obj (vla-AddDimRotated lmx-ms (lmx-pt p1) (lmx-pt p2) (lmx-pt loc) angle))
+  (vla-put-Color obj color)
+  obj)
+(defun lmx-text (str ins height color / obj)
+  (setq obj (vla-AddText lmx-ms str (lmx-pt ins) height))
+  (vla-put-Color obj color)
+  obj)
+(vla-StartUndoMark lmx-doc)
+"""
+
+EPILOGUE = """\
+(vla-EndUndoMark lmx-doc)
+(vla-ZoomExtents (vlax-get-acad-object))
+(princ)
+"""
+
+
+def _num(value):
+    # 固定小数位，输出稳定，方便做金标准对比
+    return f"{float(value):.8f}"
+
+
+def _pt(point):
+    return f"'({_num(point[0])} {_num(point[1])})"
+
+
+def _str(text):
+    # 文件保持 ASCII，中文写成 AutoCAD 的 \U+XXXX 转义
+    out = []
+    for ch in text:
+        if ch in '"\\':
+            out.append("\\" + ch)
+        elif ord(ch) < 128:
+            out.append(ch)
+        else:
+            out.append(f"\\\\U+{ord(ch):04X}")
+    return '"' + "".join(out) + '"'
+
+
+def op_lisp(op):
+    """One stairs_plan operation as a single line of AutoLISP."""
+    kind = op[0]
+    if kind == "polyline":
+        return f"(lmx-pline '({' '.join(_num(v) for v in op[1])}))"
+    if kind == "dim_aligned":
+        _, p1, p2, location, text_position, color = op
+        tp = "nil" if text_position is None else _pt(text_position)
+        return f"(lmx-dim-aligned {_pt(p1)} {_pt(p2)} {_pt(location)} {tp} {color})"
+    if kind == "dim_rotated":
+        _, p1, p2, location, angle, color = op
+        return f"(lmx-dim-rotated {_pt(p1)} {_pt(p2)} {_pt(location)} {_num(angle)} {color})"
+    if kind == "text":
+        _, text, insert, height, color = op
+        return f"(lmx-text {_str(text)} {_pt(insert)} {_num(height)} {color})"
+    raise ValueError(f"未知的绘图操作: {kind}")
+
+
+def iter_lisp(data=DATA):
+    """Yields the LISP file piece by piece so large inputs are never held in memory twice."""
+    yield PRELUDE
+    for i, (params, ops) in enumerate(stairs_plan(data)):
+        yield f";; {i + 1}: a={params[0]} b={params[1]} c={params[2]} d={params[3]} h={params[4]} n={params[5]}\n"
+        for op in ops:
+            yield op_lisp(op) + "\n"
+    yield EPILOGUE
+
+
+def export_lisp(filename, data=DATA):
+    """Writes the drawing create_stairs_drawing would make to filename."""
+    with open(filename, "w", encoding="ascii", newline="\n") as f:
+        f.writelines(iter_lisp(data))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", nargs="?", help="JSON 文件，内容为 [a, b, c, d, h, n] 行列表")
+    parser.add_argument("-o", "--output", default="stairs.lsp")
+    args = parser.parse_args()
+    data = DATA
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            data = json.load(f)
+    export_lisp(args.output, data)
+    print(f"已写出 {args.output} ({len(data)} 个图形)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lmxLayout import text_box, union_boxes
+from lmxPlacement import Placer, rotated_text_box
+from lmxProfile import profiles_from_batch
+
+# 数据源 [a(步高), b(步宽), c(右边多余), d(左边多余), h(总高度), n(顶点个数)]
+DATA = [
+    [151.2, 250, 60, 70, 290, 14],
+    [151.2, 253.3, 70, 60, 280, 10],
+    [156, 253.3, 70, 60, 260, 10],
+    [155, 253.3, 30, 60, 260, 10]
+]
+
+RED = 1
+WHITE = 7
+DIM_TEXT = 40  # 估算标注文字高度，只用于避让
+
+
+def annotated_box(profile, label):
+    """Box (min_x, min_y, max_x, max_y) of one untranslated shape with its dimensions and label."""
+    min_x, min_y, max_x, _ = profile.bbox()
+    h = profile.params[4]
+    # 顶部标注在 F 上方 100，b 的标注在底边下方 150，总高标注在 E 右侧 100，各留出文字的位置
+    box = (min(min_x, profile.point(profile.idx_F)[0]) - 60, min_y - 250,
+           profile.point(profile.idx_E)[0] + 200, h + 200)
+    return union_boxes([box], [text_box(-400, h / 2, label, 80)])[0]
+
+
+def _dim_text_box(p1, p2, location):
+    # 标注文字大致在尺寸线中点，内容为测量长度
+    text = f"{math.hypot(p2[0] - p1[0], p2[1] - p1[1]):.1f}"
+    return rotated_text_box((p1[0] + p2[0]) / 2, location[1], text, DIM_TEXT)
+
+
+def stairs_plan(data=DATA, base_x=0.0, base_y=0.0, gap=1000.0, sheet=None, avoid_overlaps=False, start=0):
+    """Computes everything create_stairs_drawing draws, without touching AutoCAD.
+
+    Shapes are stacked downwards from (base_x, base_y), gap apart; with an
+    lmxLayout.Sheet they are packed into sheets instead. With avoid_overlaps
+    the label and the top and bottom dimension lines move further out when
+    their default spot would cross another shape or text (see lmxPlacement).
+    Labels are numbered from start + 1, so data can be one chunk of a job.
+
+    Returns one (params, ops) pair per shape. ops are plain tuples in drawing order:
+        ("polyline", coords)                                  closed, coords is array('d') x0, y0, ...
+        ("dim_aligned", p1, p2, location, text_position, color)   text_position None = AutoCAD default
+        ("dim_rotated", p1, p2, location, angle, color)
+        ("text", text, insert, height, color)
+    Points are (x, y) tuples.
+    """
+    plan = []
+    profiles = profiles_from_batch(data, "multiLmx")
+    if sheet is not None:
+        offsets = sheet.place([annotated_box(profile, f"{start + i + 1}号") for i, profile in enumerate(profiles)])
+        offsets = (offsets + (base_x, base_y)).tolist()
+    else:
+        offsets = []
+        for row in data:
+            offsets.append((base_x, base_y))
+            # 下一个图形的Y轴基准 (向下移动)
+            base_y -= (row[4] + gap)
+    placer = None
+    if avoid_overlaps:
+        # 先登记所有图形的轮廓，再放标注和编号
+        placer = Placer()
+        for (dx, dy), profile in zip(offsets, profiles):
+            placer.add_profile(profile, dx, dy)
+    for i, ((a, b, c, d, h, n), profile) in enumerate(zip(data, profiles)):
+        ops = []
+        base_x, base_y = offsets[i]
+
+        # --- 生成顶点 ---
+        # 顶点由 Profile 一次算好，原地平移到当前基准点
+        profile.translate(base_x, base_y)
+
+        # 1. 左侧小边 (d)
+        if profile.idx_A is not None:
+            pt_A = profile.point(profile.idx_A)  # A: 左上
+            pt_B = profile.point(profile.idx_B)  # B: 左下
+        else:
+            # 如果d=0，起点B就是(0,0)偏移位置
+            pt_B = (base_x, base_y)
+            # A点不存在，但为了后续逻辑，可以将A视为B
+            pt_A = pt_B
+
+        # 2. 锯齿部分
+        # 记录最后几个点用于标注
+        last_C = profile.point(profile.idx_LastPeak)  # 最后一个齿尖
+        last_C1 = None         # 最后一个齿谷 (倒数第二个点)
+        second_last_C = None   # 倒数第二个齿尖
+        if profile.idx_LastValley is not None:
+            last_C1 = profile.point(profile.idx_LastValley)
+            second_last_C = profile.point(profile.idx_LastValley - 1)
+
+        # 3. 右侧小边 (c) 与顶部闭合
+        pt_D = profile.point(profile.idx_D)  # D: 右下
+        pt_E = profile.point(profile.idx_E)  # E: 右上
+        pt_F = profile.point(profile.idx_F)  # F: 左上
+
+        # --- 绘制多段线 ---
+        ops.append(("polyline", profile.coords))
+
+        # --- 添加标注 ---
+
+        # 1. 顶部总长 (红色)
+        top = ((pt_F[0]+pt_E[0])/2, pt_F[1] + 100)
+        if placer is not None:
+            candidates = [(top[0], top[1] + k * 100) for k in range(3)]
+            top = candidates[placer.place([_dim_text_box(pt_F, pt_E, p) for p in candidates])]
+        ops.append(("dim_aligned", pt_F, pt_E, top, None, RED))
+
+        # 2. 右侧总高度 (垂直线性标注)
+        # 参数: (点1, 点2, 标注线位置, 旋转角度)
+        # 角度: math.pi/2 表示垂直标注
+        dim_h_pos = (pt_E[0] + 100, base_y + h/2)
+        pt_E_bottom = (pt_E[0], base_y)  # E在底部的投影点
+        ops.append(("dim_rotated", pt_E_bottom, pt_E, dim_h_pos, math.pi/2, RED))
+
+        # 3. 左侧小边 d (如果存在)
+        if d != 0:
+            ops.append(("dim_aligned", pt_A, pt_B, (pt_A[0] - 40, pt_A[1] - 20), None, RED))
+
+        # 4. 右侧小边 c
+        # 对应最后一段 C -> D
+        ops.append(("dim_aligned", last_C, pt_D, (pt_D[0] + 40, pt_D[1] - 20), None, RED))
+
+        # 5. 锯齿细节 (a 和 b)
+        # 我们标注倒数第二个完整的齿，避免和c边冲突
+        # 需要点: second_last_C (上一个齿尖) -> last_C1 (齿谷) -> last_C (当前齿尖)
+        if last_C1 and second_last_C:
+            # 标注 b (下坡长边): second_last_C -> last_C1
+            # 因为是锯齿，放在内部容易重叠，文字放在斜线下方
+            bottom = ((pt_D[0]+pt_A[0])/2, base_y - 150)
+            if placer is not None:
+                candidates = [(bottom[0], bottom[1] - k * 100) for k in range(3)]
+                bottom = candidates[placer.place([_dim_text_box(second_last_C, last_C1, p) for p in candidates])]
+            ops.append(("dim_aligned", second_last_C, last_C1, bottom,
+                        ((second_last_C[0]+last_C1[0])/2 + 20, (second_last_C[1]+last_C1[1])/2 + 20), RED))
+
+            # 标注 a (上坡短边): last_C1 -> last_C
+            ops.append(("dim_aligned", last_C1, last_C,
+                        ((last_C1[0]+last_C[0])/2 - 20, (last_C1[1]+last_C[1])/2 + 20), None, RED))
+
+        # --- 添加编号文字 ---
+        label = f"{start + i + 1}号"
+        insert = (base_x - 400, base_y + h/2)
+        if placer is not None:
+            # 依次尝试: 左侧、更左、上方
+            candidates = [insert, (base_x - 800, base_y + h/2), (base_x, base_y + h + 300)]
+            insert = candidates[placer.place([text_box(x, y, label, 80) for x, y in candidates])]
+        ops.append(("text", label, insert, 80, WHITE))  # 字高80
+
+        plan.append(((a, b, c, d, h, n), ops))
+    return plan
@@ -0,0 +1,289 @@
+"""Benchmark suite for the stringer generators.
+
+Every case runs in a fresh process so peak RSS belongs to that case alone.
+Results are printed as a table and saved as JSON (bench_results/<commit>.json)
+so runs of different commits can be compared with --compare.
+
+    python benchmark.py                     # 默认规模
+    python benchmark.py --full              # n 3..10000, 行数 1..100000
+    python benchmark.py --cases multi-super --compare bench_results/abc1234.json
+    python benchmark.py --cases multi-super.draw_all --rows 1000,10000 --teeth 10   # 标注模式对比
+    python benchmark.py --cases multi-super.draw_all_in_one --rows 1000 --stages         # 每个阶段的 ms/row
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import ezdxf
+
+import lmxTiming
+from lmxBatch import VARIANTS, draw_batch
+from lmxCosting import cutting_list
+from lmxGcode import export_gcode
+from lmxPreflight import preflight
+from lmxPreview import previews
+from lmxScripts import HERE, SCRIPTS, fixture_data, load_script
+from lmxShard import draw_sharded
+from lmxStream import stream_dxf
+
+# autocad/ 下的脚本按目录内导入(from stairs import ...)，不用 pyautocad 也能加载
+sys.path.insert(0, os.path.join(HERE, "autocad"))
+from acadPipeline import Recorder, draw_pipelined
+
+DEFAULT_TEETH = (3, 10, 100)
+DEFAULT_ROWS = (1, 100, 1000)
+FULL_TEETH = (3, 10, 100, 1000, 10000)
+FULL_ROWS = (1, 10, 100, 1000, 10000, 100000)
+
+
+# --- 测试用例: 每个函数接收 (data, workdir) ---
+
+def _draw_single(script):
+    def run(data, workdir):
+        draw_single = load_script(script).draw_single
+        for row in data:
+            draw_single(*row)
+    return run
+
+
+def _draw_batch(variant):
+    def run(data, workdir):
+        draw_batch(data, variant)
+    return run
+
+
+def _lmx_draw(data, workdir):
+    draw = load_script("lmx").draw
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        for row in data:
+            draw(*row)
+    finally:
+        os.chdir(cwd)
+
+
+def _draw_multiple(script, backend, **kwargs):
+    def run(data, workdir):
+        load_script(script).draw_multiple(data, workdir, backend=backend, **kwargs)
+    return run
+
+
+def _draw_zip(backend, fmt):
+    def run(data, workdir):
+        load_script("multiLmx").draw_zip(data, os.path.join(workdir, "lmx.zip"), backend=backend, fmt=fmt)
+    return run
+
+
+def _draw_multiple_in_one_file(use_blocks):
+    def run(data, workdir):
+        load_script("Gemini2.5").draw_multiple_in_one_file(data, output_file=os.path.join(workdir, "all.dxf"),
+                                                           use_blocks=use_blocks)
+    return run
+
+
+def _draw_sharded(data, workdir):
+    draw_sharded(data, os.path.join(workdir, "result.dxf"), light_dims=True, shard_size=1000)
+
+
+def _preflight(data, workdir):
+    preflight(data)
+
+
+def _cutting_list(data, workdir):
+    cutting_list(data)
+
+
+def _export_gcode(data, workdir):
+    export_gcode(data, os.path.join(workdir, "job.nc"))
+
+
+def _previews(data, workdir):
+    previews(data)
+
+
+def _draw_pipelined(data, workdir):
+    draw_pipelined(Recorder(), data)
+
+
+def _stream_dxf(data, workdir):
+    stream_dxf(iter(data), os.path.join(workdir, "stream.dxf"))
+
+
+def _draw_all_in_one(use_blocks, light_dims=False):
+    def run(data, workdir):
+        load_script("multi-super").draw_all_in_one(data, os.path.join(workdir, "result.dxf"), use_blocks=use_blocks,
+                                                   light_dims=light_dims)
+    return run
+
+
+CASES = {
+    "lmx.draw": _lmx_draw,
+    **{f"{script}.draw_single": _draw_single(script)
+       for script in ("multiLmx", "数据录入", "deepseek-multi", "Gemini2.5", "multi-super")},
+    **{f"lmxBatch.draw_batch[{variant}]": _draw_batch(variant) for variant in VARIANTS},
+    "multiLmx.draw_multiple[ezdxf]": _draw_multiple("multiLmx", "ezdxf"),
+    "multiLmx.draw_multiple[raw]": _draw_multiple("multiLmx", "raw"),
+    "multiLmx.draw_multiple[bin]": _draw_multiple("multiLmx", "ezdxf", fmt="bin"),
+    "multiLmx.draw_zip[ezdxf]": _draw_zip("ezdxf", "asc"),
+    "multiLmx.draw_zip[raw]": _draw_zip("raw", "asc"),
+    "multiLmx.draw_zip[bin]": _draw_zip("ezdxf", "bin"),
+    "数据录入.draw_multiple[ezdxf]": _draw_multiple("数据录入", "ezdxf"),
+    "deepseek-multi.draw_multiple[ezdxf]": _draw_multiple("deepseek-multi", "ezdxf"),
+    "deepseek-multi.draw_multiple[flat]": _draw_multiple("deepseek-multi", "ezdxf", use_blocks=False),
+    "deepseek-multi.draw_multiple[raw]": _draw_multiple("deepseek-multi", "raw"),
+    "lmxStream.stream_dxf": _stream_dxf,
+    "lmxPreflight.preflight": _preflight,
+    "lmxCosting.cutting_list": _cutting_list,
+    "lmxPreview.previews": _previews,
+    "lmxGcode.export_gcode": _export_gcode,
+    "acadPipeline.draw_pipelined[recorder]": _draw_pipelined,
+    "Gemini2.5.draw_multiple_in_one_file": _draw_multiple_in_one_file(True),
+    "Gemini2.5.draw_multiple_in_one_file[flat]": _draw_multiple_in_one_file(False),
+    "multi-super.draw_all_in_one": _draw_all_in_one(True),
+    "multi-super.draw_all_in_one[flat]": _draw_all_in_one(False),
+    "multi-super.draw_all_in_one[light]": _draw_all_in_one(True, light_dims=True),
+    "multi-super.draw_all_in_one[flat,light]": _draw_all_in_one(False, light_dims=True),
+    "multi-super.draw_all_in_one[sharded]": _draw_sharded,
+}
+
+
+def make_data(rows, teeth):
+    """Cycles the script fixtures up to rows rows, all with n = teeth."""
+    fixtures = fixture_data()
+    return [fixtures[i % len(fixtures)][:5] + [teeth] for i in range(rows)]
+
+
+def _dir_bytes(path):
+    return sum(os.path.getsize(os.path.join(dirpath, f))
+               for dirpath, _, filenames in os.walk(path) for f in filenames)
+
+
+def _peak_rss_kb():
+    # resource 只有 Unix 上有，Windows 上不记录内存峰值
+    try:
+        import resource
+    except ImportError:
+        return None
+    # 分片等用例的工作进程: 取单个进程的最大值
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+
+def run_case(name, rows, teeth, stages=False):
+    """Runs one case in the current process and returns its result record.
+
+    With stages the run is timed per stage (lmxTiming) and the records are
+    added as "stages"; the wrappers make the case itself a little slower.
+    """
+    data = make_data(rows, teeth)
+    run = CASES[name]
+    with tempfile.TemporaryDirectory() as workdir:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            # 先加载脚本，计时才能替换其中的函数
+            for script in SCRIPTS:
+                load_script(script)
+            with lmxTiming.timed() if stages else contextlib.nullcontext():
+                t0 = time.perf_counter()
+                run(data, workdir)
+                seconds = time.perf_counter() - t0
+        size = _dir_bytes(workdir)
+    record = {
+        "case": name,
+        "rows": rows,
+        "teeth": teeth,
+        "seconds": seconds,
+        "ms_per_row": seconds / rows * 1000,
+        "peak_rss_kb": _peak_rss_kb(),
+        "bytes": size,
+    }
+    if stages:
+        record["stages"] = lmxTiming.timings()
+    return record
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="lmx 生成器性能测试")
+    parser.add_argument("--full", action="store_true", help="完整规模: n 3..10000, 行数 1..100000")
+    parser.add_argument("--teeth", help="逗号分隔的顶点个数 n 列表")
+    parser.add_argument("--rows", help="逗号分隔的行数列表")
+    parser.add_argument("--cases", help="只运行名称包含这些子串的用例，逗号分隔")
+    parser.add_argument("--max-vertices", type=float, default=5e6, help="跳过总顶点数超过此值的组合")
+    parser.add_argument("--output", help="结果 JSON 路径，默认 bench_results/<commit>.json")
+    parser.add_argument("--compare", help="与之前保存的结果 JSON 对比")
+    parser.add_argument("--stages", action="store_true", help="按阶段统计每个用例的耗时(见 lmxTiming)")
+    args = parser.parse_args(argv)
+
+    teeth_list = FULL_TEETH if args.full else DEFAULT_TEETH
+    rows_list = FULL_ROWS if args.full else DEFAULT_ROWS
+    if args.teeth:
+        teeth_list = [int(v) for v in args.teeth.split(",")]
+    if args.rows:
+        rows_list = [int(v) for v in args.rows.split(",")]
+    names = list(CASES)
+    if args.cases:
+        patterns = args.cases.split(",")
+        names = [name for name in names if any(p in name for p in patterns)]
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = {(r["case"], r["rows"], r["teeth"]): r for r in json.load(f)["results"]}
+
+    results = []
+    print(f"{'case':<44}{'rows':>8}{'n':>7}{'ms/row':>11}{'peak MB':>9}{'bytes':>13}"
+          + (f"{'vs base':>9}" if baseline else ""))
+    # 每个用例一个新进程，峰值内存互不影响
+    context = get_context("spawn")
+    for name in names:
+        for teeth in teeth_list:
+            for rows in rows_list:
+                if rows * (2 * teeth + 5) > args.max_vertices:
+                    continue
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    result = pool.submit(run_case, name, rows, teeth, args.stages).result()
+                results.append(result)
+                peak = "-" if result["peak_rss_kb"] is None else f"{result['peak_rss_kb'] / 1024:.1f}"
+                line = (f"{name:<44}{rows:>8}{teeth:>7}{result['ms_per_row']:>11.4f}"
+                        f"{peak:>9}{result['bytes']:>13}")
+                base = baseline.get((name, rows, teeth))
+                if base:
+                    line += f"{result['ms_per_row'] / base['ms_per_row']:>8.2f}x"
+                print(line, flush=True)
+                if args.stages:
+                    print("    " + "  ".join(f"{item['stage']} {item['self_seconds'] / rows * 1000:.4f}"
+                                              for item in result["stages"]), flush=True)
+
+    commit = _commit()
+    output = args.output or os.path.join(HERE, "bench_results", f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": commit,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "ezdxf": ezdxf.__version__,
+            "platform": platform.platform(),
+            "results": results,
+        }, f, ensure_ascii=False, indent=1)
+    print(f"结果已保存到 {output}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
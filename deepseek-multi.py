@@ -2,6 +2,14 @@ import os
 import shutil
 import math
 import ezdxf
+from ezdxf.enums import TextEntityAlignment
+
+from lmxBlocks import profile_block, unique_rows
+from lmxLayout import text_box, union_boxes
+from lmxManifest import prepare_incremental, save_manifest
+from lmxPreflight import preflight
+from lmxProfile import profiles_from_batch
+from rawDxf import save_profiles
 
 def draw_single(a, b, c, d, h, n):
     """Draws a single shape with specified parameters."""
@@ -45,53 +53,82 @@ def draw_single(a, b, c, d, h, n):
 
     return points
 
-def draw_multiple(data, output_dir="dxf"):
-    """Draws multiple shapes into a single DXF file with labels."""
-    # 创建输出目录并清空旧文件
-    os.makedirs(output_dir, exist_ok=True)
-    for filename in os.listdir(output_dir):
-        file_path = os.path.join(output_dir, filename)
-        try:
-            if os.path.isfile(file_path):
-                os.unlink(file_path)
-        except Exception as e:
-            print(f"Error deleting {file_path}: {e}")
-
-    doc = ezdxf.new()
-    msp = doc.modelspace()
+def draw_multiple(data, output_dir="dxf", backend="ezdxf", use_blocks=True, sheet=None):
+    """Draws multiple shapes into a single DXF file with labels.
+       The file is only rewritten when a row changed since the last run (see lmxManifest).
+       backend="raw" streams the file with rawDxf instead of building an ezdxf document.
+       use_blocks: with the ezdxf backend identical rows share one BLOCK and are placed with INSERTs;
+       the raw backend always writes plain polylines.
+       sheet: an lmxLayout.Sheet to pack the shapes into fixed-size sheets instead of one long row.
+       Rows that lmxPreflight rejects raise ValueError before any file is written.
+    """
+    # 有问题的行(a、b 为 0 等)在写任何文件之前就报错
+    preflight(data, "lmx", "abort")
+    use_blocks = use_blocks and backend != "raw"
+    kind = backend + "+blocks" if use_blocks else backend
+    if sheet is not None:
+        kind += "+" + repr(sheet)
+    # 对比输出目录中的清单，参数未变时不重画
+    entries, todo = prepare_incremental(output_dir, data, "lmx", kind, lambda i: "lmx.dxf")
+    if not todo:
+        save_manifest(output_dir, entries)
+        return
+
     current_x_offset = 0
     spacing = 100  # 图形间距
+    output_path = os.path.join(output_dir, "lmx.dxf")
 
-    for idx, (a, b, c, d, h, n) in enumerate(data):
-        # 生成图形坐标
-        points = draw_single(a, b, c, d, h, n)
-        if not points:
-            continue
-
+    # 相同参数只计算一次
+    uniques, inverse = unique_rows(data)
+    profiles = profiles_from_batch(uniques, "lmx")
+    bboxes = [profile.bbox() for profile in profiles]
+    if sheet is not None:
+        # 外框 = 图形外框 + 左下角下方的编号
+        boxes = union_boxes([bboxes[pos] for pos in inverse],
+                            [text_box(0, bboxes[pos][1] - 30, f"{idx+1}号", 25)
+                             for idx, pos in enumerate(inverse)])
+        offsets = sheet.place(boxes).tolist()
+    placements = []
+    labels = []
+    for idx, pos in enumerate(inverse):
         # 计算图形尺寸
-        x_coords = [p[0] for p in points]
-        y_coords = [p[1] for p in points]
-        max_x = max(x_coords)
-        min_y = min(y_coords)
+        _, min_y, max_x, _ = bboxes[pos]
+        if sheet is not None:
+            current_x_offset, current_y_offset = offsets[idx]
+        else:
+            current_y_offset = 0
 
-        # 平移坐标
-        translated = [(x + current_x_offset, y) for x, y in points]
-        msp.add_lwpolyline(translated, close=True)
+        # 记录平移量
+        placements.append((pos, current_x_offset, current_y_offset))
 
         # 添加标签（位于图形左下角下方）
-        label_pos = (current_x_offset, min_y - 30)  # 向下偏移30单位
-        msp.add_text(f"{idx+1}号", 
-                    dxfattribs={
-                        'height': 25,
-                        'style': 'Standard'
-                    }).set_pos(label_pos, align='LEFT')
+        label_pos = (current_x_offset, current_y_offset + min_y - 30)  # 向下偏移30单位
+        labels.append((f"{idx+1}号", label_pos, 25))
 
         # 更新偏移量
         current_x_offset += (max_x + spacing)
 
-    # 保存最终文件
-    output_path = os.path.join(output_dir, "lmx.dxf")
-    doc.saveas(output_path)
+    if backend == "raw":
+        save_profiles(output_path, (profiles[pos].translated(x, y) for pos, x, y in placements), labels)
+    else:
+        doc = ezdxf.new()
+        msp = doc.modelspace()
+        if use_blocks:
+            names = [profile_block(doc, profile, "lmx").name for profile in profiles]
+        for (pos, x, y), (text, label_pos, height) in zip(placements, labels):
+            if use_blocks:
+                msp.add_blockref(names[pos], (x, y))
+            else:
+                profiles[pos].translated(x, y).add_to(msp)
+            msp.add_text(text,
+                        dxfattribs={
+                            'height': height,
+                            'style': 'Standard'
+                        }).set_placement(label_pos, align=TextEntityAlignment.LEFT)
+
+        # 保存最终文件
+        doc.saveas(output_path)
+    save_manifest(output_dir, entries)
 
 # 示例数据
 data = [
@@ -101,4 +138,5 @@ data = [
     (161, 232, 0, 30, 230, 6)
 ]
 
-draw_multiple(data)
+if __name__ == '__main__':
+    draw_multiple(data)
@@ -60,4 +60,5 @@ data = [
 
 
 
-draw(a,b,c,d,h,n)
+if __name__ == '__main__':
+    draw(a,b,c,d,h,n)
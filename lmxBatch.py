@@ -0,0 +1,164 @@
+import numpy as np
+
+# 参数列顺序，与各脚本 data 中每一行一致
+# a 步高
+# b 步宽
+# c 右边多余
+# d 左边多余
+# h 总高度
+# n 顶点个数
+PARAM_NAMES = ("a", "b", "c", "d", "h", "n")
+
+# 各脚本 draw_single 的顶点规则:
+#   (c/d 为 0 时 n 加一, d 为 0 时去掉 A 点, d 为 0 时去掉 B 点, F 点横坐标为 f3 / tan(A) 而不是 tan(A) * f3)
+VARIANTS = {
+    "lmx": (False, False, False, False),          # lmx.py, deepseek-multi.py
+    "multiLmx": (False, True, True, False),       # multiLmx.py, autocad/autocad.py
+    "数据录入": (True, True, True, False),          # 数据录入.py
+    "multi-super": (False, True, False, False),   # multi-super.py
+    "Gemini2.5": (False, False, False, True),     # Gemini2.5.py
+}
+
+
+def as_params(data):
+    """Converts a data list (or a single row) to a float (N, 6) parameter array."""
+    params = np.asarray(data, dtype=np.float64)
+    if params.size == 0:
+        return params.reshape(0, len(PARAM_NAMES))
+    if params.ndim == 1:
+        params = params.reshape(1, -1)
+    if params.ndim != 2 or params.shape[1] != len(PARAM_NAMES):
+        raise ValueError(f"参数数组形状应为 (N, 6)，实际为 {params.shape}")
+    return params
+
+
+def tooth_counts(params, variant="multiLmx"):
+    """Returns the effective tooth count n of every row after the variant's c/d rules."""
+    extend_n = VARIANTS[variant][0]
+    n = params[:, 5].astype(np.int64)
+    if extend_n:
+        n = n + (params[:, 2] == 0) + (params[:, 3] == 0)
+    return n
+
+
+def _head(params, variant):
+    """Which rows keep A and B, and how many vertices come before the first peak."""
+    _, drop_a, drop_b, _ = VARIANTS[variant]
+    d = params[:, 3]
+    has_a = (d != 0) if drop_a else np.ones(len(params), dtype=bool)
+    has_b = (d != 0) if drop_b else np.ones(len(params), dtype=bool)
+    return has_a, has_b, has_a.astype(np.int64) + has_b
+
+
+def key_indices(data, variant="multiLmx"):
+    """Vertex indices of the key points of every row, as int arrays (-1 where absent).
+
+    Keys: idx_A, idx_B, idx_Peak1, idx_Valley1, idx_LastValley, idx_LastPeak,
+    idx_D, idx_E, idx_F and count (vertices per row). Valleys are absent
+    when the row has a single tooth.
+    """
+    params = as_params(data)
+    has_a, has_b, head = _head(params, variant)
+    n = tooth_counts(params, variant)
+    count = head + 2 * n + 2
+    single = n < 2
+    last_peak = head + 2 * (n - 1)
+    return {
+        "idx_A": np.where(has_a, 0, -1),
+        "idx_B": np.where(has_b, has_a.astype(np.int64), -1),
+        "idx_Peak1": head,
+        "idx_Valley1": np.where(single, -1, head + 1),
+        "idx_LastValley": np.where(single, -1, last_peak - 1),
+        "idx_LastPeak": last_peak,
+        "idx_D": count - 3,
+        "idx_E": count - 2,
+        "idx_F": count - 1,
+        "count": count,
+    }
+
+
+def _reject(bad, reason):
+    if bad.any():
+        raise ValueError(f"第 {int(np.argmax(bad)) + 1} 行{reason}")
+
+
+def draw_batch(data, variant="multiLmx"):
+    """Computes the vertices of all shapes at once.
+
+    Returns flat coordinate arrays ``x``, ``y`` and ``offsets`` (length N + 1):
+    the vertices of row i are ``x[offsets[i]:offsets[i + 1]]``, in the same
+    order ``draw_single`` of the chosen variant produces them. Rows with
+    non-finite values, a or b not above 0, a non-integer n or fewer than one
+    tooth raise ValueError naming the first such row.
+    """
+    params = as_params(data)
+    rows = len(params)
+    a, b, c, d, h = params[:, :5].T
+    # 非有限数或 a、b 不大于 0 会在 a / b 和 f1 处除出 inf/nan 顶点，直接报错
+    _reject(~np.isfinite(params).all(axis=1), "参数必须是有限数字")
+    _reject((a <= 0) | (b <= 0), "a(步高) 和 b(步宽) 必须大于 0")
+    # 脚本里 range(n) 遇到小数会报错，这里不能悄悄截断
+    _reject(params[:, 5] != np.round(params[:, 5]), "顶点个数 n 必须是整数")
+    n = tooth_counts(params, variant)
+    _reject(n < 1, "顶点个数 n 必须至少为 1")
+
+    has_a, has_b, head = _head(params, variant)
+
+    # 每行顶点数: A/B + 峰谷交替 (2n - 1) + D、E、F
+    counts = head + 2 * n + 2
+    offsets = np.zeros(rows + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    total = int(offsets[-1])
+
+    # 三角函数按列计算一次，不再在循环中重复
+    angle_a = np.arctan(a / b)
+    angle_b = np.pi / 2 - angle_a
+    sin_a = np.sin(angle_a)
+    cos_a = np.cos(angle_a)
+    f1 = b / np.sin(angle_b)
+    bx = cos_a * d
+    peak_x0 = bx + np.cos(angle_b) * a
+    peak_y = np.sin(angle_b) * a
+
+    # 锯齿部分: 偶数位为峰顶 C，奇数位为谷底 C1
+    row = np.repeat(np.arange(rows), counts)
+    local = np.arange(total) - (offsets[:-1] + head)[row]
+    k = local // 2
+    is_peak = local % 2 == 0
+    x = np.where(is_peak, peak_x0[row] + k * f1[row], bx[row] + f1[row] * (k + 1))
+    y = np.where(is_peak, peak_y[row], 0.0)
+
+    # 首尾的固定点覆盖到各自位置
+    start = offsets[:-1]
+    end = offsets[1:]
+    x[start[has_a]] = 0.0
+    y[start[has_a]] = (sin_a * d)[has_a]
+    idx_b = (start + has_a)[has_b]
+    x[idx_b] = bx[has_b]
+    y[idx_b] = 0.0
+
+    dx = cos_a * c + (peak_x0 + (n - 1) * f1)
+    dy = peak_y - sin_a * c
+    x[end - 3] = dx
+    y[end - 3] = dy
+    x[end - 2] = (h - dy) / np.tan(angle_b) + dx
+    y[end - 2] = h
+    if VARIANTS[variant][3]:
+        x[end - 1] = (h - sin_a * d) / np.tan(angle_a)
+    else:
+        x[end - 1] = np.tan(angle_a) * (h - sin_a * d)
+    y[end - 1] = h
+
+    return x, y, offsets
+
+
+def profile_points(x, y, offsets, i):
+    """Returns the vertices of row i as a list of (x, y) tuples for add_lwpolyline."""
+    start, end = offsets[i], offsets[i + 1]
+    return list(zip(x[start:end].tolist(), y[start:end].tolist()))
+
+
+def iter_points(x, y, offsets):
+    """Yields the vertex list of every row in order."""
+    for i in range(len(offsets) - 1):
+        yield profile_points(x, y, offsets, i)
@@ -0,0 +1,42 @@
+from lmxCache import param_key
+
+
+def row_key(row):
+    """Normalised (a, b, c, d, h, n) tuple, so 250 and 250.0 count as the same row."""
+    a, b, c, d, h, n = row
+    return float(a), float(b), float(c), float(d), float(h), int(n)
+
+
+def unique_rows(data):
+    """Groups identical parameter rows.
+
+    Returns (uniques, inverse): the distinct rows in order of first
+    appearance and, for every input row, its position in uniques.
+    """
+    positions = {}
+    uniques = []
+    inverse = []
+    for row in data:
+        key = row_key(row)
+        pos = positions.get(key)
+        if pos is None:
+            pos = positions[key] = len(uniques)
+            uniques.append(key)
+        inverse.append(pos)
+    return uniques, inverse
+
+
+def block_name(row, variant, kind=""):
+    """Stable block name for one row, e.g. LMX_3F2A...; same parameters give the same name."""
+    return "LMX_" + param_key(row, variant, kind)[:16].upper()
+
+
+def profile_block(doc, profile, variant, kind="", dxfattribs=None):
+    """Defines a BLOCK holding profile (in its own, untranslated coordinates) and returns it.
+
+    The name comes from block_name(profile.params, ...); callers may add more
+    entities, such as dimensions, to the returned block before inserting it.
+    """
+    block = doc.blocks.new(block_name(profile.params, variant, kind))
+    profile.add_to(block, dxfattribs)
+    return block
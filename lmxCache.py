@@ -0,0 +1,152 @@
+import hashlib
+import os
+import shutil
+from collections import OrderedDict
+
+from lmxProfile import profiles_from_batch
+
+# 几何或 DXF 输出规则变化时加一，旧缓存随之失效
+GENERATOR_VERSION = 1
+
+
+def param_key(row, variant="multiLmx", kind=""):
+    """Hash of one parameter row (a, b, c, d, h, n) plus variant, output kind and generator version."""
+    a, b, c, d, h, n = row
+    text = (f"{GENERATOR_VERSION}|{variant}|{kind}|"
+            f"{float(a)!r},{float(b)!r},{float(c)!r},{float(d)!r},{float(h)!r},{int(n)}")
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class GeometryCache:
+    """In-process LRU of computed profiles, bounded by entry count."""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def profile(self, row, variant="multiLmx"):
+        """Returns an lmxProfile.Profile for one row, computing it on a miss.
+
+        The caller gets its own copy and may translate it freely.
+        """
+        key = param_key(row, variant)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry.copy()
+        self.misses += 1
+        entry = profiles_from_batch([row], variant)[0]
+        self._entries[key] = entry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return entry.copy()
+
+
+class DxfCache:
+    """On-disk store of generated DXF files keyed by param_key.
+
+    Files live in root/<key[:2]>/<key>.dxf. An in-memory LRU index of the
+    files and their sizes is built once from the directory (oldest mtime
+    first, mtime is refreshed on every hit so the order survives restarts).
+    When the store grows past max_bytes, the least recently used files are
+    removed until it is back under LOW_WATER * max_bytes, so a full cache
+    does not evict again on the very next store. Hits are copied, never
+    linked: an output file edited in place must not change the cache.
+    """
+
+    LOW_WATER = 0.9
+
+    def __init__(self, root, max_bytes=1 << 30):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(root, exist_ok=True)
+        # key -> 文件字节数，按最近使用排序，最旧的在前
+        self._entries = OrderedDict((os.path.basename(path)[:-4], size) for _, size, path in sorted(self._scan()))
+        self.total_bytes = sum(self._entries.values())
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + ".dxf")
+
+    def _scan(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(".dxf"):
+                    path = os.path.join(dirpath, filename)
+                    stat = os.stat(path)
+                    yield stat.st_mtime, stat.st_size, path
+
+    def fetch(self, key, dst):
+        """Copies the cached file for key to dst. Returns False on a miss."""
+        path = self._path(key)
+        try:
+            # 其他进程(如 lmxParallel 的子进程)可能刚存入或淘汰了这个文件，以磁盘为准
+            shutil.copyfile(path, dst)
+        except FileNotFoundError:
+            self.misses += 1
+            self.total_bytes -= self._entries.pop(key, 0)
+            return False
+        self.hits += 1
+        os.utime(path)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        else:
+            self._entries[key] = os.path.getsize(path)
+            self.total_bytes += self._entries[key]
+        return True
+
+    def store(self, key, src):
+        """Copies a freshly generated file into the store and evicts if needed."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, path)
+        self.total_bytes -= self._entries.pop(key, 0)
+        self._entries[key] = os.path.getsize(path)
+        self.total_bytes += self._entries[key]
+        if self.total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        low = self.max_bytes * self.LOW_WATER
+        while self._entries and self.total_bytes > low:
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                continue
+            self.evictions += 1
+
+
+class LmxCache:
+    """Two-tier cache used by draw_multiple: profiles in memory, DXF files on disk."""
+
+    def __init__(self, root=".lmx_cache", max_bytes=1 << 30, maxsize=4096):
+        self.geometry = GeometryCache(maxsize)
+        self.dxf = DxfCache(root, max_bytes)
+
+    def profile(self, row, variant="multiLmx"):
+        return self.geometry.profile(row, variant)
+
+    def fetch_dxf(self, row, variant, kind, dst):
+        return self.dxf.fetch(param_key(row, variant, kind), dst)
+
+    def store_dxf(self, row, variant, kind, src):
+        self.dxf.store(param_key(row, variant, kind), src)
+
+    def stats(self):
+        return {
+            "geometry_hits": self.geometry.hits,
+            "geometry_misses": self.geometry.misses,
+            "dxf_hits": self.dxf.hits,
+            "dxf_misses": self.dxf.misses,
+            "dxf_evictions": self.dxf.evictions,
+            "dxf_bytes": self.dxf.total_bytes,
+        }
@@ -0,0 +1,186 @@
+import numpy as np
+
+from lmxPlacement import rotated_text_box
+
+# 与 multi-super.setup_dimstyle 中 RED_DIM 的设置一致
+COLOR = 1      # 红色
+DIMTXT = 12.0  # 文字高度
+DIMASZ = 8.0   # 箭头大小
+DIMEXE = 5.0   # 尺寸界线超出量
+DIMEXO = 3.0   # 尺寸界线偏移量
+DIMGAP = 0.625 # 文字与尺寸线的间隙
+
+
+def _unit(v):
+    length = np.hypot(v[:, 0], v[:, 1])
+    safe = np.where(length == 0, 1.0, length)
+    return v / safe[:, None], length
+
+
+def _measured(value):
+    # 与 ezdxf 默认格式一致: 4 位小数，去掉末尾的 0
+    return f"{value:.4f}".rstrip("0").rstrip(".")
+
+
+class LightDims:
+    """multi-super's six dimensions per profile as plain LINE, SOLID and MTEXT entities.
+
+    The geometry of all dimensions of all profiles is computed at once with
+    NumPy; add_to only creates the entities. Each dimension becomes two
+    extension lines, a dimension line, two filled arrows and one MTEXT,
+    instead of a DIMENSION entity plus its rendered anonymous block.
+    """
+
+    def __init__(self, profiles, rows):
+        p1, p2, q1, q2, texts, owners = [], [], [], [], [], []
+
+        def aligned(i, a, b, distance, text):
+            # 对齐标注: 尺寸线在 a -> b 方向左侧 distance 处
+            (ax, ay), (bx, by) = a, b
+            length = ((bx - ax) ** 2 + (by - ay) ** 2) ** 0.5
+            nx, ny = -(by - ay) / length * distance, (bx - ax) / length * distance
+            p1.append(a)
+            p2.append(b)
+            q1.append((ax + nx, ay + ny))
+            q2.append((bx + nx, by + ny))
+            texts.append(text)
+            owners.append(i)
+
+        def linear(i, base, a, b, vertical, text):
+            # 线性标注: 尺寸线过 base，水平或竖直
+            if vertical:
+                q1.append((base[0], a[1]))
+                q2.append((base[0], b[1]))
+                measured = abs(b[1] - a[1])
+            else:
+                q1.append((a[0], base[1]))
+                q2.append((b[0], base[1]))
+                measured = abs(b[0] - a[0])
+            p1.append(a)
+            p2.append(b)
+            texts.append(_measured(measured) if text is None else text)
+            owners.append(i)
+
+        # 与 multi-super.add_dimensions 的 6 个标注一一对应
+        for i, (profile, (a, b, c, d, h, n)) in enumerate(zip(profiles, rows)):
+            point = profile.point
+            if profile.idx_A is not None:
+                aligned(i, point(profile.idx_A), point(profile.idx_B), 30, f"{d:.4f}")
+            if profile.idx_Peak1 < len(profile):
+                aligned(i, point(profile.idx_B), point(profile.idx_Peak1), 30, f"{a:.4f}")
+            if profile.idx_Valley1 is not None:
+                aligned(i, point(profile.idx_Peak1), point(profile.idx_Valley1), 30, f"{b:.4f}")
+            if c != 0:
+                aligned(i, point(profile.idx_LastPeak), point(profile.idx_D), 30, f"{c:.4f}")
+            x_max = point(profile.idx_E)[0]
+            linear(i, (x_max + 150, h / 2), (x_max, 0), (x_max, h), True, f"{h:.4f}")
+            linear(i, (0, h + 80), point(profile.idx_F), point(profile.idx_E), False, None)
+
+        self.texts = texts
+        owners = np.asarray(owners, dtype=np.int64)
+        # 每个图形的标注在数组中的起止位置
+        self.offsets = np.searchsorted(owners, np.arange(len(profiles) + 1))
+        self._compute(np.asarray(p1, dtype=np.float64).reshape(-1, 2), np.asarray(p2, dtype=np.float64).reshape(-1, 2),
+                      np.asarray(q1, dtype=np.float64).reshape(-1, 2), np.asarray(q2, dtype=np.float64).reshape(-1, 2))
+
+    def _compute(self, p1, p2, q1, q2):
+        u, _ = _unit(q2 - q1)                     # 尺寸线方向
+        normal = np.stack([-u[:, 1], u[:, 0]], axis=1)
+
+        # 尺寸界线: 从测量点偏移 DIMEXO 开始，超出尺寸线 DIMEXE
+        e1, len1 = _unit(q1 - p1)
+        e2, len2 = _unit(q2 - p2)
+        # 测量点正好在尺寸线上时没有界线方向，取尺寸线法向
+        e1 = np.where((len1 == 0)[:, None], normal, e1)
+        e2 = np.where((len2 == 0)[:, None], normal, e2)
+        self.ext1 = np.stack([p1 + e1 * DIMEXO, q1 + e1 * DIMEXE], axis=1)
+        self.ext2 = np.stack([p2 + e2 * DIMEXO, q2 + e2 * DIMEXE], axis=1)
+        self.line = np.stack([q1, q2], axis=1)
+
+        # 实心箭头: 尖端在尺寸线两端，朝外
+        half = normal * (DIMASZ / 6)
+        back1 = q1 + u * DIMASZ
+        back2 = q2 - u * DIMASZ
+        self.arrow1 = np.stack([q1, back1 + half, back1 - half], axis=1)
+        self.arrow2 = np.stack([q2, back2 - half, back2 + half], axis=1)
+
+        # 文字在尺寸线中点、界线一侧，旋转到便于阅读的方向
+        side = np.where((np.sum(normal * e1, axis=1) < 0)[:, None], -normal, normal)
+        self.text_pos = (q1 + q2) / 2 + side * (DIMGAP + DIMTXT / 2)
+        self.text_side = side
+        angle = np.degrees(np.arctan2(u[:, 1], u[:, 0]))
+        angle = np.where(angle > 90, angle - 180, np.where(angle <= -90, angle + 180, angle))
+        self.rotation = angle
+
+    def reserve(self, placer, i, dx=0.0, dy=0.0, texts=False):
+        """Registers the lines and arrows of profile i's dimensions, moved by (dx, dy), in an lmxPlacement.Placer.
+
+        With texts the dimension text at its default spot is registered too,
+        for dimensions whose text is not placed through the placer (blocks,
+        DIMENSION entities).
+        """
+        start, stop = int(self.offsets[i]), int(self.offsets[i + 1])
+        shift = np.array([dx, dy])
+        if texts:
+            positions = (self.text_pos[start:stop] + shift).tolist()
+            for k, ((x, y), rotation) in enumerate(zip(positions, self.rotation[start:stop].tolist())):
+                placer.add_box(rotated_text_box(x, y, self.texts[start + k], DIMTXT, rotation, 0.7))
+        add_segment = placer.index.add_segment
+        for lines in (self.ext1, self.ext2, self.line):
+            for (x1, y1), (x2, y2) in (lines[start:stop] + shift).tolist():
+                add_segment(x1, y1, x2, y2)
+        for arrows in (self.arrow1, self.arrow2):
+            for (x1, y1), (x2, y2), (x3, y3) in (arrows[start:stop] + shift).tolist():
+                placer.add_box((min(x1, x2, x3), min(y1, y2, y3), max(x1, x2, x3), max(y1, y2, y3)))
+
+    def _placed_text(self, placer, start, stop, shift):
+        # 候选位置: 默认一侧、尺寸线另一侧、默认一侧再往外
+        step = (DIMGAP + DIMTXT / 2) * 2
+        default = self.text_pos[start:stop] + shift
+        side = self.text_side[start:stop]
+        candidates = [default, default - side * step, default + side * DIMTXT]
+        candidates = [c.tolist() for c in candidates]
+        rotation = self.rotation[start:stop].tolist()
+        text_pos = []
+        for k in range(stop - start):
+            text = self.texts[start + k]
+            options = [c[k] for c in candidates]
+            boxes = [rotated_text_box(x, y, text, DIMTXT, rotation[k], 0.7) for x, y in options]
+            text_pos.append(options[placer.place(boxes)])
+        return text_pos
+
+    def add_to(self, layout, i, dx=0.0, dy=0.0, placer=None):
+        """Adds the dimensions of profile i to layout, moved by (dx, dy).
+
+        With an lmxPlacement.Placer the text of each dimension moves to the
+        other side of its dimension line, or further out, when the default
+        spot is taken.
+        """
+        start, stop = int(self.offsets[i]), int(self.offsets[i + 1])
+        if start == stop:
+            return
+        shift = np.array([dx, dy])
+        attribs = {"color": COLOR}
+        ext1 = (self.ext1[start:stop] + shift).tolist()
+        ext2 = (self.ext2[start:stop] + shift).tolist()
+        line = (self.line[start:stop] + shift).tolist()
+        arrow1 = (self.arrow1[start:stop] + shift).tolist()
+        arrow2 = (self.arrow2[start:stop] + shift).tolist()
+        if placer is None:
+            text_pos = (self.text_pos[start:stop] + shift).tolist()
+        else:
+            text_pos = self._placed_text(placer, start, stop, shift)
+        rotation = self.rotation[start:stop].tolist()
+        for k in range(stop - start):
+            layout.add_line(ext1[k][0], ext1[k][1], dxfattribs=attribs)
+            layout.add_line(ext2[k][0], ext2[k][1], dxfattribs=attribs)
+            layout.add_line(line[k][0], line[k][1], dxfattribs=attribs)
+            layout.add_solid(arrow1[k], dxfattribs=attribs)
+            layout.add_solid(arrow2[k], dxfattribs=attribs)
+            layout.add_mtext(self.texts[start + k], dxfattribs={
+                "color": COLOR,
+                "char_height": DIMTXT,
+                "insert": text_pos[k],
+                "rotation": rotation[k],
+                "attachment_point": 5,  # 正中
+            })
@@ -0,0 +1,399 @@
+"""G-code for cutting the outlines on a plasma table.
+
+    python lmxGcode.py rows.json -o job.nc                       # 默认 3000 x 1500 的板
+    python lmxGcode.py rows.jsonl -o job.nc --table 6000x2000 --kerf 1.8 --feed 2500
+
+The outlines come straight from lmxBatch.draw_batch and are packed onto
+tables with lmxLayout.Sheet (or placed with given offsets). Every outline
+is offset outwards by half the kerf, pierced a lead-in length outside its
+lower-left corner and cut clockwise back to where it started. Cuts are
+ordered from the table origin with a nearest-neighbour pass and a 2-opt
+refinement over each pierce point's nearest neighbours, so thousands of
+parts per table take well under a second. Each table gets its own
+program; the report gives cut and travel length and time, and how much
+travel the ordering saved over cutting the rows in input order.
+"""
+import argparse
+import math
+import os
+
+import numpy as np
+
+from lmxBatch import VARIANTS, draw_batch
+from lmxLayout import Sheet
+from lmxPreflight import preflight
+
+NEIGHBOURS = 8     # 2-opt 只在每个穿孔点最近的这些点里找交换
+MITER_LIMIT = 4.0  # 尖角处割缝补偿的最大外移倍数，超过按此截断
+EPS = 1e-9
+
+
+class Machine:
+    """Cutting parameters of the table: speeds in mm/min, pierce dwell in seconds, kerf and lead-in in mm."""
+
+    def __init__(self, feed=2000.0, rapid=10000.0, pierce=0.5, kerf=1.5, lead_in=5.0, clockwise=True):
+        self.feed = feed
+        self.rapid = rapid
+        self.pierce = pierce
+        self.kerf = kerf
+        self.lead_in = lead_in
+        # 外轮廓顺时针切，常见的顺时针旋流割炬好的一边留在零件上
+        self.clockwise = clockwise
+
+    def __repr__(self):
+        return (f"Machine(feed={self.feed!r}, rapid={self.rapid!r}, pierce={self.pierce!r}, "
+                f"kerf={self.kerf!r}, lead_in={self.lead_in!r}, clockwise={self.clockwise!r})")
+
+
+# 默认的切割台板料大小; 割缝和引入线排版时另外留，gap 只是它们之外的间距
+TABLE = Sheet(3000.0, 1500.0, gap=5.0, sheet_gap=0.0, sort=True)
+
+
+def offset_outlines(x, y, offsets, distance):
+    """Moves every vertex of the closed outlines outwards by distance (miter joins).
+
+    Returns the new x, y and the outward unit direction (ux, uy) at each vertex.
+    """
+    start = offsets[:-1]
+    counts = np.diff(offsets)
+    following = np.arange(1, len(x) + 1)
+    following[offsets[1:] - 1] = start
+    previous = np.arange(-1, len(x) - 1)
+    previous[start] = offsets[1:] - 1
+    # 逆时针的图形外法线在边的右侧，顺时针的在左侧
+    area = np.add.reduceat(x * y[following] - x[following] * y, start)
+    sign = np.where(area >= 0, 1.0, -1.0).repeat(counts)
+    ex = x[following] - x
+    ey = y[following] - y
+    length = np.maximum(np.hypot(ex, ey), EPS)
+    nx = sign * ey / length
+    ny = -sign * ex / length
+    # 顶点两侧边的外法线，斜接点沿两者之和移动 distance / cos(半角)
+    px = nx[previous]
+    py = ny[previous]
+    factor = 1.0 / np.maximum(1.0 + px * nx + py * ny, 2.0 / MITER_LIMIT ** 2)
+    mx = (px + nx) * factor
+    my = (py + ny) * factor
+    norm = np.maximum(np.hypot(mx, my), EPS)
+    return x + distance * mx, y + distance * my, mx / norm, my / norm
+
+
+def drop_repeats(x, y, offsets):
+    """Removes vertices equal to the one before them (c or d = 0 repeats a point); returns x, y, offsets."""
+    following = np.arange(1, len(x) + 1)
+    following[offsets[1:] - 1] = offsets[:-1]
+    keep = np.hypot(x[following] - x, y[following] - y) > EPS
+    rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    counts = np.bincount(rows[keep], minlength=len(offsets) - 1)
+    new_offsets = np.zeros(len(offsets), dtype=np.int64)
+    np.cumsum(counts, out=new_offsets[1:])
+    return x[keep], y[keep], new_offsets
+
+
+def _first_per_row(mask, offsets):
+    # 每行第一个满足 mask 的顶点下标
+    rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    hits = np.flatnonzero(mask)
+    _, first = np.unique(rows[hits], return_index=True)
+    return hits[first]
+
+
+def _neighbour_lists(xs, ys, k):
+    # 每个点最近的 k 个点(按距离排好)。点分进约两个点一格的网格，只和周围几格里的点比;
+    # 第 k 近的点比搜索半径还远时扩大范围，保证结果与全量比较一致
+    n = len(xs)
+    k = min(k, n - 1)
+    width = max(float(np.ptp(xs)), EPS)
+    height = max(float(np.ptp(ys)), EPS)
+    cell = max(math.sqrt(width * height * 2 / n), width / n, height / n)
+    cx = ((xs - xs.min()) / cell).astype(np.int64)
+    cy = ((ys - ys.min()) / cell).astype(np.int64)
+    order = np.lexsort((cy, cx))
+    cells = {}
+    bounds = np.flatnonzero(np.r_[True, (np.diff(cx[order]) != 0) | (np.diff(cy[order]) != 0), True])
+    for first, last in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        members = order[first:last]
+        cells[(int(cx[members[0]]), int(cy[members[0]]))] = members
+    result = np.empty((n, k), dtype=np.int64)
+    for (i, j), members in cells.items():
+        reach = 2
+        while True:
+            candidates = [cells[key] for key in ((i + di, j + dj) for di in range(-reach, reach + 1)
+                                                 for dj in range(-reach, reach + 1)) if key in cells]
+            candidates = np.concatenate(candidates)
+            if len(candidates) > k:
+                distance = np.hypot(xs[members, None] - xs[candidates], ys[members, None] - ys[candidates])
+                distance[candidates[None, :] == members[:, None]] = np.inf
+                nearest = np.argsort(distance, axis=1, kind="stable")[:, :k]
+                if len(candidates) == n or distance[np.arange(len(members)), nearest[:, -1]].max() <= reach * cell:
+                    break
+            reach *= 2
+        result[members] = candidates[nearest]
+    return result.tolist()
+
+
+def _nearest_neighbour(xs, ys, neighbours):
+    # 从第 0 个点(原点)出发，每次走到最近的未访问点: 近邻表里有未访问的就是它，都访问过了才全量比较
+    n = len(xs)
+    visited = np.zeros(n, dtype=bool)
+    seen = [False] * n
+    visited[0] = seen[0] = True
+    tour = [0]
+    current = 0
+    for _ in range(n - 1):
+        for candidate in neighbours[current]:
+            if not seen[candidate]:
+                current = candidate
+                break
+        else:
+            distance = np.hypot(xs - xs[current], ys - ys[current])
+            distance[visited] = np.inf
+            current = int(np.argmin(distance))
+        visited[current] = seen[current] = True
+        tour.append(current)
+    return tour
+
+
+def _two_opt(xs, ys, tour, neighbours, passes):
+    # 开放路径的 2-opt: 起点固定，终点自由; 候选只取近邻，翻转后更新位置表。
+    # 上一轮没有变化的点(端点都没动过)这一轮跳过
+    n = len(tour)
+    if n < 4:
+        return tour
+    xs = xs.tolist()
+    ys = ys.tolist()
+    pos = [0] * n
+    for k, node in enumerate(tour):
+        pos[node] = k
+    active = [True] * n
+
+    def dist(p, q):
+        return math.hypot(xs[p] - xs[q], ys[p] - ys[q])
+
+    def reverse(first, last):
+        for k in (first - 1, first, last, last + 1):
+            if 0 <= k < n:
+                active[tour[k]] = True
+        tour[first:last + 1] = tour[first:last + 1][::-1]
+        for k in range(first, last + 1):
+            pos[tour[k]] = k
+
+    for _ in range(passes):
+        improved = False
+        for i in range(n):
+            a = tour[i]
+            if not active[a]:
+                continue
+            active[a] = False
+            b = tour[i + 1] if i + 1 < n else None
+            ab = dist(a, b) if b is not None else 0.0
+            for c in neighbours[a]:
+                j = pos[c]
+                if j > i + 1:
+                    # 去掉 a-b、c-e，连上 a-c、b-e，翻转 b..c
+                    e = tour[j + 1] if j + 1 < n else None
+                    gain = ab - dist(a, c) + (dist(c, e) - dist(b, e) if e is not None else 0.0)
+                    if gain > EPS:
+                        reverse(i + 1, j)
+                        improved = True
+                        break
+                elif j + 1 < i:
+                    # 去掉 c-f、a-b，连上 c-a、f-b，翻转 f..a
+                    f = tour[j + 1]
+                    gain = dist(c, f) - dist(c, a) + (ab - dist(f, b) if b is not None else 0.0)
+                    if gain > EPS:
+                        reverse(j + 1, i)
+                        improved = True
+                        break
+        if not improved:
+            break
+    return tour
+
+
+def order_cuts(points, origin=(0.0, 0.0), passes=20):
+    """Order to visit the (x, y) points in, starting from origin: nearest neighbour, then 2-opt. A list of indices."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    xs = np.concatenate([[origin[0]], points[:, 0]])
+    ys = np.concatenate([[origin[1]], points[:, 1]])
+    if len(xs) < 3:
+        return list(range(len(points)))
+    neighbours = _neighbour_lists(xs, ys, NEIGHBOURS)
+    tour = _two_opt(xs, ys, _nearest_neighbour(xs, ys, neighbours), neighbours, passes)
+    return [node - 1 for node in tour[1:]]
+
+
+def _travel(pierce, end, order, origin):
+    # 原点 -> 第一个穿孔点 -> ... -> 最后一个终点 -> 原点
+    order = np.asarray(order)
+    starts = np.vstack([[origin], end[order]])
+    stops = np.vstack([pierce[order], [origin]])
+    return float(np.hypot(*(stops - starts).T).sum())
+
+
+def plan_table(x, y, offsets, machine=None, origin=(0.0, 0.0), passes=20):
+    """Cutting plan of the outlines on one table, in machine coordinates.
+
+    Returns a dict: x, y, offsets of the kerf-compensated outlines, start
+    (the vertex each cut begins and ends at), pierce points, order, and the
+    statistics cut_length, travel_length, baseline_travel (rows cut in
+    input order), pierces, cut_seconds, travel_seconds, seconds and
+    saved_seconds.
+    """
+    machine = machine or Machine()
+    rows = len(offsets) - 1
+    x, y, offsets = drop_repeats(x, y, offsets)
+    x, y, ux, uy = offset_outlines(x, y, offsets, machine.kerf / 2)
+    # 从最靠左下的顶点进刀: 它在凸包上，外移方向一定在零件外面
+    s = x + y
+    start = _first_per_row(s == np.minimum.reduceat(s, offsets[:-1]).repeat(np.diff(offsets)), offsets)
+    end = np.stack([x[start], y[start]], axis=1)
+    pierce = end + machine.lead_in * np.stack([ux[start], uy[start]], axis=1)
+    order = order_cuts(pierce, origin, passes)
+
+    following = np.arange(1, len(x) + 1)
+    following[offsets[1:] - 1] = offsets[:-1]
+    perimeter = np.add.reduceat(np.hypot(x[following] - x, y[following] - y), offsets[:-1])
+    cut_length = float(perimeter.sum()) + rows * machine.lead_in
+    travel = _travel(pierce, end, order, origin)
+    baseline = _travel(pierce, end, range(rows), origin)
+    cut_seconds = cut_length / machine.feed * 60 + rows * machine.pierce
+    travel_seconds = travel / machine.rapid * 60
+    return {
+        "x": x, "y": y, "offsets": offsets, "start": start, "pierce": pierce, "order": order,
+        "parts": rows,
+        "cut_length": cut_length,
+        "travel_length": travel,
+        "baseline_travel": baseline,
+        "pierces": rows,
+        "cut_seconds": cut_seconds,
+        "travel_seconds": travel_seconds,
+        "seconds": cut_seconds + travel_seconds,
+        "saved_seconds": (baseline - travel) / machine.rapid * 60,
+    }
+
+
+def write_gcode(f, plan, machine=None, title=""):
+    """Writes the program of one plan_table result to the text file f."""
+    machine = machine or Machine()
+    x, y, offsets = plan["x"], plan["y"], plan["offsets"]
+    f.write(f"({title} {plan['parts']} parts, cut {plan['cut_length'] / 1000:.2f} m, "
+            f"travel {plan['travel_length'] / 1000:.2f} m, about {plan['seconds'] / 60:.1f} min)\n")
+    f.write("G21\nG90\nG17\n")
+    for row in plan["order"]:
+        first, last = int(offsets[row]), int(offsets[row + 1])
+        indices = np.arange(first, last)
+        indices = np.roll(indices, first - int(plan["start"][row]))
+        # 图形是逆时针的(面积为正)而要求顺时针时，倒过来走
+        area = float(np.dot(x[first:last], np.roll(y[first:last], -1)) - np.dot(np.roll(x[first:last], -1),
+                                                                                y[first:last]))
+        if (area > 0) == machine.clockwise:
+            indices = np.r_[indices[:1], indices[1:][::-1]]
+        indices = np.r_[indices, indices[:1]]
+        px, py = plan["pierce"][row]
+        f.write(f"G0 X{px:.3f} Y{py:.3f}\nM3\n")
+        if machine.pierce:
+            f.write(f"G4 P{machine.pierce:g}\n")
+        f.write(f"G1 X{x[indices[0]]:.3f} Y{y[indices[0]]:.3f} F{machine.feed:g}\n")
+        coordinates = np.stack([x[indices[1:]], y[indices[1:]]], axis=1).ravel().tolist()
+        f.write(("G1 X%.3f Y%.3f\n" * (len(indices) - 1)) % tuple(coordinates))
+        f.write("M5\n")
+    f.write("G0 X0 Y0\nM30\n")
+
+
+def table_paths(output_filename, count):
+    if count == 1:
+        return [output_filename]
+    stem, ext = os.path.splitext(output_filename)
+    return [f"{stem}.table{k + 1}{ext or '.nc'}" for k in range(count)]
+
+
+def export_gcode(data, output_filename="lmx.nc", variant="multiLmx", machine=None, table=None, offsets=None,
+                 passes=20):
+    """Writes G-code for cutting all rows; returns one report dict per table (see plan_table) with its path.
+
+    Rows are packed onto tables of the Sheet table (default TABLE, one
+    program per table: <name>.tableK.nc when there are several). With
+    offsets, an (N, 2) array of translations into machine coordinates, the
+    rows are placed there instead, all on one table. Bad rows raise
+    ValueError (lmxPreflight, policy "abort").
+    """
+    machine = machine or Machine()
+    preflight(data, variant, "abort")
+    x, y, row_offsets = draw_batch(data, variant)
+    rows = len(row_offsets) - 1
+    if not rows:
+        raise ValueError("没有要切割的行")
+    counts = np.diff(row_offsets)
+    if offsets is not None:
+        offsets = np.asarray(offsets, dtype=np.float64).reshape(-1, 2)
+        if len(offsets) != rows:
+            raise ValueError(f"offsets 有 {len(offsets)} 行，参数有 {rows} 行")
+        tables = np.zeros(rows, dtype=np.int64)
+    else:
+        table = table or TABLE
+        start = row_offsets[:-1]
+        boxes = np.stack([np.minimum.reduceat(x, start), np.minimum.reduceat(y, start),
+                          np.maximum.reduceat(x, start), np.maximum.reduceat(y, start)], axis=1)
+        # 割缝和引入线都在图形外面，排版时一起算上，穿孔点不会落到板外或别的零件上
+        boxes += np.array([-1, -1, 1, 1]) * (machine.kerf + machine.lead_in)
+        positions, tables = table.pack(boxes[:, 2:] - boxes[:, :2])
+        offsets = positions - boxes[:, :2]
+        # 每张板的左上角是 (板的起点, 0)，换成左下角为原点的机床坐标
+        for k in range(int(tables.max()) + 1):
+            mine = tables == k
+            depth = max(table.height, -float(positions[mine, 1].min()))
+            offsets[mine] -= [positions[mine, 0].min(), -depth]
+    x = x + offsets[:, 0].repeat(counts)
+    y = y + offsets[:, 1].repeat(counts)
+
+    count = int(tables.max()) + 1
+    reports = []
+    for k, path in enumerate(table_paths(output_filename, count)):
+        mine = np.flatnonzero(tables == k)
+        # 这张板上的行各自的顶点
+        indices = np.concatenate([np.arange(row_offsets[i], row_offsets[i + 1]) for i in mine])
+        table_offsets = np.zeros(len(mine) + 1, dtype=np.int64)
+        np.cumsum(counts[mine], out=table_offsets[1:])
+        plan = plan_table(x[indices], y[indices], table_offsets, machine, passes=passes)
+        with open(path, "w", encoding="ascii", newline="\n") as f:
+            write_gcode(f, plan, machine, title=os.path.basename(path))
+        report = {key: value for key, value in plan.items() if key not in ("x", "y", "offsets", "start", "pierce")}
+        report["order"] = [int(mine[i]) + 1 for i in plan["order"]]  # 1 起的行号
+        report["path"] = path
+        reports.append(report)
+    return reports
+
+
+def main():
+    from lmxStream import read_rows
+
+    parser = argparse.ArgumentParser(description="生成等离子切割的 G 代码，按空行程最短排序")
+    parser.add_argument("input", help="参数文件 (.json/.jsonl/.csv)")
+    parser.add_argument("-o", "--output", default="lmx.nc")
+    parser.add_argument("--variant", default="multiLmx", choices=tuple(VARIANTS))
+    parser.add_argument("--table", default="3000x1500", help="板料大小 宽x高 mm")
+    parser.add_argument("--gap", type=float, default=5.0, help="零件间距 mm(割缝和引入线之外)")
+    parser.add_argument("--kerf", type=float, default=1.5, help="割缝宽度 mm")
+    parser.add_argument("--lead-in", type=float, default=5.0, help="引入线长度 mm")
+    parser.add_argument("--feed", type=float, default=2000.0, help="切割速度 mm/min")
+    parser.add_argument("--rapid", type=float, default=10000.0, help="空行程速度 mm/min")
+    parser.add_argument("--pierce", type=float, default=0.5, help="穿孔停留 s")
+    args = parser.parse_args()
+    try:
+        width, height = (float(v) for v in args.table.lower().split("x"))
+    except ValueError:
+        raise SystemExit(f"无法识别 --table {args.table}，应为 宽x高")
+    data = list(read_rows(args.input))
+    machine = Machine(args.feed, args.rapid, args.pierce, args.kerf, args.lead_in)
+    try:
+        reports = export_gcode(data, args.output, args.variant, machine, Sheet(width, height, args.gap, 0.0))
+    except ValueError as e:
+        raise SystemExit(f"无法生成: {e}")
+    for report in reports:
+        print(f"{report['path']}: {report['parts']} 个零件，切割 {report['cut_length'] / 1000:.2f} m，"
+              f"空行程 {report['travel_length'] / 1000:.2f} m (按原顺序 {report['baseline_travel'] / 1000:.2f} m)，"
+              f"约 {report['seconds'] / 60:.1f} min，排序省 {report['saved_seconds'] / 60:.1f} min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""Index of stringer outlines in existing DXF files.
+
+    python lmxIndex.py dxf/ old_jobs/                          # 扫描目录，更新 lmx_index.sqlite
+    python lmxIndex.py --lookup 151.2,250,60,70,290,14 --variant multiLmx
+
+Every closed LWPOLYLINE is fitted back to (a, b, c, d, h, n) with the vertex
+structure of draw_single and stored in a SQLite file together with its path
+and handle. Files are streamed tag by tag, ASCII (group codes with or
+without padding) as well as binary, so a scan never holds more than one
+entity of a file in memory. A rescan only reads files whose size or mtime
+changed. Lookups match parameters within TOLERANCE mm.
+
+Only the variants in FITTED can be looked up: Gemini2.5 puts F at
+f3 / tan(A) instead of on the line parallel to D-E, which fit_profile does
+not model, so its outlines are neither recognised when scanning nor
+accepted by lookup.
+"""
+import argparse
+import math
+import os
+import sqlite3
+import struct
+import time
+
+import ezdxf
+import numpy as np
+from ezdxf.lldxf.types import BINARY_DATA, BYTES, DOUBLE, INT16, INT32, INT64
+
+from lmxBatch import VARIANTS, draw_batch
+
+BINARY_SENTINEL = b"AutoCAD Binary DXF\r\n\x1a\x00"
+TOLERANCE = 1e-4  # 查找时 a、b、c、d、h 相差不超过这么多(mm)就算同一个图形
+# fit_profile 能还原的变体: F-A 与 D-E 平行
+FITTED = tuple(variant for variant, rules in VARIANTS.items() if not rules[3])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER);
+CREATE TABLE IF NOT EXISTS shapes (
+    path TEXT, handle TEXT, a REAL, b REAL, c REAL, d REAL, h REAL, teeth INTEGER, head INTEGER,
+    x REAL, y REAL
+);
+CREATE INDEX IF NOT EXISTS shapes_key ON shapes (teeth, head, a);
+CREATE INDEX IF NOT EXISTS shapes_path ON shapes (path);
+"""
+
+
+def _ascii_pairs(f):
+    # 从打开的文件逐行读 (组码, 值)，组码允许带空白，其他 CAD 软件常写 "0" 而不是 "  0"
+    for code in f:
+        code = int(code)
+        value = next(f, "").strip()
+        yield code, value
+        # EOF 后面的空行等不再解析
+        if code == 0 and value == "EOF":
+            return
+
+
+def _binary_pairs(f):
+    # 二进制 DXF 逐个标签从文件读出，值的类型按组码查 ezdxf 的组码表
+    def read(size):
+        data = f.read(size)
+        if len(data) != size:
+            raise ValueError("二进制 DXF 文件不完整")
+        return data
+
+    # R12 的组码只占一个字节(255 后跟两字节扩展组码)，R13 起占两个字节
+    short_codes = f.peek(2)[1:2] != b"\x00"
+    while True:
+        head = f.read(1)
+        if not head:
+            return
+        code = head[0]
+        if not short_codes:
+            code |= read(1)[0] << 8
+        elif code == 255:
+            code = struct.unpack("<H", read(2))[0]
+        if code in BINARY_DATA:
+            value = read(read(1)[0])
+        elif code in DOUBLE:
+            value = struct.unpack("<d", read(8))[0]
+        elif code in INT16:
+            value = struct.unpack("<h", read(2))[0]
+        elif code in INT32:
+            value = struct.unpack("<i", read(4))[0]
+        elif code in INT64:
+            value = struct.unpack("<q", read(8))[0]
+        elif code in BYTES:
+            value = read(1)[0]
+        else:
+            # 以 0 结尾的字符串，在缓冲区里找结尾
+            parts = []
+            while True:
+                chunk = f.peek(256)
+                if not chunk:
+                    raise ValueError("二进制 DXF 文件不完整")
+                stop = chunk.find(b"\x00")
+                if stop >= 0:
+                    parts.append(f.read(stop))
+                    f.read(1)
+                    break
+                parts.append(f.read(len(chunk)))
+            value = b"".join(parts).decode("latin-1")
+        yield code, value
+
+
+def _polylines(pairs):
+    # 一次只保留当前实体的顶点; ASCII 的值是字符串，二进制的已经是数字
+    inside = False
+    handle = ""
+    flags = 0
+    xs = []
+    ys = []
+    for code, value in pairs:
+        if code == 0:
+            if inside:
+                yield handle, bool(flags & 1), list(zip(xs, ys))
+            inside = value == "LWPOLYLINE"
+            handle = ""
+            flags = 0
+            xs = []
+            ys = []
+        elif not inside:
+            continue
+        elif code == 10:
+            xs.append(float(value))
+        elif code == 20:
+            ys.append(float(value))
+        elif code == 5:
+            handle = value
+        elif code == 70:
+            flags = int(value)
+    if inside:
+        yield handle, bool(flags & 1), list(zip(xs, ys))
+
+
+def scan_polylines(path):
+    """Yields (handle, closed, [(x, y), ...]) for every LWPOLYLINE in a DXF file, in model space or in blocks.
+
+    The file is read tag by tag, ASCII or binary, so memory is bounded by one entity, not by the file size.
+    """
+    with open(path, "rb") as f:
+        binary = f.peek(len(BINARY_SENTINEL))[:len(BINARY_SENTINEL)] == BINARY_SENTINEL
+        if binary:
+            f.read(len(BINARY_SENTINEL))
+            yield from _polylines(_binary_pairs(f))
+            return
+    # 句柄和数字都是 ASCII，编码无关紧要; 通用换行模式同时处理 \r\n
+    with open(path, encoding="latin-1") as f:
+        yield from _polylines(_ascii_pairs(f))
+
+
+def _geometry_variant(head, d):
+    # 能生成这种顶点结构的 lmxBatch 变体，用来重算验证
+    if head == 1:
+        return "multi-super"
+    if head == 2 and d == 0:
+        return "lmx"
+    return "multiLmx"
+
+
+def fit_profile(points):
+    """Recovers the parameters of one outline.
+
+    Returns (a, b, c, d, h, teeth, head, x, y) or None when the points are
+    not a stringer: teeth is the number of peaks actually drawn (n after the
+    variant's c/d rules), head the number of vertices before the first peak
+    (A and B), and (x, y) where the outline's origin was moved to. The fit
+    is checked by recomputing the outline with the batch kernel.
+    """
+    count = len(points)
+    if count < 4:
+        return None
+    pts = np.asarray(points, dtype=np.float64)
+    scale = max(1.0, float(np.abs(pts).max()))
+    # 没有 A、B 的 n 齿图形与 d = b 的 n - 1 齿图形重合，先按没有 A、B 拟合
+    for head in ((1,) if count % 2 else (0, 2)):
+        teeth = (count - head - 2) // 2
+        if teeth < 1:
+            continue
+        peak1 = pts[head]
+        if teeth >= 2:
+            base_y = pts[head + 1][1]
+            rise = pts[head + 2] - pts[head + 1]
+        elif head:
+            base_y = pts[head - 1][1]
+            rise = peak1 - pts[head - 1]
+        else:
+            # 只有一个齿且没有 A、B: 齿尖所在斜线与 F 点所在斜线是同一条，取 F 的方向，底边按 y = 0
+            base_y = 0.0
+            rise = pts[-1] - peak1
+        angle_b = math.atan2(rise[1], rise[0])
+        if not 0 < angle_b < math.pi / 2:
+            continue
+        angle_a = math.pi / 2 - angle_b
+        a = float(peak1[1] - base_y) / math.sin(angle_b)
+        b = a / math.tan(angle_a)
+        c = float(np.hypot(*(pts[-3] - pts[head + 2 * teeth - 2])))
+        d = float(np.hypot(*(pts[1] - pts[0]))) if head == 2 else 0.0
+        h = float(pts[-2][1] - base_y)
+        if a <= 0:
+            continue
+        # 重算后平移到第一个点重合，逐点比较
+        row = [a, b, c, d, h, teeth]
+        variant = _geometry_variant(head, d)
+        x, y, _ = draw_batch([row], variant)
+        if len(x) != count:
+            continue
+        dx = pts[0][0] - x[0]
+        dy = pts[0][1] - y[0]
+        if np.abs(np.stack([x + dx, y + dy], axis=1) - pts).max() > 1e-6 * scale:
+            continue
+        return (a, b, c, d, h, teeth, head, float(dx), float(dy))
+    return None
+
+
+def _geometry_key(row, variant):
+    # 按该变体画出请求行再拟合，与扫描时得到的参数、齿数和首峰位置完全一致
+    x, y, _ = draw_batch([row], variant)
+    fit = fit_profile(list(zip(x, y)))
+    if fit is None:
+        raise ValueError(f"无法识别的参数: {row}")
+    return fit[:7]
+
+
+class DxfIndex:
+    """SQLite index of fitted outlines, see the module docstring."""
+
+    def __init__(self, path="lmx_index.sqlite"):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def update(self, *roots):
+        """Scans the .dxf files under roots; returns a dict with files scanned/unchanged/removed,
+        shapes stored and closed polylines that did not fit."""
+        stats = {"scanned": 0, "unchanged": 0, "removed": 0, "shapes": 0, "unfitted": 0}
+        db = self._db
+        known = {path: (mtime, size) for path, mtime, size in db.execute("SELECT path, mtime_ns, size FROM files")}
+        seen = set()
+        for root in roots:
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    if not filename.lower().endswith(".dxf"):
+                        continue
+                    path = os.path.abspath(os.path.join(dirpath, filename))
+                    seen.add(path)
+                    stat = os.stat(path)
+                    if known.get(path) == (stat.st_mtime_ns, stat.st_size):
+                        stats["unchanged"] += 1
+                        continue
+                    rows = []
+                    try:
+                        for handle, closed, points in scan_polylines(path):
+                            if not closed:
+                                continue
+                            fit = fit_profile(points)
+                            if fit is None:
+                                stats["unfitted"] += 1
+                            else:
+                                rows.append((path, handle) + fit)
+                    except (OSError, ValueError, ezdxf.DXFError) as e:
+                        print(f"跳过无法读取的文件 {path}: {e}")
+                        continue
+                    db.execute("DELETE FROM shapes WHERE path = ?", (path,))
+                    db.executemany("INSERT INTO shapes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                    db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                               (path, stat.st_mtime_ns, stat.st_size))
+                    stats["scanned"] += 1
+                    stats["shapes"] += len(rows)
+        # 只清理这次扫描的目录下已经删除的文件
+        prefixes = tuple(os.path.join(os.path.abspath(root), "") for root in roots)
+        for path in known:
+            if path not in seen and path.startswith(prefixes):
+                db.execute("DELETE FROM shapes WHERE path = ?", (path,))
+                db.execute("DELETE FROM files WHERE path = ?", (path,))
+                stats["removed"] += 1
+        db.commit()
+        return stats
+
+    def lookup(self, row, variant="multiLmx", tolerance=TOLERANCE):
+        """Drawings that already contain the outline of row as the variant draws it: [(path, handle, x, y), ...].
+
+        Both sides are fitted from drawn vertices, so a, b, c, d and h are
+        compared within tolerance (mm) instead of exactly. Raises ValueError
+        for a variant that is not in FITTED.
+        """
+        if variant not in FITTED:
+            raise ValueError(f"{variant} 的图形无法从顶点还原参数，不能查找")
+        *values, teeth, head = _geometry_key(row, variant)
+        bounds = [bound for value in values for bound in (value - tolerance, value + tolerance)]
+        return self._db.execute(
+            "SELECT path, handle, x, y FROM shapes WHERE teeth = ? AND head = ? AND a BETWEEN ? AND ? "
+            "AND b BETWEEN ? AND ? AND c BETWEEN ? AND ? AND d BETWEEN ? AND ? AND h BETWEEN ? AND ?",
+            [teeth, head] + bounds).fetchall()
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM shapes").fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="扫描 DXF 文件，建立可按参数查找的图形索引")
+    parser.add_argument("roots", nargs="*", help="要扫描的目录")
+    parser.add_argument("--index", default="lmx_index.sqlite")
+    parser.add_argument("--lookup", help="按参数查找: a,b,c,d,h,n")
+    parser.add_argument("--variant", default="multiLmx", choices=FITTED)
+    args = parser.parse_args()
+    with DxfIndex(args.index) as index:
+        if args.roots:
+            t0 = time.perf_counter()
+            stats = index.update(*args.roots)
+            seconds = time.perf_counter() - t0
+            print(f"扫描 {stats['scanned']} 个文件 (未变 {stats['unchanged']}，已删除 {stats['removed']})，"
+                  f"记录 {stats['shapes']} 个图形，{stats['unfitted']} 个闭合多段线无法识别，{seconds:.1f} s")
+        if args.lookup:
+            row = [float(v) for v in args.lookup.split(",")]
+            for path, handle, x, y in index.lookup(row, args.variant):
+                print(f"{path}  句柄 {handle}  位置 ({x:.3f}, {y:.3f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import numpy as np
+
+
+class Sheet:
+    """Fixed-size sheet that combined drawings are packed into.
+
+    Sheets are laid out left to right, sheet_gap apart; inside a sheet
+    boxes are packed on shelves from the top edge (y = 0) downwards, gap
+    apart. A box larger than the sheet gets a shelf, or a sheet, of its own
+    and that sheet grows to fit it, so nothing ever overlaps.
+    """
+
+    def __init__(self, width=20000.0, height=12000.0, gap=200.0, sheet_gap=2000.0, sort=True):
+        self.width = width
+        self.height = height
+        self.gap = gap
+        self.sheet_gap = sheet_gap
+        # 按高度从高到低排，货架利用率更高; False 时保持行的原有顺序
+        self.sort = sort
+
+    def __repr__(self):
+        return (f"Sheet(width={self.width!r}, height={self.height!r}, gap={self.gap!r}, "
+                f"sheet_gap={self.sheet_gap!r}, sort={self.sort!r})")
+
+    def pack(self, sizes):
+        """Packs boxes of the given (width, height) sizes.
+
+        Returns (positions, sheets): the lower-left corner of every box as
+        an (n, 2) array and the sheet number of every box. Sorting makes
+        this O(n log n); each sheet only keeps its own shelves.
+        """
+        sizes = np.asarray(sizes, dtype=np.float64).reshape(-1, 2)
+        n = len(sizes)
+        widths = (sizes[:, 0] + self.gap).tolist()
+        heights = (sizes[:, 1] + self.gap).tolist()
+        if self.sort:
+            order = np.argsort(-sizes[:, 1], kind="stable").tolist()
+        else:
+            order = range(n)
+
+        local = [None] * n
+        sheets = [0] * n
+        sheet_widths = []
+        shelves = []      # 当前图纸的货架: [顶部深度, 高度, 已用宽度]
+        depth = 0.0       # 当前图纸已用的高度
+        used_width = 0.0
+        for i in order:
+            w, h = widths[i], heights[i]
+            for shelf in shelves:
+                if h <= shelf[1] and shelf[2] + w <= self.width:
+                    break
+            else:
+                shelf = None
+            if shelf is None:
+                if shelves and depth + h > self.height:
+                    # 当前图纸放不下，换一张
+                    sheet_widths.append(used_width)
+                    shelves = []
+                    depth = 0.0
+                    used_width = 0.0
+                shelf = [depth, h, 0.0]
+                shelves.append(shelf)
+                depth += h
+            # 货架内顶部对齐
+            local[i] = (shelf[2], -shelf[0] - h)
+            sheets[i] = len(sheet_widths)
+            shelf[2] += w
+            used_width = max(used_width, shelf[2])
+        sheet_widths.append(used_width)
+
+        # 每张图纸的左边界，超宽的图纸把后面的往右推
+        origins = [0.0]
+        for used in sheet_widths[:-1]:
+            origins.append(origins[-1] + max(self.width, used) + self.sheet_gap)
+        positions = np.array(local, dtype=np.float64).reshape(-1, 2)
+        sheets = np.array(sheets, dtype=np.int64)
+        if n:
+            positions[:, 0] += np.array(origins)[sheets]
+        return positions, sheets
+
+    def place(self, boxes):
+        """Translations (dx, dy) that move each (min_x, min_y, max_x, max_y) box to its packed position."""
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        positions, _ = self.pack(boxes[:, 2:] - boxes[:, :2])
+        return positions - boxes[:, :2]
+
+
+def union_boxes(a, b):
+    """Element-wise union of two (n, 4) box arrays."""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    return np.concatenate([np.minimum(a[:, :2], b[:, :2]), np.maximum(a[:, 2:], b[:, 2:])], axis=1)
+
+
+def text_box(x, y, text, height):
+    """Rough box of a left aligned single line text: one character is about one text height wide."""
+    return x, y, x + len(text) * height, y + height
+
+
+def find_overlaps(boxes):
+    """Pairs (i, j) of boxes whose interiors intersect; touching edges do not count.
+
+    Sweeps along x so that only boxes whose x ranges meet are compared.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    order = np.argsort(boxes[:, 0], kind="stable").tolist()
+    rows = boxes.tolist()
+    overlaps = []
+    active = []
+    for i in order:
+        min_x, min_y, max_x, max_y = rows[i]
+        active = [j for j in active if rows[j][2] > min_x]
+        for j in active:
+            if rows[j][1] < max_y and min_y < rows[j][3]:
+                overlaps.append((min(i, j), max(i, j)))
+        active.append(i)
+    return overlaps
@@ -0,0 +1,76 @@
+import json
+import os
+
+from lmxCache import GENERATOR_VERSION, param_key
+
+# 记录每行参数哈希与输出文件的清单，保存在输出目录中
+MANIFEST_NAME = "lmx_manifest.json"
+
+
+def load_manifest(output_dir):
+    """Returns the rows recorded by the previous run, or [] if there is no usable manifest."""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if manifest.get("version") != GENERATOR_VERSION:
+        return []
+    return manifest.get("rows", [])
+
+
+def save_manifest(output_dir, entries):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": GENERATOR_VERSION, "rows": entries}, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Error deleting file {path}: {e}")
+
+
+def prepare_incremental(output_dir, data, variant, kind, filename_of):
+    """Works out which rows have to be regenerated in output_dir.
+
+    filename_of(i) gives the output file name of row i (0-based). Files of the
+    previous run that no row maps to any more are removed, and so are the
+    outdated files of changed rows. Files the manifest never recorded are left
+    alone. When several rows share one file, all of them are regenerated as
+    soon as one changes. Returns (entries, todo): the new manifest rows and
+    the indices of the rows to generate.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    previous = {item["index"]: item for item in load_manifest(output_dir)}
+
+    entries = []
+    todo = []
+    for i, row in enumerate(data):
+        entry = {"index": i + 1, "hash": param_key(row, variant, kind), "file": filename_of(i)}
+        entries.append(entry)
+        old = previous.get(i + 1)
+        path = os.path.join(output_dir, entry["file"])
+        if old is None or old["hash"] != entry["hash"] or old["file"] != entry["file"] \
+                or not os.path.exists(path):
+            todo.append(i)
+
+    # 多行共用一个文件时(合并输出)，其中任一行变化或被删掉，整份文件都要重画
+    current = {entry["file"] for entry in entries}
+    stale = {entries[i]["file"] for i in todo}
+    stale.update(old["file"] for old in previous.values()
+                 if old["index"] > len(entries) and old["file"] in current)
+    todo = [i for i, entry in enumerate(entries) if entry["file"] in stale]
+
+    # 删除已不属于任何行的旧文件，以及需要重新生成的文件
+    for name in {old["file"] for old in previous.values()} - current:
+        _remove(os.path.join(output_dir, name))
+    for name in stale:
+        _remove(os.path.join(output_dir, name))
+    return entries, todo
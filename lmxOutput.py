@@ -0,0 +1,84 @@
+import io
+import zipfile
+
+import ezdxf
+
+from rawDxf import RawDxfWriter, save_profiles
+
+# ezdxf 的 fmt 参数: asc = ASCII DXF, bin = 二进制 DXF
+FORMATS = ("asc", "bin")
+
+
+def check_format(backend, fmt):
+    """Raises ValueError for an unknown fmt or one the backend cannot write."""
+    if fmt not in FORMATS:
+        raise ValueError(f"未知的 fmt: {fmt}，应为 asc 或 bin")
+    if fmt == "bin" and backend == "raw":
+        raise ValueError("raw 后端只能写 ASCII DXF")
+
+
+def _document(profiles, labels):
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    for profile in profiles:
+        profile.add_to(msp)
+    for text, insert, height in labels:
+        msp.add_text(text, dxfattribs={"height": height, "insert": insert})
+    return doc
+
+
+def save_dxf(filename, profiles, labels=(), backend="ezdxf", fmt="asc"):
+    """Writes profiles and (text, insert, height) labels to one DXF file."""
+    check_format(backend, fmt)
+    if backend == "raw":
+        save_profiles(filename, profiles, labels)
+    else:
+        _document(profiles, labels).saveas(filename, fmt=fmt)
+
+
+def write_dxf(stream, profiles, labels=(), backend="ezdxf", fmt="asc"):
+    """Like save_dxf, into an open binary stream (a zip member, a BytesIO, ...); the stream stays open."""
+    check_format(backend, fmt)
+    profiles = list(profiles)
+    labels = list(labels)
+    if backend == "raw":
+        text = io.TextIOWrapper(stream, encoding="cp1252", newline="\n")
+        with RawDxfWriter(text, len(profiles) + len(labels)) as writer:
+            for profile in profiles:
+                writer.add_profile(profile)
+            for label, insert, height in labels:
+                writer.add_text(label, insert, height)
+    else:
+        doc = _document(profiles, labels)
+        if fmt == "bin":
+            doc.write(stream, fmt="bin")
+            return
+        # 与 saveas 相同的编码和错误处理
+        text = io.TextIOWrapper(stream, encoding=doc.output_encoding, errors="dxfreplace")
+        doc.write(text)
+    text.flush()
+    text.detach()
+
+
+def dxf_bytes(profiles, labels=(), backend="ezdxf", fmt="asc"):
+    """One DXF file as bytes, written in memory."""
+    buffer = io.BytesIO()
+    write_dxf(buffer, profiles, labels, backend, fmt)
+    return buffer.getvalue()
+
+
+def write_zip(archive, named_profiles, backend="ezdxf", fmt="asc", compression=zipfile.ZIP_DEFLATED):
+    """Streams one DXF per (name, profile) pair straight into a zip archive.
+
+    archive is a file name or a writable binary file object. Each member is
+    written through ZipFile.open, so no file is created on disk and only one
+    drawing is in memory at a time. Returns the number of members.
+    """
+    check_format(backend, fmt)
+    count = 0
+    with zipfile.ZipFile(archive, "w", compression) as zf:
+        for name, profile in named_profiles:
+            with zf.open(name, "w") as member:
+                write_dxf(member, [profile], (), backend, fmt)
+            count += 1
+    return count
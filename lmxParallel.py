@@ -0,0 +1,76 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lmxOutput import save_dxf
+from lmxProfile import profiles_from_batch
+
+
+def _write_chunk(indices, rows, output_dir, variant, backend, fmt="asc"):
+    """Worker: computes one chunk of rows and saves each as lmx{i}.dxf."""
+    profiles = profiles_from_batch(rows, variant)
+    manifest = []
+    for index, profile in zip(indices, profiles):
+        t0 = time.perf_counter()
+        filename = os.path.join(output_dir, f"lmx{index}.dxf")
+        save_dxf(filename, [profile], backend=backend, fmt=fmt)
+        manifest.append({
+            "index": index,
+            "path": filename,
+            "seconds": time.perf_counter() - t0,
+            "pid": os.getpid(),
+        })
+    return manifest
+
+
+def draw_multiple_parallel(data, output_dir="dxf", variant="multiLmx", workers=None, chunk_size=64,
+                           backend="ezdxf", cache=None, indices=None, fmt="asc"):
+    """Writes lmx{i}.dxf for every row of data on a process pool.
+
+    Only the 0-based row indices given (default: all rows) are written.
+    Rows are sent to the workers in chunks of chunk_size; workers (default:
+    os.cpu_count()) write the files themselves, with ezdxf or with the
+    rawDxf streaming writer (backend="raw"), as ASCII or binary DXF (fmt). Cache hits are linked in this
+    process and never reach the pool. Returns the manifest, one dict per row
+    with its index, path, write time in seconds and worker pid (None for
+    cache hits), sorted by index.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size 必须至少为 1")
+    os.makedirs(output_dir, exist_ok=True)
+    rows = [list(row) for row in data]
+    # 缓存中 ASCII 与二进制文件分开存
+    kind = backend if fmt == "asc" else f"{backend}+{fmt}"
+
+    manifest = []
+    pending = []
+    if indices is None:
+        indices = range(len(rows))
+    for i in indices:
+        row = rows[i]
+        filename = os.path.join(output_dir, f"lmx{i + 1}.dxf")
+        t0 = time.perf_counter()
+        if cache is not None and cache.fetch_dxf(row, variant, kind, filename):
+            manifest.append({
+                "index": i + 1,
+                "path": filename,
+                "seconds": time.perf_counter() - t0,
+                "pid": None,
+            })
+        else:
+            pending.append(i)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            futures.append(pool.submit(_write_chunk, [i + 1 for i in chunk], [rows[i] for i in chunk],
+                                       output_dir, variant, backend, fmt))
+        for future in futures:
+            written = future.result()
+            if cache is not None:
+                for item in written:
+                    cache.store_dxf(rows[item["index"] - 1], variant, kind, item["path"])
+            manifest.extend(written)
+    manifest.sort(key=lambda item: item["index"])
+    return manifest
@@ -0,0 +1,329 @@
+"""Updating single rows of a combined drawing without rebuilding it.
+
+    python lmxPatch.py result.dxf 17=190,230,110,50,260,4 18=198,230,30,0,260,5
+
+multi-super.draw_all_in_one and Gemini2.5.draw_multiple_in_one_file with
+row_map=True write a sidecar <name>.rows.json next to the DXF: for every
+row its parameters, number, layout slot (dx, dy) and the handles of the
+entities it put into model space (polyline or INSERT, label, dimensions).
+patch_rows lets the script draw only the changed rows, at the same slots,
+and swaps their entities into the file (see patch_rows).
+"""
+import argparse
+import io
+import json
+import os
+import re
+import shutil
+
+import ezdxf
+
+from lmxPreflight import preflight
+from lmxScripts import load_script
+from lmxShard import MODEL_SPACE, VARIANTS, read_pairs
+from rawDxf import RESERVED_HANDSEED
+
+_BLOCK_RECORDS = re.compile(r"  0\nBLOCK_RECORD\n(?:(?!  0\n).*\n)*?  2\n(.*)\n")
+
+
+def row_map_path(filename):
+    return os.path.splitext(filename)[0] + ".rows.json"
+
+
+def _signature(filename):
+    stat = os.stat(filename)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def row_handles(layout, first, counts):
+    """Handles of the entities each row added, given how many entities each row added to layout from index first."""
+    entities = list(layout)[first:]
+    handles = []
+    start = 0
+    for count in counts:
+        handles.append([entity.dxf.handle for entity in entities[start:start + count]])
+        start += count
+    return handles
+
+
+def save_row_map(filename, script, options, rows, numbers, offsets, handles):
+    """Writes the sidecar of a drawing that was just saved as filename; offsets[i] is None for skipped rows."""
+    with open(row_map_path(filename), "w", encoding="utf-8") as f:
+        json.dump({
+            "script": script,
+            "options": options,
+            "dxf": _signature(filename),
+            "rows": [{"number": number, "row": list(row), "offset": None if offset is None else list(offset),
+                      "handles": row_handles}
+                     for row, number, offset, row_handles in zip(rows, numbers, offsets, handles)],
+        }, f, ensure_ascii=False)
+
+
+def load_row_map(filename):
+    """Reads the sidecar of filename; raises ValueError when it is missing or the drawing changed since."""
+    path = row_map_path(filename)
+    if not os.path.exists(path):
+        raise ValueError(f"没有 {os.path.basename(path)}，生成时需要 row_map=True")
+    with open(path, encoding="utf-8") as f:
+        row_map = json.load(f)
+    if row_map["dxf"] != _signature(filename):
+        raise ValueError(f"{os.path.basename(filename)} 在生成之后被修改过，句柄可能已经失效")
+    return row_map
+
+
+def _draw_rows(module, row_map, numbers, rows):
+    # 在一个新文档里画出所有新行，返回文档和每行新实体的句柄
+    doc = ezdxf.new()
+    if hasattr(module, "setup_dimstyle"):
+        module.setup_dimstyle(doc)
+    msp = doc.modelspace()
+    handles = []
+    for number, row in zip(numbers, rows):
+        entry = row_map["rows"][number - 1]
+        before = len(msp)
+        module.redraw_row(doc, msp, row, entry["offset"], entry["number"], **row_map["options"])
+        # 新实体都追加在模型空间末尾
+        handles.append([msp[k].dxf.handle for k in range(before, len(msp))])
+    return doc, handles
+
+
+def _records(pairs):
+    # (组码, 值) 对按组码 0 分成一条条记录(实体、表项、BLOCK、ENDBLK); 第一个 0 之前的表头不要
+    records = []
+    for pair in pairs:
+        if pair[0] == "  0\n":
+            records.append([])
+        if records:
+            records[-1].append(pair)
+    return records
+
+
+def _value(record, code):
+    for tag, value in record:
+        if tag == code:
+            return value[:-1]
+    return None
+
+
+def _section(text, name, end="  0\nENDSEC\n"):
+    # 段(或表)的内容，不含开头和结尾的标记，拆成记录
+    start = text.index(name) + len(name)
+    lines = text[start:text.index(end, start)].splitlines(keepends=True)
+    return _records(zip(lines[0::2], lines[1::2]))
+
+
+def _new_objects(doc, target_names, last_anonymous):
+    """Records of doc that the target file needs for doc's model space entities: (block records, blocks,
+    entities). Blocks the target already has are left out; anonymous *D blocks are renamed past the
+    target's highest number."""
+    stream = io.StringIO()
+    doc.write(stream)
+    text = stream.getvalue()
+    records = {_value(record, "  2\n"): record
+               for record in _section(text, "  0\nTABLE\n  2\nBLOCK_RECORD\n", "  0\nENDTAB\n")}
+    blocks = {}
+    for record in _section(text, "  2\nBLOCKS\n"):
+        if record[0][1] == "BLOCK\n":
+            name = _value(record, "  2\n")
+            blocks[name] = []
+        blocks[name].append(record)
+    entities = _section(text, "  2\nENTITIES\n")
+
+    # 从模型空间实体出发，收集引用到的、目标文件里还没有的块(块里的标注又引用 *D 块)
+    renames = {}
+    needed = []
+    pending = [record for record in entities]
+    while pending:
+        record = pending.pop()
+        if record[0][1] not in ("INSERT\n", "DIMENSION\n"):
+            continue
+        name = _value(record, "  2\n")
+        if name in renames or name in needed or (name in target_names and not name.startswith("*D")):
+            continue
+        if name.startswith("*D"):
+            last_anonymous += 1
+            renames[name] = f"*D{last_anonymous}"
+        needed.append(name)
+        pending.extend(blocks[name])
+    return [records[name] for name in needed], [record for name in needed for record in blocks[name]], entities, \
+        renames, records["*Model_Space"], text
+
+
+def _splice(filename, output_filename, deleted, doc):
+    """Streams filename to output_filename without the deleted handles and with doc's model space
+    entities (and the block definitions they need) added under fresh handles. Returns {old handle in
+    doc: new handle}, or None when the file cannot be patched this way."""
+    with open(filename, encoding="utf-8") as f:
+        pairs = read_pairs(f)
+        head = []
+        for code, value in pairs:
+            head.append(code + value)
+            if code == "  2\n" and value == "ENTITIES\n":
+                break
+        head = "".join(head)
+        seed_tag = "  9\n$HANDSEED\n  5\n"
+        seed_start = head.index(seed_tag) + len(seed_tag)
+        seed_end = head.index("\n", seed_start)
+        seed = int(head[seed_start:seed_end], 16)
+        if seed == RESERVED_HANDSEED:
+            return None
+        table = re.search(r"  0\nTABLE\n  2\nBLOCK_RECORD\n  5\n([0-9A-F]+)\n", head)
+        table_end = head.index("  0\nENDTAB\n", table.end())
+        blocks_end = head.index("  0\nENDSEC\n", head.index("  2\nBLOCKS\n"))
+        names = set(_BLOCK_RECORDS.findall(head))
+        last_anonymous = max([int(name[2:]) for name in names if re.fullmatch(r"\*D\d+", name)] or [0])
+        records, blocks, entities, renames, scratch_msp, text = _new_objects(doc, names, last_anonymous)
+        scratch_table = re.search(r"  0\nTABLE\n  2\nBLOCK_RECORD\n  5\n([0-9A-F]+)\n", text).group(1)
+
+        # 新对象的句柄从 $HANDSEED 往后接着编; 指向新文档模型空间和块表的引用改成本文件的
+        handles = {}
+        for record in records + blocks + entities:
+            handle = _value(record, "  5\n")
+            handles[handle] = f"{seed:X}"
+            seed += 1
+        handles[_value(scratch_msp, "  5\n")] = MODEL_SPACE.search(head).group(1)
+        handles[scratch_table] = table.group(1)
+        handles["0"] = "0"
+
+        def dump(records):
+            out = []
+            for record in records:
+                for code, value in record:
+                    if code in ("  5\n", "330\n", "340\n", "360\n", "1005\n"):
+                        value = handles.get(value[:-1])
+                        if value is None:
+                            return None  # 引用了新文档里的其它对象，不能直接搬过来
+                        value += "\n"
+                    elif code in ("  2\n", "  3\n") and value[:-1] in renames:
+                        value = renames[value[:-1]] + "\n"
+                    out.append(code + value)
+            return "".join(out)
+
+        records, blocks, entities = dump(records), dump(blocks), dump(entities)
+        if records is None or blocks is None or entities is None:
+            return None
+
+        partial = output_filename + ".part"
+        with open(partial, "w", encoding="utf-8", newline="\n") as out:
+            out.write(head[:seed_start] + f"{seed:X}" + head[seed_end:table_end] + records
+                      + head[table_end:blocks_end] + blocks + head[blocks_end:])
+            entity = []
+            keep = True
+            for code, value in pairs:
+                if code == "  0\n":
+                    if keep:
+                        out.write("".join(entity))
+                    if value == "ENDSEC\n":
+                        out.write(entities)
+                        out.write(code + value)
+                        break
+                    entity = []
+                    keep = True
+                elif code == "  5\n" and len(entity) == 1:
+                    # 组码 5 紧跟在实体类型后面
+                    keep = value.strip() not in deleted
+                entity.append(code + value)
+            shutil.copyfileobj(f, out)
+    os.replace(partial, output_filename)
+    return handles
+
+
+def _rebuild(filename, output_filename, entries, numbers, module, row_map, rows):
+    # 退路: 用 ezdxf 读入整个文档，删掉旧实体再画新行
+    doc = ezdxf.readfile(filename)
+    msp = doc.modelspace()
+    for number in numbers:
+        for handle in entries[number - 1]["handles"]:
+            entity = doc.entitydb.get(handle)
+            if entity is None or not entity.is_alive:
+                continue
+            # 标注的几何在匿名块 *D 里，一起删掉
+            geometry = entity.dxf.get("geometry") if entity.dxftype() == "DIMENSION" else None
+            msp.delete_entity(entity)
+            if geometry and geometry in doc.blocks:
+                doc.blocks.delete_block(geometry, safe=False)
+    for number, row in zip(numbers, rows):
+        entry = entries[number - 1]
+        before = len(msp)
+        module.redraw_row(doc, msp, row, entry["offset"], entry["number"], **row_map["options"])
+        entry["handles"] = [msp[k].dxf.handle for k in range(before, len(msp))]
+    doc.saveas(output_filename)
+
+
+def patch_rows(filename, changes, output_filename=None):
+    """Replaces rows of a combined drawing made with row_map=True.
+
+    changes maps 1-based row numbers (positions in the original data) to new
+    [a, b, c, d, h, n] rows. Each new row is drawn at its old row's slot with
+    the options of the original run; a larger outline may reach into its
+    neighbours, and labels go to their default position (avoid_overlaps is
+    not repeated). New rows go through lmxPreflight and a bad one raises
+    ValueError before anything is changed.
+
+    The new rows are drawn into a scratch document and their entities, with
+    the block definitions they need (new LMX_ blocks, *D blocks of
+    DIMENSION entities), are spliced into the file tag by tag in place of
+    the old ones, so nothing else is parsed or rebuilt. The *D blocks of
+    deleted dimensions stay in the file unreferenced (AutoCAD purges them
+    on open). Files whose $HANDSEED is rawDxf's reserved value go through
+    ezdxf instead. The drawing and its sidecar are saved to
+    output_filename (default: in place). Returns (entities deleted,
+    entities added).
+    """
+    row_map = load_row_map(filename)
+    script = row_map["script"]
+    entries = row_map["rows"]
+    numbers = sorted(changes)
+    for number in numbers:
+        if not 1 <= number <= len(entries):
+            raise ValueError(f"没有第 {number} 行，图纸共 {len(entries)} 行")
+        if entries[number - 1]["offset"] is None:
+            raise ValueError(f"第 {number} 行生成时被跳过，没有位置可以更新")
+    rows = [list(changes[number]) for number in numbers]
+    # 与 lmxShard 相同的脚本 -> 变体对应
+    preflight(rows, VARIANTS[script], "abort")
+
+    module = load_script(script)
+    output_filename = output_filename or filename
+    deleted = sum(len(entries[number - 1]["handles"]) for number in numbers)
+    doc, new_handles = _draw_rows(module, row_map, numbers, rows)
+    old = {handle for number in numbers for handle in entries[number - 1]["handles"]}
+    handles = _splice(filename, output_filename, old, doc)
+    if handles is None:
+        _rebuild(filename, output_filename, entries, numbers, module, row_map, rows)
+    else:
+        for number, row_handles in zip(numbers, new_handles):
+            entries[number - 1]["handles"] = [handles[handle] for handle in row_handles]
+    for number, row in zip(numbers, rows):
+        entries[number - 1]["row"] = row
+
+    row_map["dxf"] = _signature(output_filename)
+    with open(row_map_path(output_filename), "w", encoding="utf-8") as f:
+        json.dump(row_map, f, ensure_ascii=False)
+    added = sum(len(entries[number - 1]["handles"]) for number in numbers)
+    return deleted, added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="只更新合并图纸中改动的行")
+    parser.add_argument("dxf", help="用 row_map=True 生成的 DXF")
+    parser.add_argument("changes", nargs="+", help="行号=a,b,c,d,h,n")
+    parser.add_argument("-o", "--output", help="另存为，默认覆盖原文件")
+    args = parser.parse_args()
+    changes = {}
+    for change in args.changes:
+        number, _, values = change.partition("=")
+        try:
+            values = [float(v) for v in values.split(",")]
+            changes[int(number)] = values[:5] + [int(values[5])]
+        except (ValueError, IndexError):
+            raise SystemExit(f"无法识别 {change}，应为 行号=a,b,c,d,h,n")
+    try:
+        deleted, added = patch_rows(args.dxf, changes, args.output)
+    except ValueError as e:
+        raise SystemExit(f"无法更新: {e}")
+    print(f"已更新 {len(changes)} 行: 删除 {deleted} 个实体，新增 {added} 个")
+
+
+if __name__ == "__main__":
+    main()
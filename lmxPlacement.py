@@ -0,0 +1,138 @@
+import math
+
+
+def _segment_hits_box(x1, y1, x2, y2, box):
+    """True if the segment (x1, y1)-(x2, y2) crosses the interior of box (Liang-Barsky clipping)."""
+    min_x, min_y, max_x, max_y = box
+    dx, dy = x2 - x1, y2 - y1
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, x1 - min_x), (dx, max_x - x1), (-dy, y1 - min_y), (dy, max_y - y1)):
+        if p == 0:
+            if q <= 0:
+                return False
+        else:
+            t = q / p
+            if p < 0:
+                if t > t1:
+                    return False
+                t0 = max(t0, t)
+            else:
+                if t < t0:
+                    return False
+                t1 = min(t1, t)
+    return t0 < t1
+
+
+def _boxes_hit(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+class GridIndex:
+    """Uniform grid over segments and boxes for fast collision queries.
+
+    Every item is registered in all cells its bounding box touches, so an
+    insert or a query only looks at the few cells around it. With a cell
+    size close to the typical item size the total cost stays near linear in
+    the number of items.
+    """
+
+    def __init__(self, cell_size=200.0):
+        self.cell_size = float(cell_size)
+        self._cells = {}
+        self._items = []   # (kind, geometry): ("seg", (x1, y1, x2, y2)) 或 ("box", box)
+
+    def _keys(self, box):
+        size = self.cell_size
+        x0, y0 = math.floor(box[0] / size), math.floor(box[1] / size)
+        x1, y1 = math.floor(box[2] / size), math.floor(box[3] / size)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield cx, cy
+
+    def _insert(self, item, box):
+        index = len(self._items)
+        self._items.append(item)
+        cells = self._cells
+        for key in self._keys(box):
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = [index]
+            else:
+                cell.append(index)
+
+    def add_segment(self, x1, y1, x2, y2):
+        self._insert(("seg", (x1, y1, x2, y2)), (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)))
+
+    def add_polyline(self, points, close=True):
+        """Adds the edges of a point sequence [(x, y), ...]."""
+        points = list(points)
+        pairs = zip(points, points[1:] + points[:1] if close else points[1:])
+        for (x1, y1), (x2, y2) in pairs:
+            self.add_segment(x1, y1, x2, y2)
+
+    def add_box(self, box):
+        self._insert(("box", tuple(box)), box)
+
+    def hits(self, box):
+        """True if box overlaps any segment or box in the index; touching does not count."""
+        seen = set()
+        items = self._items
+        for key in self._keys(box):
+            for index in self._cells.get(key, ()):
+                if index in seen:
+                    continue
+                seen.add(index)
+                kind, geometry = items[index]
+                if kind == "box":
+                    if _boxes_hit(box, geometry):
+                        return True
+                elif _segment_hits_box(*geometry, box):
+                    return True
+        return False
+
+
+class Placer:
+    """Picks collision-free positions for labels and dimension text.
+
+    Profile outlines and everything already placed are kept in a GridIndex.
+    place() takes candidate boxes in order of preference, returns the index
+    of the first one that is free and reserves it; when all candidates
+    collide, the first one is used and counted in self.collisions. Only
+    registered geometry is avoided, so callers also add the dimensions they
+    draw (see lmxDims.LightDims.reserve).
+    """
+
+    def __init__(self, cell_size=200.0):
+        self.index = GridIndex(cell_size)
+        self.collisions = 0
+
+    def add_profile(self, profile, dx=0.0, dy=0.0):
+        """Registers the outline of an lmxProfile.Profile, moved by (dx, dy)."""
+        it = iter(profile.coords.tolist())
+        self.index.add_polyline([(x + dx, y + dy) for x, y in zip(it, it)])
+
+    def add_box(self, box):
+        self.index.add_box(box)
+
+    def place(self, candidates):
+        for i, box in enumerate(candidates):
+            if not self.index.hits(box):
+                self.index.add_box(box)
+                return i
+        self.collisions += 1
+        self.index.add_box(candidates[0])
+        return 0
+
+
+def rotated_text_box(x, y, text, height, rotation=0.0, width_factor=1.0):
+    """Axis aligned box around a text centred at (x, y) and rotated by rotation degrees.
+
+    A character is taken to be width_factor * height wide.
+    """
+    half_w = len(text) * height * width_factor / 2
+    half_h = height / 2
+    angle = math.radians(rotation)
+    c, s = abs(math.cos(angle)), abs(math.sin(angle))
+    ex = half_w * c + half_h * s
+    ey = half_w * s + half_h * c
+    return x - ex, y - ey, x + ex, y + ey
@@ -0,0 +1,153 @@
+"""Vectorized preflight check of a parameter batch, before any DXF work starts.
+
+    python lmxPreflight.py rows.jsonl                  # 打印检查报告
+    python lmxPreflight.py rows.csv --variant multi-super --json report.json
+
+Every row is classified at once with NumPy:
+
+    ok                 正常
+    degenerate         参数不是有限数字、a/b/h 不大于 0、n 不是整数或有效 n 小于 1
+    inverted_top       h 不高于齿尖(或 A、D 点)，顶边 E-F 落到锯齿下面，图形上下颠倒
+    self_overlapping   c 或 d 为负，端部斜边折回; 或只有一个齿且 c、d 都为 0，两条侧边重合没有面积;
+                       Gemini2.5 的 F-A 边穿过锯齿或与 D-E 相交
+
+The outline is a chain A, B, peaks and valleys, D (each step moves right
+when c, d >= 0), closed by D-E and F-A on two parallel lines and the top
+edge E-F. With c, d >= 0 and h above the chain (not inverted_top) it is a
+simple polygon unless those two side lines coincide, which is the second
+self_overlapping case. When a variant keeps A or B with d = 0, F-A runs
+back over the first rise: zero area, and what the original scripts draw.
+
+Gemini2.5 puts F at f3 / tan(A), so F-A is not parallel to D-E. Its row is
+self_overlapping as well when the first peak is not below the line F-A
+(the side cuts through the teeth) or F is not left of E (the two sides
+cross below the top edge).
+"""
+import argparse
+import json
+
+import numpy as np
+
+from lmxBatch import VARIANTS, as_params, tooth_counts
+
+STATUSES = ("ok", "degenerate", "inverted_top", "self_overlapping")
+POLICIES = ("skip", "abort")
+
+# 问题编号 -> (状态, 说明); 0 为正常
+_REASONS = (
+    ("ok", ""),
+    ("degenerate", "参数不是有限数字"),
+    ("degenerate", "a(步高) 和 b(步宽) 必须大于 0"),
+    ("degenerate", "h(总高度) 必须大于 0"),
+    ("degenerate", "n(顶点个数) 必须是不小于 1 的整数"),
+    ("inverted_top", "h 不高于齿尖，顶边落到锯齿下面"),
+    ("self_overlapping", "c 或 d 为负，端部斜边折回"),
+    ("self_overlapping", "只有一个齿且 c、d 都为 0，两条侧边重合，图形没有面积"),
+    ("self_overlapping", "第一个齿尖不在 F-A 边下方，左侧边穿过锯齿"),
+    ("self_overlapping", "F 点在 E 点右侧，两条侧边在顶边下方相交"),
+)
+_STATUS_CODES = np.array([STATUSES.index(status) for status, _ in _REASONS], dtype=np.int8)
+
+
+def _reasons(params, variant):
+    # 每行的问题编号，几个问题同时存在时取编号最小的
+    a, b, c, d, h, n = params.T
+    reason = np.zeros(len(params), dtype=np.int8)
+    # 与 lmxBatch.draw_batch 相同的几何: 齿尖高度、A 点和 D 点的高度
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        angle_a = np.arctan(a / b)
+        sin_a = np.sin(angle_a)
+        peak_y = np.cos(angle_a) * a
+        top = np.maximum(peak_y, np.maximum(sin_a * d, peak_y - sin_a * c))
+        teeth = tooth_counts(np.nan_to_num(params), variant)
+        n_ok = (n == np.round(n)) & (teeth >= 1)
+        if VARIANTS[variant][3]:
+            # Gemini2.5: F-A 从 A 点以斜率 tan(A) 上升，与 D-E 不平行，侧边不会重合
+            width = np.ones(len(params))
+            tan_a = np.tan(angle_a)
+            peak_x = np.cos(angle_a) * d + sin_a * a
+            crosses = peak_y >= sin_a * d + peak_x * tan_a
+            d_x = np.cos(angle_a) * c + peak_x + (teeth - 1) * b / np.cos(angle_a)
+            e_x = d_x + (h - (peak_y - sin_a * c)) * tan_a
+            reversed_top = (h - sin_a * d) / tan_a >= e_x
+        else:
+            # 两条侧边 F-A 与 D-E 平行，沿齿面方向相距 d + (齿数 - 1) * b + c
+            width = d + (teeth - 1) * b + c
+            crosses = reversed_top = np.zeros(len(params), dtype=bool)
+    checks = (
+        ~np.isfinite(params).all(axis=1),
+        (a <= 0) | (b <= 0),
+        h <= 0,
+        ~n_ok,
+        h <= top,
+        (c < 0) | (d < 0),
+        width <= 0,
+        crosses,
+        reversed_top,
+    )
+    # 从后往前覆盖，编号小的优先
+    for code in range(len(checks), 0, -1):
+        reason[checks[code - 1]] = code
+    return reason
+
+
+def classify(data, variant="multiLmx"):
+    """Status code of every row, an int8 array indexing STATUSES (0 = ok)."""
+    return _STATUS_CODES[_reasons(as_params(data), variant)]
+
+
+def preflight(data, variant="multiLmx", policy="skip", start=0):
+    """Checks a whole batch and returns a report dict:
+
+        rows       行数
+        ok         可以生成的行，0 起的下标列表
+        counts     {status: 行数}
+        problems   [{"row": 1 起的行号 (加上 start), "status": ..., "reason": ...}, ...]
+
+    policy="abort" raises ValueError naming the first bad rows instead, so a
+    job stops before it writes anything; with "skip" the caller generates
+    only report["ok"]. start offsets the reported row numbers when data is
+    one chunk of a longer input.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"未知的 policy: {policy}，应为 skip 或 abort")
+    if variant not in VARIANTS:
+        raise ValueError(f"未知的 variant: {variant}")
+    reason = _reasons(as_params(data), variant)
+    status = _STATUS_CODES[reason]
+    bad = np.flatnonzero(reason).tolist()
+    problems = [{"row": start + i + 1, "status": _REASONS[k][0], "reason": _REASONS[k][1]}
+                for i, k in zip(bad, reason[bad].tolist())]
+    if problems and policy == "abort":
+        shown = "; ".join(f"第 {p['row']} 行 {p['reason']}" for p in problems[:5])
+        more = f" 等 {len(problems)} 行" if len(problems) > 5 else ""
+        raise ValueError(f"{shown}{more}")
+    return {
+        "rows": len(status),
+        "ok": np.flatnonzero(status == 0).tolist(),
+        "counts": {name: int(count) for name, count in zip(STATUSES, np.bincount(status, minlength=len(STATUSES)))},
+        "problems": problems,
+    }
+
+
+def main():
+    from lmxStream import read_rows
+
+    parser = argparse.ArgumentParser(description="检查参数文件中的每一行")
+    parser.add_argument("input", help=".json、.jsonl 或 .csv 参数文件")
+    parser.add_argument("--variant", default="multiLmx", choices=tuple(VARIANTS))
+    parser.add_argument("--json", help="把完整报告写到这个 JSON 文件")
+    args = parser.parse_args()
+    report = preflight(list(read_rows(args.input)), args.variant)
+    print(f"{report['rows']} 行: " + ", ".join(f"{name} {count}" for name, count in report["counts"].items()))
+    for problem in report["problems"][:20]:
+        print(f"  第 {problem['row']} 行 [{problem['status']}] {problem['reason']}")
+    if len(report["problems"]) > 20:
+        print(f"  ... 共 {len(report['problems'])} 行有问题")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({key: value for key, value in report.items() if key != "ok"}, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    main()
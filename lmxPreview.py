@@ -0,0 +1,215 @@
+"""Thumbnails of the outlines for the entry forms, without writing a DXF.
+
+    python lmxPreview.py rows.json -o previews/                 # 每行一个 N.svg
+    python lmxPreview.py rows.json -o previews/ --png --size 160
+
+previews() computes all rows with lmxBatch.draw_batch, scales every row
+into a size x size square with a few array operations and writes each
+outline as one SVG polygon (or draws it with Pillow for PNG, if installed).
+Rows that lmxPreflight rejects get a red placeholder with the reason as
+tooltip, so a typo shows up in the table right away. Thumbnails are kept in
+a PreviewCache keyed by lmxCache.param_key; 50 rows take a few ms.
+"""
+import argparse
+import base64
+import html
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from lmxBatch import VARIANTS, as_params, draw_batch
+from lmxCache import param_key
+from lmxPreflight import preflight
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:  # PNG 预览是可选的，SVG 不需要
+    Image = ImageDraw = None
+
+FORMATS = ("svg", "png")
+MARGIN = 4           # 缩略图四周留白，像素
+STROKE = "#4a90e2"
+FILL = "#e8f0fb"
+ERROR = "#dc3545"
+PNG_THREADS = 16     # 缺失的 PNG 多于这个数时用线程池并行编码
+
+
+class PreviewCache:
+    """Thread-safe in-process LRU of rendered thumbnails, bounded by entry count."""
+
+    def __init__(self, maxsize=8192):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+def fit_square(x, y, offsets, size, margin=MARGIN):
+    """Pixel coordinates of every vertex, each row scaled to fit a size x size square (y pointing down)."""
+    start = offsets[:-1]
+    counts = np.diff(offsets)
+    min_x = np.minimum.reduceat(x, start)
+    min_y = np.minimum.reduceat(y, start)
+    width = np.maximum.reduceat(x, start) - min_x
+    height = np.maximum.reduceat(y, start) - min_y
+    # 保持长宽比，较长的一边占满，另一边居中
+    scale = (size - 2 * margin) / np.maximum(np.maximum(width, height), 1e-9)
+    left = margin + (size - 2 * margin - width * scale) / 2
+    bottom = size - margin - (size - 2 * margin - height * scale) / 2
+    px = left.repeat(counts) + (x - min_x.repeat(counts)) * scale.repeat(counts)
+    py = bottom.repeat(counts) - (y - min_y.repeat(counts)) * scale.repeat(counts)
+    return px, py
+
+
+def _svg(points, size):
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {size} {size}">'
+            f'<polygon points="{points}" fill="{FILL}" stroke="{STROKE}" stroke-width="1"/></svg>')
+
+
+def _error_svg(size, reason):
+    m = MARGIN
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {size} {size}">'
+            f'<title>{html.escape(reason)}</title><path d="M{m} {m}L{size - m} {size - m}M{size - m} {m}L{m} {size - m}" '
+            f'stroke="{ERROR}" stroke-width="2"/></svg>')
+
+
+def _png(points, size):
+    image = Image.new("RGB", (size, size), "white")
+    draw = ImageDraw.Draw(image)
+    if points is None:
+        m = MARGIN
+        draw.line([(m, m), (size - m, size - m)], fill=ERROR, width=2)
+        draw.line([(size - m, m), (m, size - m)], fill=ERROR, width=2)
+    else:
+        draw.polygon(points, fill=FILL, outline=STROKE)
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def previews(data, variant="multiLmx", fmt="svg", size=120, cache=None, workers=None):
+    """Thumbnails of all rows in order: SVG text for fmt="svg", PNG bytes for fmt="png".
+
+    Only rows missing from cache (a PreviewCache) are computed, all in one
+    draw_batch call. PNG needs Pillow (ValueError otherwise); more than
+    PNG_THREADS of them are encoded on a thread pool of workers threads.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"未知的预览格式: {fmt}")
+    if fmt == "png" and Image is None:
+        raise ValueError("PNG 预览需要安装 Pillow")
+    if variant not in VARIANTS:
+        raise ValueError(f"未知的 variant: {variant}")
+    size = int(size)
+    if not 16 <= size <= 1024:
+        raise ValueError("size 应在 16 到 1024 之间")
+    params = as_params(data)
+    # 非有限数或非整数 n 的行不进缓存(param_key 会把 n 取整)，每次都按无效行重画
+    cacheable = np.isfinite(params).all(axis=1) & (params[:, 5] == np.round(params[:, 5]))
+    keys = [param_key(row, variant, f"{fmt}{size}") if ok else None
+            for row, ok in zip(params.tolist(), cacheable.tolist())]
+    result = [None if cache is None or key is None else cache.get(key) for key in keys]
+    # 同一批里重复的参数只画一次
+    missing = {}
+    for i, entry in enumerate(result):
+        if entry is None:
+            missing.setdefault(keys[i] or i, i)
+    if not missing:
+        return result
+
+    rows = list(missing.values())
+    report = preflight(params[rows], variant, "skip")
+    reasons = {problem["row"] - 1: problem["reason"] for problem in report["problems"]}
+    # 每个缺失行的多边形顶点: SVG 为 "x,y x,y ..."，PNG 为 [(x, y), ...]; 无效行为 None
+    shapes = [None] * len(rows)
+    if report["ok"]:
+        x, y, offsets = draw_batch(params[[rows[k] for k in report["ok"]]], variant)
+        px, py = fit_square(x, y, offsets, size)
+        if fmt == "svg":
+            text = np.char.add(np.char.add(np.round(px, 1).astype(str), ","), np.round(py, 1).astype(str))
+            for k, start, end in zip(report["ok"], offsets[:-1].tolist(), offsets[1:].tolist()):
+                shapes[k] = " ".join(text[start:end].tolist())
+        else:
+            points = list(zip(px.tolist(), py.tolist()))
+            for k, start, end in zip(report["ok"], offsets[:-1].tolist(), offsets[1:].tolist()):
+                shapes[k] = points[start:end]
+
+    if fmt == "svg":
+        rendered = [_error_svg(size, reasons[k]) if shape is None else _svg(shape, size)
+                    for k, shape in enumerate(shapes)]
+    elif len(shapes) > PNG_THREADS and workers != 1:
+        # Pillow 画图和 zlib 压缩时释放 GIL，线程就够，不必起进程
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(_png, shapes, [size] * len(shapes)))
+    else:
+        rendered = [_png(shape, size) for shape in shapes]
+
+    done = dict(zip(missing, rendered))
+    for i, entry in enumerate(result):
+        if entry is None:
+            key = keys[i] or i
+            result[i] = done[key]
+            if cache is not None and keys[i] is not None:
+                cache.put(key, done[key])
+    return result
+
+
+def data_url(png):
+    """PNG bytes as a data: URL for an <img> in the forms."""
+    return "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+
+
+def main():
+    from lmxStream import read_rows
+
+    parser = argparse.ArgumentParser(description="直接从顶点生成每行的 SVG/PNG 缩略图")
+    parser.add_argument("input", help="参数文件 (.json/.jsonl/.csv)")
+    parser.add_argument("-o", "--output", default="previews", help="输出目录")
+    parser.add_argument("--variant", default="multiLmx", choices=tuple(VARIANTS))
+    parser.add_argument("--png", action="store_true", help="输出 PNG(需要 Pillow)，默认 SVG")
+    parser.add_argument("--size", type=int, default=120, help="缩略图边长，像素")
+    args = parser.parse_args()
+    data = list(read_rows(args.input))
+    fmt = "png" if args.png else "svg"
+    t0 = time.perf_counter()
+    try:
+        images = previews(data, args.variant, fmt, args.size)
+    except ValueError as e:
+        raise SystemExit(f"无法生成预览: {e}")
+    seconds = time.perf_counter() - t0
+    os.makedirs(args.output, exist_ok=True)
+    for i, image in enumerate(images):
+        path = os.path.join(args.output, f"{i + 1}.{fmt}")
+        if fmt == "svg":
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(image)
+        else:
+            with open(path, "wb") as f:
+                f.write(image)
+    print(f"{len(images)} 个预览，{seconds * 1000:.1f} ms，已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
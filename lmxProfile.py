@@ -0,0 +1,120 @@
+from array import array
+
+import numpy as np
+
+from lmxBatch import as_params, draw_batch, key_indices
+
+_KEYS = ("idx_A", "idx_B", "idx_Peak1", "idx_Valley1", "idx_LastValley", "idx_LastPeak")
+
+
+class Profile:
+    """One stringer outline stored as a single interleaved array('d') x0, y0, x1, y1, ...
+
+    Key point indices are kept alongside the coordinates so annotation code
+    does not have to count vertices: idx_A / idx_B (None when the variant
+    drops them), idx_Peak1, idx_Valley1 and idx_LastValley (None for a single
+    tooth), idx_LastPeak, and the properties idx_D, idx_E, idx_F.
+    """
+
+    __slots__ = ("params", "coords") + _KEYS
+
+    def __init__(self, params, coords, idx_A, idx_B, idx_Peak1, idx_Valley1, idx_LastValley, idx_LastPeak):
+        self.params = params
+        self.coords = coords
+        self.idx_A = idx_A
+        self.idx_B = idx_B
+        self.idx_Peak1 = idx_Peak1
+        self.idx_Valley1 = idx_Valley1
+        self.idx_LastValley = idx_LastValley
+        self.idx_LastPeak = idx_LastPeak
+
+    @classmethod
+    def from_points(cls, points, params, variant="multiLmx"):
+        """Wraps a point list from a script's draw_single; the variant gives the key indices.
+
+        With variant=None the point list is taken as is and only idx_D/E/F are known.
+        """
+        coords = array("d", np.asarray(points, dtype=np.float64).ravel().tobytes())
+        if variant is None:
+            return cls(tuple(params), coords, None, None, None, None, None, None)
+        keys = key_indices([params], variant)
+        if len(coords) != 2 * keys["count"][0]:
+            raise ValueError(f"顶点个数 {len(coords) // 2} 与 {variant} 的规则不符")
+        return cls(tuple(params), coords, *(_index(keys[key][0]) for key in _KEYS))
+
+    def __len__(self):
+        return len(self.coords) // 2
+
+    @property
+    def idx_D(self):
+        return len(self) - 3
+
+    @property
+    def idx_E(self):
+        return len(self) - 2
+
+    @property
+    def idx_F(self):
+        return len(self) - 1
+
+    def xy(self):
+        """(n, 2) NumPy view on the coordinate buffer, no copy."""
+        return np.frombuffer(self.coords, dtype=np.float64).reshape(-1, 2)
+
+    def point(self, index):
+        """Vertex at index (negative indices allowed) as an (x, y) tuple."""
+        if index < 0:
+            index += len(self)
+        return self.coords[2 * index], self.coords[2 * index + 1]
+
+    def points(self):
+        """Vertex list as draw_single returns it."""
+        it = iter(self.coords.tolist())
+        return list(zip(it, it))
+
+    def translate(self, dx, dy):
+        """Moves the profile in place."""
+        xy = self.xy()
+        xy[:, 0] += dx
+        xy[:, 1] += dy
+        return self
+
+    def copy(self):
+        return Profile(self.params, array("d", self.coords), self.idx_A, self.idx_B, self.idx_Peak1,
+                       self.idx_Valley1, self.idx_LastValley, self.idx_LastPeak)
+
+    def translated(self, dx, dy):
+        return self.copy().translate(dx, dy)
+
+    def bbox(self):
+        """(min_x, min_y, max_x, max_y)"""
+        xy = self.xy()
+        (min_x, min_y), (max_x, max_y) = xy.min(axis=0), xy.max(axis=0)
+        return float(min_x), float(min_y), float(max_x), float(max_y)
+
+    def add_to(self, layout, dxfattribs=None):
+        """Adds the profile to an ezdxf layout as a closed LWPOLYLINE (only through ezdxf's public API)."""
+        # 点元组列表比直接传 NumPy 数组快: ezdxf 逐点转换，数组的每一行都要再拆开
+        return layout.add_lwpolyline(self.points(), format="xy", close=True, dxfattribs=dxfattribs)
+
+
+def _index(value):
+    return None if value < 0 else int(value)
+
+
+def profiles_from_batch(data, variant="multiLmx"):
+    """Computes all rows with draw_batch and returns one Profile per row."""
+    params = as_params(data)
+    x, y, offsets = draw_batch(params, variant)
+    keys = key_indices(params, variant)
+    xy = np.empty(2 * len(x))
+    xy[0::2] = x
+    xy[1::2] = y
+    rows = params.tolist()
+    key_rows = np.stack([keys[key] for key in _KEYS], axis=1).tolist()
+    profiles = []
+    for i, row in enumerate(rows):
+        row[5] = int(row[5])
+        coords = array("d", xy[2 * offsets[i]:2 * offsets[i + 1]].tobytes())
+        profiles.append(Profile(tuple(row), coords, *(_index(k) for k in key_rows[i])))
+    return profiles
@@ -0,0 +1,44 @@
+import importlib.util
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 生成脚本，文件名中有 "-"、"." 或中文，不能直接 import
+SCRIPTS = {
+    "lmx": "lmx.py",
+    "multiLmx": "multiLmx.py",
+    "数据录入": "数据录入.py",
+    "deepseek-multi": "deepseek-multi.py",
+    "Gemini2.5": "Gemini2.5.py",
+    "multi-super": "multi-super.py",
+}
+
+_loaded = {}
+
+
+def load_script(name):
+    """Imports one of the generator scripts by its file stem, e.g. load_script("multi-super")."""
+    module = _loaded.get(name)
+    if module is None:
+        if HERE not in sys.path:
+            sys.path.insert(0, HERE)
+        module_name = "lmx_script_" + name.replace("-", "_").replace(".", "_")
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(HERE, SCRIPTS[name]))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _loaded[name] = module
+    return module
+
+
+def loaded_scripts():
+    """The scripts imported so far through load_script, as {name: module}."""
+    return dict(_loaded)
+
+
+def fixture_data():
+    """All example rows from the scripts' data lists, in script order."""
+    rows = []
+    for name in SCRIPTS:
+        rows.extend(list(row) for row in getattr(load_script(name), "data", []))
+    return rows
@@ -0,0 +1,166 @@
+import contextlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from lmxPreflight import preflight
+from lmxScripts import load_script
+from rawDxf import RESERVED_HANDSEED
+
+# 支持分片的合并输出脚本: 函数名、排版时用到的参数
+SCRIPTS = {
+    "multi-super": ("draw_all_in_one", ()),
+    "Gemini2.5": ("draw_multiple_in_one_file", ("x_offset", "y_offset", "text_height")),
+}
+# 各脚本顶点规则对应的 lmxBatch 变体，用于预检(lmxPatch 也用这张表)
+VARIANTS = {"multi-super": "multi-super", "Gemini2.5": "Gemini2.5"}
+
+MODEL_SPACE = re.compile(r"  0\nBLOCK_RECORD\n  5\n([0-9A-F]+)\n(?:(?!  0\n).*\n)*?  2\n\*Model_Space\n")
+
+
+def _write_shard(script, rows, offsets, numbers, filename, kwargs):
+    """Worker: draws rows at their precomputed offsets, labelled with numbers, into one shard file."""
+    function, _ = SCRIPTS[script]
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        getattr(load_script(script), function)(rows, filename, offsets=offsets, numbers=numbers, **kwargs)
+    return filename
+
+
+def shard_paths(output_filename, count):
+    stem, ext = os.path.splitext(output_filename)
+    return [f"{stem}.part{k + 1:04d}{ext or '.dxf'}" for k in range(count)]
+
+
+def read_pairs(f):
+    # 按 (组码, 值) 逐对读取，值保留换行符
+    for code in f:
+        yield code, next(f)
+
+
+def merge_shards(paths, output_filename):
+    """Concatenates the ENTITIES sections of shard files into one DXF.
+
+    Header, tables, blocks and objects are taken from the first shard; every
+    entity gets a fresh handle and the model space as owner. Shards are read
+    tag by tag, so memory does not grow with their size. Works for shards
+    that hold plain model space entities (no INSERT or DIMENSION, whose
+    blocks are not merged). Returns the number of entities written.
+    """
+    with open(paths[0], encoding="utf-8") as f:
+        head = []
+        for code, value in read_pairs(f):
+            head.append(code + value)
+            if code == "  2\n" and value == "ENTITIES\n":
+                break
+        head = "".join(head)
+        tail = []
+        for code, value in read_pairs(f):
+            if tail or (code == "  0\n" and value == "ENDSEC\n"):
+                tail.append(code + value)
+        tail = "".join(tail)
+    seed_tag = "  9\n$HANDSEED\n  5\n"
+    seed_start = head.index(seed_tag) + len(seed_tag)
+    seed_end = head.index("\n", seed_start)
+    handle = int(head[seed_start:seed_end], 16)
+    owner = MODEL_SPACE.search(head).group(1) + "\n"
+
+    count = 0
+    with open(output_filename, "w", encoding="utf-8", newline="\n") as out:
+        # 实体数量事先未知，和 rawDxf 一样写预留的句柄种子
+        out.write(f"{head[:seed_start]}{RESERVED_HANDSEED:X}{head[seed_end:]}")
+        write = out.write
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                pairs = read_pairs(f)
+                for code, value in pairs:
+                    if code == "  2\n" and value == "ENTITIES\n":
+                        break
+                # 只改组码 5(句柄)和 330(所有者)
+                for code, value in pairs:
+                    if code == "  5\n":
+                        value = f"{handle:X}\n"
+                        handle += 1
+                        count += 1
+                    elif code == "330\n":
+                        value = owner
+                    elif code == "  0\n":
+                        if value == "ENDSEC\n":
+                            break
+                        if value in ("INSERT\n", "DIMENSION\n"):
+                            raise ValueError(f"{path} 中有 {value.strip()}，分片合并只支持不用块的图形")
+                    write(code)
+                    write(value)
+        write(tail)
+    return count
+
+
+def draw_sharded(data, output_filename, script="multi-super", shard_size=2000, workers=None, merge=True,
+                 sheet=None, policy="abort", **kwargs):
+    """Builds a combined drawing in shards of shard_size rows on a process pool.
+
+    The layout of all rows is computed first (the script's layout_rows), so
+    every shard is drawn at its final position and labels keep their
+    numbers; a worker only ever holds one shard's document. With merge the
+    shards are concatenated into output_filename and deleted (see
+    merge_shards; blocks and DIMENSION entities cannot be merged, so
+    use_blocks defaults to False and multi-super needs light_dims=True).
+    Without merge the shards are kept next to output_filename together with
+    an index <name>.shards.json. Other keyword arguments go to the script's
+    drawing function; avoid_overlaps only sees the shard's own rows.
+
+    All rows go through lmxPreflight before any shard starts: with
+    policy="abort" a bad row raises ValueError, with "skip" bad rows are
+    left out and the others keep their row numbers of data in the labels
+    and in the shard index, as in lmxStream.
+
+    Returns output_filename, or the index file name without merge.
+    """
+    if script not in SCRIPTS:
+        raise ValueError(f"不支持分片的脚本: {script}")
+    if shard_size < 1:
+        raise ValueError("shard_size 必须至少为 1")
+    kwargs.setdefault("use_blocks", False)
+    if merge and kwargs["use_blocks"]:
+        raise ValueError("合并分片时不能使用块(use_blocks)")
+    if merge and kwargs.get("row_map"):
+        raise ValueError("合并分片时句柄会重新编号，不能用 row_map")
+    if merge and script == "multi-super" and not kwargs.get("light_dims"):
+        raise ValueError("multi-super 合并分片需要 light_dims=True")
+
+    module = load_script(script)
+    rows = [list(row) for row in data]
+    report = preflight(rows, VARIANTS[script], policy)
+    # 编号始终是 data 中的行号，跳过的行不占用编号
+    numbers = [i + 1 for i in report["ok"]]
+    if len(report["ok"]) < len(rows):
+        rows = [rows[i] for i in report["ok"]]
+    _, layout_args = SCRIPTS[script]
+    offsets = module.layout_rows(rows, sheet=sheet, numbers=numbers,
+                                 **{k: kwargs[k] for k in layout_args if k in kwargs})
+
+    starts = list(range(0, len(rows), shard_size)) or [0]
+    paths = shard_paths(output_filename, len(starts))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_write_shard, script, rows[start:start + shard_size],
+                               offsets[start:start + shard_size], numbers[start:start + shard_size], path, kwargs)
+                   for start, path in zip(starts, paths)]
+        for future in futures:
+            future.result()
+
+    if merge:
+        merge_shards(paths, output_filename)
+        for path in paths:
+            os.remove(path)
+        return output_filename
+
+    index = os.path.splitext(output_filename)[0] + ".shards.json"
+    with open(index, "w", encoding="utf-8") as f:
+        json.dump({
+            "script": script,
+            "rows": len(rows),
+            "shards": [{"path": os.path.basename(path), "first": part[0] if part else None,
+                        "last": part[-1] if part else None}
+                       for part, path in zip((numbers[start:start + shard_size] for start in starts), paths)],
+        }, f, ensure_ascii=False, indent=2)
+    return index
@@ -0,0 +1,148 @@
+"""Constant-memory pipeline from a JSONL or CSV parameter file to one DXF.
+
+    python lmxStream.py rows.jsonl -o corpus.dxf
+    python lmxStream.py rows.csv -o corpus.dxf --variant multi-super --column-rows 500
+
+Each JSONL line is one row [a, b, c, d, h, n] (or an object with those keys);
+a CSV file has the six columns in that order, with or without a header line.
+read_rows also accepts the .json array the HTML forms save, which is read
+at once (a JSON array cannot be parsed row by row).
+Rows are read lazily, computed chunk_size at a time with the batch kernel and
+written straight to the file with rawDxf, so memory stays flat no matter how
+many rows there are.
+"""
+import argparse
+import csv
+import json
+import os
+import time
+
+from lmxBatch import PARAM_NAMES, VARIANTS
+from lmxPreflight import POLICIES, preflight
+from lmxProfile import profiles_from_batch
+from rawDxf import RawDxfWriter
+
+
+def _row(values, where):
+    if isinstance(values, dict):
+        values = [values.get(name) for name in PARAM_NAMES]
+    if not isinstance(values, list) or len(values) != len(PARAM_NAMES):
+        raise ValueError(f"{where}: 应为 [a, b, c, d, h, n]")
+    try:
+        row = [float(v) for v in values[:5]]
+        row.append(int(float(values[5])))
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: 参数必须是数字") from None
+    return row
+
+
+def read_rows(path):
+    """Yields the rows of a .json, .jsonl or .csv file one at a time; raises ValueError on a malformed row."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if ext == ".json":
+            # 表单保存的整个数组 [[a, b, c, d, h, n], ...]
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError:
+                raise ValueError(f"{path}: 不是 JSON") from None
+            if not isinstance(data, list):
+                raise ValueError(f"{path}: 文件内容应为 [[a, b, c, d, h, n], ...]")
+            for number, values in enumerate(data, 1):
+                yield _row(values, f"{path} 第 {number} 行")
+        elif ext in (".jsonl", ".ndjson"):
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        values = json.loads(line)
+                    except json.JSONDecodeError:
+                        raise ValueError(f"{path} 第 {number} 行: 不是 JSON") from None
+                    yield _row(values, f"{path} 第 {number} 行")
+        elif ext == ".csv":
+            for number, values in enumerate(csv.reader(f), 1):
+                if not values or not "".join(values).strip():
+                    continue
+                if number == 1 and values[0].strip().lower() in ("a", "步高"):
+                    continue  # 表头
+                yield _row([v.strip() for v in values], f"{path} 第 {number} 行")
+        else:
+            raise ValueError(f"不支持的文件类型: {ext}，应为 .json、.jsonl 或 .csv")
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_dxf(rows, output_filename, variant="multiLmx", column_rows=1000, gap=100.0, text_height=25.0,
+               chunk_size=1024, policy="skip"):
+    """Writes every row as a closed polyline with its number below it, while rows are still being read.
+
+    rows can be any iterable, e.g. read_rows(path). Shapes are stacked
+    downwards, gap apart, and a new column starts every column_rows rows.
+    Each chunk goes through lmxPreflight first: bad rows are skipped, or
+    with policy="abort" stop the run with a ValueError naming them. The
+    file is written as output_filename + ".tmp" and only renamed when
+    complete, so an aborted run leaves any previous output untouched.
+    Returns (rows written, rows skipped).
+    """
+    written = skipped = 0
+    x = y = column_width = 0.0
+    # 先写到同目录的临时文件，完成后再替换，中止时不留下半截的 DXF
+    tmp = output_filename + ".tmp"
+    try:
+        with open(tmp, "w", encoding="cp1252", newline="\n") as stream:
+            # 实体数量事先未知
+            with RawDxfWriter(stream) as writer:
+                for chunk in _chunks(rows, chunk_size):
+                    start = written + skipped
+                    report = preflight(chunk, variant, policy, start)
+                    skipped += len(chunk) - len(report["ok"])
+                    profiles = profiles_from_batch([chunk[i] for i in report["ok"]], variant)
+                    for k, profile in zip(report["ok"], profiles):
+                        min_x, min_y, max_x, max_y = profile.bbox()
+                        if written and written % column_rows == 0:
+                            x += column_width + gap
+                            y = column_width = 0.0
+                        height = max_y - min_y
+                        profile.translate(x - min_x, y - max_y)
+                        writer.add_profile(profile)
+                        written += 1
+                        # 编号是原文件中的行号，跳过的行不占编号
+                        label = f"{start + k + 1}号"
+                        writer.add_text(label, (x, y - height - text_height * 1.5), text_height)
+                        y -= height + text_height * 2 + gap
+                        column_width = max(column_width, max_x - min_x, len(label) * text_height)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, output_filename)
+    return written, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="从 JSONL/CSV 参数文件流式生成一个 DXF")
+    parser.add_argument("input", help=".json、.jsonl 或 .csv 参数文件")
+    parser.add_argument("-o", "--output", default="lmx_stream.dxf")
+    parser.add_argument("--variant", default="multiLmx", choices=tuple(VARIANTS))
+    parser.add_argument("--column-rows", type=int, default=1000, help="每列图形个数")
+    parser.add_argument("--policy", default="skip", choices=POLICIES, help="有问题的行: 跳过或中止")
+    args = parser.parse_args()
+    t0 = time.perf_counter()
+    try:
+        written, skipped = stream_dxf(read_rows(args.input), args.output, args.variant, args.column_rows,
+                                      policy=args.policy)
+    except ValueError as e:
+        raise SystemExit(f"已中止: {e}")
+    print(f"已写入 {written} 个图形到 {args.output}，跳过 {skipped} 行 ({time.perf_counter() - t0:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
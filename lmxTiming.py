@@ -0,0 +1,314 @@
+"""Per-stage timing of the generators.
+
+    python lmxTiming.py multi-super                       # 示例数据，打印各阶段耗时表
+    python lmxTiming.py multiLmx rows.json -o out --memory --jsonl timings.jsonl --profile run.prof
+
+enable() wraps the functions and ezdxf/rawDxf methods listed in _FUNCTIONS
+and _METHODS, so every call is charged to one stage:
+
+    geometry     draw_single、profiles_from_batch、draw_batch
+    layout       layout_rows、_row_offsets
+    dimstyle     setup_dimstyle
+    blocks       profile_block
+    dimensions   add_dimensions、DIMENSION 实体和 render、LightDims
+    entities     add_lwpolyline、add_text 等，rawDxf 的 add_profile 等
+    save         saveas、write、rawDxf 的 save_profiles
+
+seconds is the time inside the stage, self_seconds without the stages
+called from it (add_lwpolyline inside profile_block counts as entities), so
+the self times add up to the wall time together with "other". With
+memory=True each stage also gets the tracemalloc peak above what was
+allocated when it was entered. Only this process and the thread that
+called enable are measured: run parallel jobs with workers=None; calls from
+other threads (e.g. server.py's pools) go straight through. Timing cannot
+be enabled twice at once, and everything wrapped is restored by disable
+(or by a failed enable). While disabled nothing is wrapped, so there is no
+overhead at all.
+"""
+import argparse
+import contextlib
+import cProfile
+import functools
+import json
+import sys
+import threading
+import time
+import tracemalloc
+
+from lmxScripts import load_script, loaded_scripts
+
+# 阶段 -> 函数名(在 lmx 模块和生成脚本中查找)
+_FUNCTIONS = {
+    "geometry": ("draw_single", "profiles_from_batch", "draw_batch"),
+    "layout": ("layout_rows", "_row_offsets"),
+    "dimstyle": ("setup_dimstyle",),
+    "blocks": ("profile_block",),
+    "dimensions": ("add_dimensions",),
+    "save": ("save_profiles", "save_polylines"),
+}
+# 阶段 -> (模块, 类, 方法名)
+_METHODS = {
+    "dimensions": (("ezdxf.graphicsfactory", "CreatorInterface", ("add_linear_dim", "add_aligned_dim")),
+                   ("ezdxf.entities.dimstyleoverride", "DimStyleOverride", ("render",)),
+                   ("lmxDims", "LightDims", ("__init__", "add_to"))),
+    "entities": (("ezdxf.graphicsfactory", "CreatorInterface",
+                  ("add_lwpolyline", "add_polyline2d", "add_text", "add_mtext", "add_line", "add_solid",
+                   "add_blockref")),
+                 ("rawDxf", "RawDxfWriter", ("add_polyline", "add_profile", "add_text"))),
+    "save": (("ezdxf.document", "Drawing", ("saveas", "write")),),
+}
+
+_stats = None  # 阶段 -> [calls, seconds, self_seconds, peak_bytes]; None 表示未启用
+_owner = None  # 调用 enable 的线程，只有它的调用计时，_frames 也只由它改动
+_frames = []  # 正在执行的阶段，见 _Frame
+_lock = threading.Lock()  # enable/disable 互斥
+_patched = []  # (owner, name, original)
+_memory = False
+_started = 0.0
+_last = []  # disable 之后 timings() 返回的记录
+
+
+class _Frame:
+    __slots__ = ("stage", "stats", "start", "children", "traced", "peak")
+
+
+def _recording():
+    return _stats is not None and threading.get_ident() == _owner
+
+
+def _enter(stage):
+    frame = _Frame()
+    frame.stage = stage
+    # 记在进入时的记录表里，其间别的线程 disable 也不会出错
+    frame.stats = _stats
+    frame.children = 0.0
+    if _memory:
+        frame.traced, frame.peak = tracemalloc.get_traced_memory()
+        # 内层阶段重置峰值前先记下外层已经到过的峰值
+        if _frames:
+            _frames[-1].peak = max(_frames[-1].peak, frame.peak)
+        tracemalloc.reset_peak()
+        frame.peak = 0
+    _frames.append(frame)
+    frame.start = time.perf_counter()
+    return frame
+
+
+def _exit(frame):
+    seconds = time.perf_counter() - frame.start
+    _frames.pop()
+    record = frame.stats.get(frame.stage)
+    if record is None:
+        record = frame.stats[frame.stage] = [0, 0.0, 0.0, 0]
+    record[0] += 1
+    record[1] += seconds
+    record[2] += seconds - frame.children
+    if _frames:
+        _frames[-1].children += seconds
+    if _memory:
+        peak = max(tracemalloc.get_traced_memory()[1], frame.peak)
+        record[3] = max(record[3], peak - frame.traced)
+        if _frames:
+            _frames[-1].peak = max(_frames[-1].peak, peak)
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Charges the with block to stage name; does nothing while timing is disabled or on other threads."""
+    if not _recording():
+        yield
+        return
+    frame = _enter(name)
+    try:
+        yield
+    finally:
+        _exit(frame)
+
+
+def _wrap(function, name):
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        # 同一阶段内部的调用(profiles_from_batch 里的 draw_batch)不单独计
+        if not _recording() or (_frames and _frames[-1].stage == name):
+            return function(*args, **kwargs)
+        frame = _enter(name)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _exit(frame)
+    timed.lmx_timing_original = function
+    return timed
+
+
+def _patch(owner, attribute, name):
+    original = getattr(owner, attribute, None)
+    if original is None or hasattr(original, "lmx_timing_original"):
+        return
+    setattr(owner, attribute, _wrap(original, name))
+    _patched.append((owner, attribute, original))
+
+
+def _restore():
+    while _patched:
+        owner, attribute, original = _patched.pop()
+        setattr(owner, attribute, original)
+
+
+def enable(memory=False):
+    """Starts recording on the calling thread (and clears earlier records).
+
+    Scripts must already be loaded, see lmxScripts.load_script. Raises
+    ValueError while timing is already enabled.
+    """
+    global _stats, _owner, _memory, _started
+    with _lock:
+        if _stats is not None:
+            raise ValueError("计时已经启用，先调用 disable()")
+        try:
+            _patch_all()
+        except BaseException:
+            _restore()
+            raise
+        _memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _frames.clear()
+        _owner = threading.get_ident()
+        _started = time.perf_counter()
+        _stats = {}
+
+
+def _patch_all():
+    for name, methods in _METHODS.items():
+        for module_name, class_name, attributes in methods:
+            module = sys.modules.get(module_name)
+            if module is None:
+                module = __import__(module_name, fromlist=[class_name])
+            for attribute in attributes:
+                _patch(getattr(module, class_name), attribute, name)
+    # 生成脚本用 from ... import 引入函数，每个模块里的名字都要换; 脚本本身不在 sys.modules 里
+    modules = [module for module_name, module in list(sys.modules.items())
+               if module is not None and module_name.startswith("lmx")]
+    for module in modules + list(loaded_scripts().values()):
+        for name, functions in _FUNCTIONS.items():
+            for attribute in functions:
+                if callable(getattr(module, attribute, None)):
+                    _patch(module, attribute, name)
+
+
+def disable():
+    """Stops recording and restores every wrapped function; the records stay readable until the next enable."""
+    global _stats, _owner
+    with _lock:
+        if _stats is None:
+            return
+        timings()  # 先把 other 和墙钟时间算好
+        _stats = None
+        _owner = None
+        _restore()
+        if _memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def timings():
+    """Records so far, slowest self time first: [{"stage", "calls", "seconds", "self_seconds", "peak_kb"}, ...].
+
+    The last entry, stage "other", is the wall time since enable that no stage accounts for.
+    peak_kb is None without memory=True.
+    """
+    global _last
+    if _stats is None:
+        return list(_last)
+    wall = time.perf_counter() - _started
+    result = [{
+        "stage": name,
+        "calls": calls,
+        "seconds": seconds,
+        "self_seconds": self_seconds,
+        "peak_kb": peak // 1024 if _memory else None,
+    } for name, (calls, seconds, self_seconds, peak) in _stats.items()]
+    result.sort(key=lambda item: -item["self_seconds"])
+    other = wall - sum(item["self_seconds"] for item in result)
+    result.append({"stage": "other", "calls": 1, "seconds": wall, "self_seconds": other, "peak_kb": None})
+    _last = result
+    return list(result)
+
+
+def summary(records=None):
+    """The records as a text table with each stage's share of the wall time."""
+    records = timings() if records is None else records
+    wall = records[-1]["seconds"] if records else 0.0
+    lines = [f"{'stage':<12}{'calls':>9}{'seconds':>10}{'self':>10}{'%':>7}{'peak MB':>9}"]
+    for item in records:
+        peak = "" if item["peak_kb"] is None else f"{item['peak_kb'] / 1024:.1f}"
+        share = item["self_seconds"] / wall * 100 if wall else 0.0
+        lines.append(f"{item['stage']:<12}{item['calls']:>9}{item['seconds']:>10.3f}{item['self_seconds']:>10.3f}"
+                     f"{share:>7.1f}{peak:>9}")
+    return "\n".join(lines)
+
+
+def write_jsonl(path, records=None, **fields):
+    """Appends one JSON line per stage to path; fields (script, rows, ...) are added to every line."""
+    records = timings() if records is None else records
+    with open(path, "a", encoding="utf-8") as f:
+        for item in records:
+            f.write(json.dumps({**fields, **item}, ensure_ascii=False) + "\n")
+
+
+@contextlib.contextmanager
+def timed(memory=False, profile=None):
+    """Records everything inside the with block; with profile set, also dumps a cProfile file there."""
+    profiler = cProfile.Profile() if profile else None
+    enable(memory)
+    try:
+        if profiler is not None:
+            profiler.enable()
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile)
+        disable()
+
+
+# 每个脚本计时的函数，第二个参数是输出路径
+FUNCTIONS = {
+    "multiLmx": "draw_multiple",
+    "数据录入": "draw_multiple",
+    "deepseek-multi": "draw_multiple",
+    "Gemini2.5": "draw_multiple_in_one_file",
+    "multi-super": "draw_all_in_one",
+}
+
+
+def main():
+    from lmxStream import read_rows
+
+    parser = argparse.ArgumentParser(description="按阶段统计一次生成的耗时")
+    parser.add_argument("script", choices=tuple(FUNCTIONS))
+    parser.add_argument("input", nargs="?", help="参数文件 (.json/.jsonl/.csv)，默认用脚本里的示例数据")
+    parser.add_argument("-o", "--output", help="输出目录或文件，默认与脚本相同")
+    parser.add_argument("--memory", action="store_true", help="用 tracemalloc 记录各阶段的内存峰值(会变慢)")
+    parser.add_argument("--jsonl", help="把结果追加到这个 JSON lines 文件")
+    parser.add_argument("--profile", help="把整个运行的 cProfile 数据写到这个文件")
+    args = parser.parse_args()
+
+    module = load_script(args.script)
+    if args.input is None:
+        data = module.data
+    else:
+        data = list(read_rows(args.input))
+    function = getattr(module, FUNCTIONS[args.script])
+    with timed(args.memory, args.profile):
+        if args.output:
+            function(data, args.output)
+        else:
+            function(data)
+    records = timings()
+    print(summary(records))
+    if args.jsonl:
+        write_jsonl(args.jsonl, records, script=args.script, function=FUNCTIONS[args.script], rows=len(data))
+
+
+if __name__ == "__main__":
+    main()
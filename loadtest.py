@@ -0,0 +1,75 @@
+"""Load test for server.py.
+
+    python server.py --quiet &
+    python loadtest.py                                  # 200 个请求, 8 并发, 每个 10..50 行
+    python loadtest.py --requests 1000 --concurrency 16 --mode dxf --backend raw
+
+Prints requests per second and latency percentiles (p50, p90, p99).
+"""
+import argparse
+import json
+import random
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from lmxScripts import fixture_data
+
+
+def make_jobs(count, min_rows, max_rows, seed=0):
+    """count request bodies of min_rows..max_rows rows taken from the script fixtures."""
+    rng = random.Random(seed)
+    fixtures = fixture_data()
+    jobs = []
+    for _ in range(count):
+        rows = rng.randint(min_rows, max_rows)
+        jobs.append(json.dumps([rng.choice(fixtures) for _ in range(rows)]).encode("utf-8"))
+    return jobs
+
+
+def post(url, body):
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    t0 = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        size = len(response.read())
+    return time.perf_counter() - t0, size
+
+
+def percentile(sorted_values, p):
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="lmx 服务压力测试")
+    parser.add_argument("--url", default="http://127.0.0.1:8765/generate")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rows", default="10,50", help="每个请求的行数范围 min,max")
+    parser.add_argument("--variant", default="multiLmx")
+    parser.add_argument("--mode", default="zip")
+    parser.add_argument("--backend", default="ezdxf")
+    args = parser.parse_args()
+
+    min_rows, max_rows = (int(v) for v in args.rows.split(","))
+    query = urllib.parse.urlencode({"variant": args.variant, "mode": args.mode, "backend": args.backend})
+    url = f"{args.url}?{query}"
+    jobs = make_jobs(args.requests, min_rows, max_rows)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda body: post(url, body), jobs))
+    elapsed = time.perf_counter() - t0
+
+    latencies = sorted(seconds * 1000 for seconds, _ in results)
+    total_bytes = sum(size for _, size in results)
+    print(f"{args.requests} 个请求, 并发 {args.concurrency}, 每个 {min_rows}..{max_rows} 行, "
+          f"{args.variant}/{args.mode}/{args.backend}")
+    print(f"吞吐量:  {args.requests / elapsed:.1f} 请求/秒 ({total_bytes / elapsed / 1e6:.1f} MB/s)")
+    print(f"延迟 ms: p50 {percentile(latencies, 50):.1f}  p90 {percentile(latencies, 90):.1f}  "
+          f"p99 {percentile(latencies, 99):.1f}  max {latencies[-1]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,13 @@
 import ezdxf
 import math
 
+from lmxBlocks import block_name, profile_block, row_key, unique_rows
+from lmxDims import LightDims
+from lmxLayout import text_box, union_boxes
+from lmxPatch import row_handles, save_row_map
+from lmxPlacement import Placer
+from lmxProfile import profiles_from_batch
+
 def draw_single(a, b, c, d, h, n):
     """
     计算图形顶点坐标。
@@ -66,7 +73,168 @@ def setup_dimstyle(doc):
         dimstyle.dxf.dimexo = 3.0   # 偏移量
         dimstyle.dxf.dimdec = 4     # 精度
 
-def draw_all_in_one(data, output_filename="result.dxf"):
+def add_dimensions(layout, profile, params, current_offset_y=0):
+    """给一个图形加 6 个红色标注; current_offset_y 是图形在 y 方向的平移量(块内为 0)"""
+    a, b, c, d, h, n = params
+
+    # === 关键点索引由 Profile 给出 ===
+    # --- 标注 1: 左边 (d) ---
+    if profile.idx_A is not None:
+        # 标注 A -> B
+        layout.add_aligned_dim(
+            p1=profile.point(profile.idx_A), p2=profile.point(profile.idx_B), distance=30,
+            text=f"{d:.4f}", dimstyle="RED_DIM"
+        ).render()
+
+    # --- 标注 2: 步高 (a) ---
+    # 标注 B -> Peak1
+    if profile.idx_Peak1 < len(profile):
+        dim_a = layout.add_aligned_dim(
+            p1=profile.point(profile.idx_B), p2=profile.point(profile.idx_Peak1), distance=30,
+            text=f"{a:.4f}", dimstyle="RED_DIM"
+        )
+        dim_a.render()
+
+    # --- 标注 3: 步宽 (b) ---
+    # 标注 Peak1 -> Valley1 (如果存在谷底)
+    if profile.idx_Valley1 is not None:
+        dim_b = layout.add_aligned_dim(
+            p1=profile.point(profile.idx_Peak1), p2=profile.point(profile.idx_Valley1), distance=30,
+            text=f"{b:.4f}", dimstyle="RED_DIM"
+        )
+        dim_b.render()
+
+    # --- 标注 4: 右边 (c) ---
+    # 连接D点的是最后一个峰顶; c 为 0 时两点重合，不标注
+    if c != 0:
+        p_D = profile.point(profile.idx_D)
+        p_pre_D = profile.point(profile.idx_LastPeak)
+        dim_c = layout.add_aligned_dim(
+            p1=p_pre_D, p2=p_D, distance=30,
+            text=f"{c:.4f}", dimstyle="RED_DIM"
+        )
+        dim_c.render()
+
+    # --- 标注 5: 总高 (h) ---
+    # 使用线性标注 (add_linear_dim)
+    x_max = profile.point(profile.idx_E)[0]
+    base_x = x_max + 150
+    
+    layout.add_linear_dim(
+        base=(base_x, current_offset_y + h/2), 
+        p1=(x_max, current_offset_y),          
+        p2=(x_max, current_offset_y + h),      
+        text=f"{h:.4f}",
+        dimstyle="RED_DIM",
+        angle=90 
+    ).render()
+
+    # --- 标注 6: 版宽 (顶部宽度) ---
+    p_F = profile.point(profile.idx_F)
+    p_E = profile.point(profile.idx_E)
+    
+    layout.add_linear_dim(
+        base=(0, current_offset_y + h + 80), 
+        p1=p_F,
+        p2=p_E,
+        dimstyle="RED_DIM"
+    ).render() # 版宽不需要强制文字，默认显示真实距离
+
+def annotated_box(profile, label):
+    """图形连同编号和标注所占的外框 (min_x, min_y, max_x, max_y)，未平移的坐标"""
+    min_x, min_y, max_x, _ = profile.bbox()
+    h = profile.params[4]
+    first_x, first_y = profile.point(0)
+    # 右边总高标注在 E 点右侧 150，顶部版宽标注在 h + 80，再留出文字的位置
+    box = (min_x, min_y - 20, profile.point(profile.idx_E)[0] + 200, h + 120)
+    return union_boxes([box], [text_box(first_x - 250, first_y + h / 2, label, 60)])[0]
+
+def _row_offsets(uniques, inverse, profiles, sheet=None, numbers=None):
+    # 每张图的位置; numbers 为每行的编号，默认从 1 起
+    if sheet is not None:
+        numbers = range(1, len(inverse) + 1) if numbers is None else numbers
+        offsets = sheet.place([annotated_box(profiles[pos], f"{number}号") for number, pos in zip(numbers, inverse)])
+        return offsets.tolist()
+    offsets = []
+    current_offset_y = 0
+    spacing = 400  # 图形垂直间距
+    for pos in inverse:
+        offsets.append((0, current_offset_y))
+        current_offset_y -= (uniques[pos][4] + spacing)
+    return offsets
+
+def layout_rows(data, sheet=None, numbers=None):
+    """draw_all_in_one 中每行图形的平移量 [(dx, dy), ...]，不生成文件(分片输出时先统一排版，见 lmxShard)"""
+    uniques, inverse = unique_rows(data)
+    return _row_offsets(uniques, inverse, profiles_from_batch(uniques, "multi-super"), sheet, numbers)
+
+def _row_block(doc, profile, row, light_dims, light=None, pos=0):
+    """块名; 这组参数的块(图形连同标注)还不存在时先定义"""
+    name = block_name(row, "multi-super", "light-dims" if light_dims else "dims")
+    if name not in doc.blocks:
+        block = profile_block(doc, profile, "multi-super", "light-dims" if light_dims else "dims")
+        if light_dims:
+            light.add_to(block, pos)
+        else:
+            add_dimensions(block, profile, row)
+    return name
+
+def _add_row(doc, msp, row, profile, offset, label, block=None, light=None, pos=0, placer=None):
+    """把一行(块引用或图形、编号、标注)加到模型空间; block 为块名时用块引用，light 为 LightDims 时用轻量标注"""
+    h = row[4]
+    current_offset_x, current_offset_y = offset
+    if block is not None:
+        # 1. 块引用放到当前偏移位置(图形和标注都在块里)
+        msp.add_blockref(block, (current_offset_x, current_offset_y))
+        first_x, first_y = profile.point(0)
+        first_x += current_offset_x
+        first_y += current_offset_y
+    else:
+        # 1. 应用偏移
+        moved = profile.translated(current_offset_x, current_offset_y)
+
+        # 2. 绘制多段线
+        moved.add_to(msp)
+        first_x, first_y = moved.point(0)
+
+    # 3. 添加序号文字
+    text_x = first_x - 250
+    text_y = first_y + h / 2
+    if placer is not None:
+        # 依次尝试: 左侧、更左、上方、下方、右侧
+        x_right = profile.point(profile.idx_E)[0] + current_offset_x + 400
+        candidates = [(text_x, text_y), (text_x - 250, text_y), (first_x, current_offset_y + h + 200),
+                      (first_x, current_offset_y - 150), (x_right, text_y)]
+        text_x, text_y = candidates[placer.place([text_box(x, y, label, 60) for x, y in candidates])]
+    msp.add_text(
+        label, 
+        dxfattribs={'style': 'SimSun', 'height': 60, 'color': 7}
+    ).set_placement((text_x, text_y))
+
+    if block is None:
+        if light is not None:
+            light.add_to(msp, pos, current_offset_x, current_offset_y, placer)
+        else:
+            add_dimensions(msp, moved, row, current_offset_y)
+
+def redraw_row(doc, msp, row, offset, number, use_blocks=True, light_dims=False):
+    """lmxPatch 用: 按 draw_all_in_one 的方式把一行画到 offset 处，编号为 number"""
+    row = row_key(row)
+    profile = profiles_from_batch([row], "multi-super")[0]
+    light = LightDims([profile], [row]) if light_dims else None
+    block = _row_block(doc, profile, row, light_dims, light) if use_blocks else None
+    _add_row(doc, msp, row, profile, offset, f"{number}号", block, light)
+
+def draw_all_in_one(data, output_filename="result.dxf", use_blocks=True, light_dims=False, sheet=None,
+                    avoid_overlaps=False, offsets=None, start=0, row_map=False, numbers=None):
+    """use_blocks: 相同参数的图形连同标注只定义一次块(BLOCK)，每行用块引用(INSERT)放置
+       light_dims: 标注不用 DIMENSION 实体，直接画成线、实心箭头和多行文字(见 lmxDims)，生成更快、文件更小
+       sheet: 给定 lmxLayout.Sheet 时把图形排进固定大小的图纸，而不是排成一列
+       avoid_overlaps: 编号避开所有图形、标注和已放好的文字(见 lmxPlacement); light_dims 且不用块时标注文字也会避让
+       offsets: 已经排好的每行平移量(见 layout_rows)，给定时不再排版; start: 编号从 start + 1 开始
+       row_map: 另写 <文件名>.rows.json，记录每行的实体句柄，之后可以用 lmxPatch 只更新改动的行
+       numbers: 每行的编号，给定时代替 start(lmxShard 跳过坏行后其余行保留原来的行号)
+    """
     doc = ezdxf.new()
     setup_dimstyle(doc)
     msp = doc.modelspace()
@@ -75,97 +243,47 @@ def draw_all_in_one(data, output_filename="result.dxf"):
     if "SimSun" not in doc.styles:
         doc.styles.new("SimSun", dxfattribs={"font": "simsun.ttc"})
 
-    current_offset_y = 0
-    spacing = 400  # 图形垂直间距
+    # 相同参数只计算一次
+    uniques, inverse = unique_rows(data)
+    profiles = profiles_from_batch(uniques, "multi-super")
+    if numbers is None:
+        numbers = range(start + 1, start + len(inverse) + 1)
+    light = None
+    if light_dims:
+        # 所有标注的几何一次算好
+        light = LightDims(profiles, uniques)
+    names = [None] * len(uniques)
+    if use_blocks:
+        names = [_row_block(doc, profile, row, light_dims, light, pos)
+                 for pos, (row, profile) in enumerate(zip(uniques, profiles))]
 
-    for idx, (a, b, c, d, h, n) in enumerate(data):
-        # 1. 计算点并应用垂直偏移
-        raw_points = draw_single(a, b, c, d, h, n)
-        points = [(p[0], p[1] + current_offset_y) for p in raw_points]
+    if offsets is None:
+        offsets = _row_offsets(uniques, inverse, profiles, sheet, numbers)
 
-        # 2. 绘制多段线
-        msp.add_lwpolyline(points, close=True)
-
-        # 3. 添加序号文字
-        text_x = points[0][0] - 250
-        text_y = points[0][1] + h / 2
-        msp.add_text(
-            f"{idx + 1}号", 
-            dxfattribs={'style': 'SimSun', 'height': 60, 'color': 7}
-        ).set_placement((text_x, text_y))
-
-        # === 智能判断索引位置 ===
-        has_left_stub = (d != 0)
-        idx_B = 1 if has_left_stub else 0
-        idx_Peak1 = idx_B + 1
-        idx_Valley1 = idx_B + 2
-
-        # --- 标注 1: 左边 (d) ---
-        if has_left_stub:
-            # 标注 A -> B
-            msp.add_aligned_dim(
-                p1=points[0], p2=points[1], distance=30,
-                dimstyle="RED_DIM"
-            ).set_text_format(user_text=f"{d:.4f}")  # 修改处：text -> user_text
-
-        # --- 标注 2: 步高 (a) ---
-        # 标注 B -> Peak1
-        if idx_Peak1 < len(points):
-            dim_a = msp.add_aligned_dim(
-                p1=points[idx_B], p2=points[idx_Peak1], distance=30,
-                dimstyle="RED_DIM"
-            )
-            dim_a.set_text_format(user_text=f"{a:.4f}") # 修改处：text -> user_text
-
-        # --- 标注 3: 步宽 (b) ---
-        # 标注 Peak1 -> Valley1 (如果存在谷底)
-        if idx_Valley1 < len(points) - 3: 
-            dim_b = msp.add_aligned_dim(
-                p1=points[idx_Peak1], p2=points[idx_Valley1], distance=30,
-                dimstyle="RED_DIM"
-            )
-            dim_b.set_text_format(user_text=f"{b:.4f}") # 修改处：text -> user_text
-
-        # --- 标注 4: 右边 (c) ---
-        # D点是倒数第3个点 points[-3]
-        # 连接D点的是 points[-4]
-        if len(points) > 4:
-            p_D = points[-3]
-            p_pre_D = points[-4]
-            dim_c = msp.add_aligned_dim(
-                p1=p_pre_D, p2=p_D, distance=30,
-                dimstyle="RED_DIM"
-            )
-            dim_c.set_text_format(user_text=f"{c:.4f}") # 修改处：text -> user_text
-
-        # --- 标注 5: 总高 (h) ---
-        # 使用线性标注 (add_linear_dim)
-        x_max = points[-2][0]
-        base_x = x_max + 150
-        
-        msp.add_linear_dim(
-            base=(base_x, current_offset_y + h/2), 
-            p1=(x_max, current_offset_y),          
-            p2=(x_max, current_offset_y + h),      
-            dimstyle="RED_DIM",
-            angle=90 
-        ).set_text_format(user_text=f"{h:.4f}") # 修改处：text ->                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                         
-
-        # --- 标注 6: 版宽 (顶部宽度) ---
-        p_F = points[-1]
-        p_E = points[-2]
-        
-        msp.add_linear_dim(
-            base=(0, current_offset_y + h + 80), 
-            p1=p_F,
-            p2=p_E,
-            dimstyle="RED_DIM"
-        ) # 版宽不需要强制文字，默认显示真实距离
+    placer = None
+    if avoid_overlaps:
+        # 先登记所有图形的轮廓和标注(线、箭头)，再逐个放文字;
+        # 块里的标注和 DIMENSION 实体的文字位置不变，按默认位置一起登记(几何与 LightDims 相同)
+        placer = Placer()
+        dims = light if light is not None else LightDims(profiles, uniques)
+        fixed_text = use_blocks or not light_dims
+        for (dx, dy), pos in zip(offsets, inverse):
+            placer.add_profile(profiles[pos], dx, dy)
+            dims.reserve(placer, pos, dx, dy, texts=fixed_text)
 
-        # 更新下一张图的位置
-        current_offset_y -= (h + spacing)
+    first = len(msp)
+    counts = []
+    for idx, pos in enumerate(inverse):
+        before = len(msp)
+        _add_row(doc, msp, uniques[pos], profiles[pos], offsets[idx], f"{numbers[idx]}号", names[pos],
+                 light, pos, placer)
+        counts.append(len(msp) - before)
 
     doc.saveas(output_filename)
+    if row_map:
+        save_row_map(output_filename, "multi-super", {"use_blocks": use_blocks, "light_dims": light_dims},
+                     [uniques[pos] for pos in inverse], numbers, offsets,
+                     row_handles(msp, first, counts))
     print(f"成功生成文件: {output_filename}")
 
 # 数据测试
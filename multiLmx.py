@@ -1,7 +1,13 @@
 import os
 import shutil
 import math
-import ezdxf
+import time
+
+from lmxManifest import prepare_incremental, save_manifest
+from lmxOutput import check_format, save_dxf, write_zip
+from lmxParallel import draw_multiple_parallel
+from lmxPreflight import preflight
+from lmxProfile import profiles_from_batch
 
 
 def draw_single(a, b, c, d, h, n):
@@ -46,30 +52,65 @@ def draw_single(a, b, c, d, h, n):
     return points
 
 
-def draw_multiple(data, output_dir="dxf"):
+def draw_multiple(data, output_dir="dxf", workers=None, chunk_size=64, backend="ezdxf", cache=None, fmt="asc"):
     """Draws multiple shapes, saving each to a separate DXF file in a specified directory.
-       Clears the directory before saving.
+       Only rows whose parameters changed since the last run are regenerated; files of
+       rows that no longer exist are removed (see lmxManifest).
+       Returns the manifest of the rows written: one dict per row with its index, path,
+       write time in seconds and pid (None for cache hits), sorted by index.
+       With workers set, rows are written on a process pool of that many workers
+       in chunks of chunk_size.
+       backend="raw" streams the files with rawDxf instead of building ezdxf documents.
+       With an lmxCache.LmxCache as cache, rows seen before are copied from the cache.
+       fmt="bin" writes binary DXF (ezdxf backend only): smaller, faster to write and to read back.
+       Rows that lmxPreflight rejects raise ValueError before any file is written.
     """
-    # Create the output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Clear the contents of the output directory
-    for filename in os.listdir(output_dir):
-        file_path = os.path.join(output_dir, filename)
-        try:
-            if os.path.isfile(file_path):  # Only delete files, not directories
-                os.remove(file_path)
-        except Exception as e:
-            print(f"Error deleting file {file_path}: {e}")
-
-    for i, (a, b, c, d, h, n) in enumerate(data):
-        doc = ezdxf.new()
-        msp = doc.modelspace()
-        points = draw_single(a, b, c, d, h, n)
-        msp.add_lwpolyline(points, close=True)
+    # 有问题的行(a、b 为 0 等)在写任何文件之前就报错
+    preflight(data, "multiLmx", "abort")
+    check_format(backend, fmt)
+    # 格式变了也要重画
+    kind = backend if fmt == "asc" else f"{backend}+{fmt}"
+    entries, todo = prepare_incremental(output_dir, data, "multiLmx", kind, lambda i: f"lmx{i + 1}.dxf")
+
+    if workers:
+        manifest = draw_multiple_parallel(data, output_dir, "multiLmx", workers, chunk_size, backend, cache,
+                                          indices=todo, fmt=fmt)
+        save_manifest(output_dir, entries)
+        return manifest
+
+    if cache is None:
+        profiles = profiles_from_batch([data[i] for i in todo], "multiLmx")
+
+    # 与进程池模式相同的清单
+    manifest = []
+    for k, i in enumerate(todo):
+        row = tuple(data[i])
         filename = os.path.join(output_dir, f"lmx{i + 1}.dxf")
+        t0 = time.perf_counter()
+        if cache is not None:
+            if cache.fetch_dxf(row, "multiLmx", kind, filename):
+                manifest.append({"index": i + 1, "path": filename, "seconds": time.perf_counter() - t0, "pid": None})
+                continue
+            profile = cache.profile(row, "multiLmx")
+        else:
+            profile = profiles[k]
+
+        save_dxf(filename, [profile], backend=backend, fmt=fmt)
+
+        if cache is not None:
+            cache.store_dxf(row, "multiLmx", kind, filename)
+        manifest.append({"index": i + 1, "path": filename, "seconds": time.perf_counter() - t0, "pid": os.getpid()})
 
-        doc.saveas(filename)
+    save_manifest(output_dir, entries)
+    return manifest
+
+
+def draw_zip(data, archive="lmx.zip", backend="ezdxf", fmt="asc"):
+    """Writes every row as lmx{i}.dxf straight into one zip archive (file name or binary file object),
+       without loose files or temporary files on disk. Returns the number of files in the archive.
+    """
+    profiles = profiles_from_batch(data, "multiLmx")
+    return write_zip(archive, ((f"lmx{i + 1}.dxf", profile) for i, profile in enumerate(profiles)), backend, fmt)
 
 
 # a 步高
@@ -114,4 +155,5 @@ data =[
   ]
 ]
 
-draw_multiple(data)
+if __name__ == '__main__':
+    draw_multiple(data)
@@ -0,0 +1,140 @@
+import io
+
+import ezdxf
+
+# 预留的句柄种子，流式写入时实体数量未知，用它保证 $HANDSEED 大于所有已用句柄
+RESERVED_HANDSEED = 0x7FFFFFFF
+
+_template = None
+
+
+def _load_template():
+    """Splits an empty R2000 drawing written by ezdxf into reusable text parts.
+
+    Only done once per process; every file after that is plain string writes.
+    Returns (header before $HANDSEED value, text up to ENTITIES, text after
+    ENTITIES, first free handle, model space block record handle).
+    """
+    global _template
+    if _template is None:
+        doc = ezdxf.new("R2000")
+        stream = io.StringIO()
+        doc.write(stream)
+        text = stream.getvalue()
+
+        seed_tag = "  9\n$HANDSEED\n  5\n"
+        seed_start = text.index(seed_tag) + len(seed_tag)
+        seed_end = text.index("\n", seed_start)
+        entities_tag = "  2\nENTITIES\n"
+        entities_end = text.index(entities_tag) + len(entities_tag)
+        objects_start = text.index("  0\nENDSEC\n", entities_end)
+        _template = (
+            text[:seed_start],
+            text[seed_end:entities_end],
+            text[objects_start:],
+            int(text[seed_start:seed_end], 16),
+            doc.modelspace().block_record_handle,
+        )
+    return _template
+
+
+def _escape(text):
+    # R2000 文件按 cp1252 写出，中文等字符用 \U+XXXX 转义
+    return "".join(ch if ord(ch) < 128 else f"\\U+{ord(ch):04X}" for ch in text)
+
+
+class RawDxfWriter:
+    """Streams LWPOLYLINE and TEXT entities into a minimal R2000 DXF.
+
+    Bypasses the ezdxf document model: tables, blocks and objects come from a
+    cached empty drawing, entities are written straight to the text stream as
+    they are added. Pass entity_count when it is known so $HANDSEED is exact,
+    otherwise a reserved seed is written.
+    """
+
+    def __init__(self, stream, entity_count=None):
+        header, tables, self._tail, self._handle, self._owner = _load_template()
+        self._stream = stream
+        if entity_count is None:
+            seed = RESERVED_HANDSEED
+        else:
+            seed = self._handle + entity_count
+        stream.write(f"{header}{seed:X}{tables}")
+        self._limit = seed
+
+    def _next_handle(self):
+        handle = self._handle
+        if handle >= self._limit:
+            raise ValueError("实体数量超过了 entity_count")
+        self._handle += 1
+        return f"{handle:X}"
+
+    def add_polyline(self, xs, ys=None, close=True):
+        """Adds an LWPOLYLINE from coordinate sequences (lists or NumPy arrays).
+
+        Without ys, xs is one flat buffer x0, y0, x1, y1, ... such as Profile.coords.
+        """
+        if hasattr(xs, "tolist"):
+            xs = xs.tolist()
+        if ys is None:
+            xs, ys = xs[0::2], xs[1::2]
+        elif hasattr(ys, "tolist"):
+            ys = ys.tolist()
+        vertices = "".join([f" 10\n{x!r}\n 20\n{y!r}\n" for x, y in zip(xs, ys)])
+        self._stream.write(
+            f"  0\nLWPOLYLINE\n  5\n{self._next_handle()}\n330\n{self._owner}\n"
+            f"100\nAcDbEntity\n  8\n0\n100\nAcDbPolyline\n"
+            f" 90\n{len(xs)}\n 70\n{1 if close else 0}\n{vertices}"
+        )
+
+    def add_profile(self, profile):
+        """Adds an lmxProfile.Profile as a closed LWPOLYLINE, reading its buffer directly."""
+        self.add_polyline(profile.coords)
+
+    def add_text(self, text, insert, height):
+        """Adds a left aligned single line TEXT at insert."""
+        x, y = float(insert[0]), float(insert[1])
+        self._stream.write(
+            f"  0\nTEXT\n  5\n{self._next_handle()}\n330\n{self._owner}\n"
+            f"100\nAcDbEntity\n  8\n0\n100\nAcDbText\n"
+            f" 10\n{x!r}\n 20\n{y!r}\n 30\n0.0\n 40\n{float(height)!r}\n"
+            f"  1\n{_escape(text)}\n100\nAcDbText\n"
+        )
+
+    def close(self):
+        self._stream.write(self._tail)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+def save_polylines(filename, polylines, texts=()):
+    """Writes closed polylines and labels to filename without building a document.
+
+    polylines: sequence of (xs, ys) coordinate pairs
+    texts: sequence of (text, (x, y), height)
+    """
+    polylines = list(polylines)
+    texts = list(texts)
+    with open(filename, "w", encoding="cp1252", newline="\n") as stream:
+        with RawDxfWriter(stream, len(polylines) + len(texts)) as writer:
+            for xs, ys in polylines:
+                writer.add_polyline(xs, ys)
+            for text, insert, height in texts:
+                writer.add_text(text, insert, height)
+
+
+def save_profiles(filename, profiles, texts=()):
+    """Like save_polylines, for lmxProfile.Profile objects."""
+    profiles = list(profiles)
+    texts = list(texts)
+    with open(filename, "w", encoding="cp1252", newline="\n") as stream:
+        with RawDxfWriter(stream, len(profiles) + len(texts)) as writer:
+            for profile in profiles:
+                writer.add_profile(profile)
+            for text, insert, height in texts:
+                writer.add_text(text, insert, height)
@@ -0,0 +1,252 @@
+"""Local HTTP generation service for the data entry forms.
+
+    python server.py                        # http://127.0.0.1:8765
+    python server.py --port 9000 --workers 4
+
+POST /generate with the same JSON array the forms produce,
+[[a, b, c, d, h, n], ...]. Query parameters:
+
+    variant  multiLmx (默认) / 数据录入 / lmx / multi-super / Gemini2.5
+    mode     zip (默认, 每行一个 lmxN.dxf) / dxf (所有图形放在一个文件里)
+    backend  ezdxf (默认) / raw
+    sheet    1 = dxf 模式下把图形排进固定大小的图纸 (lmxLayout.Sheet)，默认排成一列
+
+POST /quote with the same array answers with the cutting list of the job as
+JSON (lmxCosting.cutting_list: area, cut length and volume per distinct row
+and in total), fast enough to recompute on every edit. Query parameters:
+variant as above, thickness 板厚 mm (默认 10).
+
+POST /preview with the same array answers with {"previews": [...]}, one
+thumbnail per row (lmxPreview.previews; rows with bad parameters get a red
+placeholder instead of an error). Query parameters: variant as above, fmt
+svg (默认, SVG 文本) / png (data: URL, 需要 Pillow), size 边长像素 (默认 120).
+Thumbnails are cached in the server process across requests.
+
+ezdxf stays imported in the worker processes, so a request only pays for
+the generation itself. GET / answers with a short status line.
+"""
+import argparse
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import ezdxf  # noqa: F401  工作进程里保持导入，见模块说明
+
+from lmxBatch import VARIANTS
+from lmxCosting import cutting_list
+from lmxLayout import Sheet, text_box, union_boxes
+from lmxOutput import dxf_bytes, write_zip
+from lmxPreflight import preflight
+from lmxPreview import PreviewCache, data_url, previews
+from lmxProfile import profiles_from_batch
+
+MAX_BODY = 16 << 20   # 请求体上限 16 MB
+MODES = ("zip", "dxf")
+BACKENDS = ("ezdxf", "raw")
+SPACING = 400         # dxf 模式下图形垂直间距
+PREVIEWS = PreviewCache()
+
+
+def render(data, variant="multiLmx", mode="zip", backend="ezdxf", sheet=False):
+    """Worker: generates the response body for one request. Returns (content type, file name, bytes)."""
+    profiles = profiles_from_batch(data, variant)
+    if mode == "dxf":
+        # 所有图形从上往下排，左边写编号
+        if sheet:
+            boxes = union_boxes([profile.bbox() for profile in profiles],
+                                [text_box(-250, profile.params[4] / 2, f"{i + 1}号", 60)
+                                 for i, profile in enumerate(profiles)])
+            offsets = Sheet().place(boxes).tolist()
+        labels = []
+        offset_x = offset_y = 0
+        for i, profile in enumerate(profiles):
+            h = profile.params[4]
+            if sheet:
+                offset_x, offset_y = offsets[i]
+            profile.translate(offset_x, offset_y)
+            labels.append((f"{i + 1}号", (offset_x - 250, offset_y + h / 2), 60))
+            offset_y -= h + SPACING
+        return "application/dxf", "lmx.dxf", dxf_bytes(profiles, labels, backend)
+
+    buffer = io.BytesIO()
+    # 文件名与 draw_multiple 输出目录中的一致
+    write_zip(buffer, ((f"lmx{i + 1}.dxf", profile) for i, profile in enumerate(profiles)), backend)
+    return "application/zip", "lmx.zip", buffer.getvalue()
+
+
+def _warm_up():
+    # 每个工作进程启动时先生成一次，后面的请求不再付导入和首次调用的开销
+    render([[150, 250, 30, 60, 260, 3]], "multiLmx", "zip", "ezdxf")
+
+
+def parse_request(body, query):
+    """Validates a /generate request; returns render() arguments or raises ValueError."""
+    params = parse_qs(query)
+    variant = params.get("variant", ["multiLmx"])[0]
+    mode = params.get("mode", ["zip"])[0]
+    backend = params.get("backend", ["ezdxf"])[0]
+    sheet = params.get("sheet", ["0"])[0] == "1"
+    if variant not in VARIANTS:
+        raise ValueError(f"未知的 variant: {variant}")
+    if mode not in MODES:
+        raise ValueError(f"未知的 mode: {mode}")
+    if backend not in BACKENDS:
+        raise ValueError(f"未知的 backend: {backend}")
+    data = _parse_rows(body)
+    # 无效、顶边颠倒或自相交的行在生成之前就拒绝
+    preflight(data, variant, "abort")
+    return data, variant, mode, backend, sheet
+
+
+def _parse_rows(body):
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise ValueError("请求体不是有效的 JSON")
+    if not isinstance(data, list) or not data:
+        raise ValueError("请求体应为非空的二维数组 [[a, b, c, d, h, n], ...]")
+    for i, row in enumerate(data):
+        if (not isinstance(row, list) or len(row) != 6
+                or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in row)):
+            raise ValueError(f"第 {i + 1} 行应为 6 个数字")
+    return data
+
+
+def parse_quote(body, query):
+    """Validates a /quote request; returns cutting_list() arguments or raises ValueError."""
+    data, variant, _, _, _ = parse_request(body, query)
+    try:
+        thickness = float(parse_qs(query).get("thickness", ["10"])[0])
+    except ValueError:
+        raise ValueError("thickness 必须是数字")
+    return data, variant, thickness
+
+
+def parse_preview(body, query):
+    """Validates a /preview request; returns previews() arguments or raises ValueError.
+
+    Rows are not preflighted here: bad ones are drawn as placeholders.
+    """
+    params = parse_qs(query)
+    variant = params.get("variant", ["multiLmx"])[0]
+    fmt = params.get("fmt", ["svg"])[0]
+    if variant not in VARIANTS:
+        raise ValueError(f"未知的 variant: {variant}")
+    try:
+        size = int(params.get("size", ["120"])[0])
+    except ValueError:
+        raise ValueError("size 必须是整数")
+    return _parse_rows(body), variant, fmt, size
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "lmxServer/1"
+    pool = None
+
+    def _cors(self):
+        # 表单页面通常直接用 file:// 打开，需要允许跨域
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+
+    def _send(self, status, content_type, body, filename=None):
+        self.send_response(status)
+        self._cors()
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if filename:
+            self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+        self.end_headers()
+        # 分块写出，大文件不必一次拷进 socket 缓冲区
+        view = memoryview(body)
+        for start in range(0, len(view), 1 << 16):
+            self.wfile.write(view[start:start + (1 << 16)])
+
+    def _error(self, status, message):
+        body = json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+        self._send(status, "application/json; charset=utf-8", body)
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self._cors()
+        self.end_headers()
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/":
+            return self._error(404, "not found")
+        self._send(200, "text/plain; charset=utf-8",
+                   "lmx server ok, POST /generate, /quote or /preview\n".encode("utf-8"))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path not in ("/generate", "/quote", "/preview"):
+            return self._error(404, "not found")
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            return self._error(413, "请求体过大")
+        body = self.rfile.read(length)
+        if url.path == "/quote":
+            # 只有 NumPy 计算，不必进工作进程
+            try:
+                report = cutting_list(*parse_quote(body, url.query))
+            except ValueError as e:
+                return self._error(400, str(e))
+            return self._send(200, "application/json; charset=utf-8",
+                              json.dumps(report, ensure_ascii=False).encode("utf-8"))
+        if url.path == "/preview":
+            # 同样只在本线程里算，缩略图缓存在本进程
+            try:
+                data, variant, fmt, size = parse_preview(body, url.query)
+                images = previews(data, variant, fmt, size, PREVIEWS)
+            except ValueError as e:
+                return self._error(400, str(e))
+            if fmt == "png":
+                images = [data_url(image) for image in images]
+            return self._send(200, "application/json; charset=utf-8",
+                              json.dumps({"previews": images}, ensure_ascii=False).encode("utf-8"))
+        try:
+            args = parse_request(body, url.query)
+        except ValueError as e:
+            return self._error(400, str(e))
+        try:
+            content_type, filename, data = self.pool.submit(render, *args).result()
+        except ValueError as e:
+            return self._error(400, str(e))
+        self._send(200, content_type, data, filename)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host="127.0.0.1", port=8765, workers=None, quiet=False):
+    """Creates the HTTP server and its worker pool; call serve_forever() on the result."""
+    Handler.pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_up)
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.quiet = quiet
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="lmx 本地生成服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数，默认 CPU 核数")
+    parser.add_argument("--quiet", action="store_true", help="不打印每个请求的日志")
+    args = parser.parse_args()
+    server = make_server(args.host, args.port, args.workers, args.quiet)
+    print(f"lmx 服务已启动: http://{args.host}:{args.port}/generate")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        Handler.pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
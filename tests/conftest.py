@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 测试直接 import 仓库根目录下的 lmx* 模块
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
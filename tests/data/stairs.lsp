@@ -0,0 +1,63 @@
+(vl-load-com)
+(setq lmx-doc (vla-get-ActiveDocument (vlax-get-acad-object)))
+(setq lmx-ms (vla-get-ModelSpace lmx-doc))
+(defun lmx-pt (p) (vlax-3d-point (car p) (cadr p) 0.0))
+(defun lmx-pline (coords / arr obj)
+  (setq arr (vlax-make-safearray vlax-vbDouble (cons 0 (1- (length coords)))))
+  (vlax-safearray-fill arr coords)
+  (setq obj (vla-AddLightWeightPolyline lmx-ms arr))
+  (vla-put-Closed obj :vlax-true)
+  obj)
+(defun lmx-dim-aligned (p1 p2 loc tp color / obj)
+  (setq obj (vla-AddDimAligned lmx-ms (lmx-pt p1) (lmx-pt p2) (lmx-pt loc)))
+  (if tp (vla-put-TextPosition obj (lmx-pt tp)))
+  (vla-put-Color obj color)
+  obj)
+(defun lmx-dim-rotated (p1 p2 loc angle color / obj)
+  (setq obj (vla-AddDimRotated lmx-ms (lmx-pt p1) (lmx-pt p2) (lmx-pt loc) angle))
+  (vla-put-Color obj color)
+  obj)
+(defun lmx-text (str ins height color / obj)
+  (setq obj (vla-AddText lmx-ms str (lmx-pt ins) height))
+  (vla-put-Color obj color)
+  obj)
+(vla-StartUndoMark lmx-doc)
+;; 1: a=151.2 b=250 c=60 d=70 h=290 n=14
+(lmx-pline '(0.00000000 36.22588172 59.89729120 0.00000000 138.14519572 129.37814900 352.06409288 0.00000000 430.31199739 129.37814900 644.23089455 0.00000000 722.47879907 129.37814900 936.39769622 0.00000000 1014.64560074 129.37814900 1228.56449790 0.00000000 1306.81240241 129.37814900 1520.73129957 0.00000000 1598.97920409 129.37814900 1812.89810124 0.00000000 1891.14600576 129.37814900 2105.06490292 0.00000000 2183.31280743 129.37814900 2397.23170459 0.00000000 2475.47960911 129.37814900 2689.39850626 0.00000000 2767.64641078 129.37814900 2981.56530794 0.00000000 3059.81321245 129.37814900 3273.73210961 0.00000000 3351.98001413 129.37814900 3565.89891128 0.00000000 3644.14681580 129.37814900 3858.06571296 0.00000000 3936.31361747 129.37814900 3987.65415279 98.32739324 4103.57774536 290.00000000 153.48258674 290.00000000))
+(lmx-dim-aligned '(153.48258674 290.00000000) '(4103.57774536 290.00000000) '(2128.53016605 390.00000000) nil 1)
+(lmx-dim-rotated '(4103.57774536 0.00000000) '(4103.57774536 290.00000000) '(4203.57774536 145.00000000) 1.57079633 1)
+(lmx-dim-aligned '(0.00000000 36.22588172) '(59.89729120 0.00000000) '(-40.00000000 16.22588172) nil 1)
+(lmx-dim-aligned '(3936.31361747 129.37814900) '(3987.65415279 98.32739324) '(4027.65415279 78.32739324) nil 1)
+(lmx-dim-aligned '(3644.14681580 129.37814900) '(3858.06571296 0.00000000) '(1993.82707640 -150.00000000) '(3771.10626438 84.68907450) 1)
+(lmx-dim-aligned '(3858.06571296 0.00000000) '(3936.31361747 129.37814900) '(3877.18966521 84.68907450) nil 1)
+(lmx-text "1\\U+53F7" '(-400.00000000 145.00000000) 80.00000000 7)
+;; 2: a=151.2 b=253.3 c=70 d=60 h=280 n=10
+(lmx-pline '(0.00000000 -1259.24698586 51.51943440 -1290.00000000 129.01703004 -1160.17102530 346.51490895 -1290.00000000 424.01250458 -1160.17102530 641.51038349 -1290.00000000 719.00797912 -1160.17102530 936.50585803 -1290.00000000 1014.00345366 -1160.17102530 1231.50133257 -1290.00000000 1308.99892820 -1160.17102530 1526.49680711 -1290.00000000 1603.99440275 -1160.17102530 1821.49228165 -1290.00000000 1898.98987729 -1160.17102530 2116.48775619 -1290.00000000 2193.98535183 -1160.17102530 2411.48323074 -1290.00000000 2488.98082637 -1160.17102530 2706.47870528 -1290.00000000 2783.97630091 -1160.17102530 2844.08230772 -1196.04954180 2955.13912067 -1010.00000000 148.78067218 -1010.00000000))
+(lmx-dim-aligned '(148.78067218 -1010.00000000) '(2955.13912067 -1010.00000000) '(1551.95989642 -910.00000000) nil 1)
+(lmx-dim-rotated '(2955.13912067 -1290.00000000) '(2955.13912067 -1010.00000000) '(3055.13912067 -1150.00000000) 1.57079633 1)
+(lmx-dim-aligned '(0.00000000 -1259.24698586) '(51.51943440 -1290.00000000) '(-40.00000000 -1279.24698586) nil 1)
+(lmx-dim-aligned '(2783.97630091 -1160.17102530) '(2844.08230772 -1196.04954180) '(2884.08230772 -1216.04954180) nil 1)
+(lmx-dim-aligned '(2488.98082637 -1160.17102530) '(2706.47870528 -1290.00000000) '(1422.04115386 -1440.00000000) '(2617.72976582 -1205.08551265) 1)
+(lmx-dim-aligned '(2706.47870528 -1290.00000000) '(2783.97630091 -1160.17102530) '(2725.22750309 -1205.08551265) nil 1)
+(lmx-text "2\\U+53F7" '(-400.00000000 -1150.00000000) 80.00000000 7)
+;; 3: a=156 b=253.3 c=70 d=60 h=260 n=10
+(lmx-pline '(0.00000000 -2538.53615135 51.08841579 -2570.00000000 132.89442228 -2437.17011894 348.57268428 -2570.00000000 430.37869078 -2437.17011894 646.05695277 -2570.00000000 727.86295927 -2437.17011894 943.54122127 -2570.00000000 1025.34722776 -2437.17011894 1241.02548976 -2570.00000000 1322.83149625 -2437.17011894 1538.50975825 -2570.00000000 1620.31576474 -2437.17011894 1835.99402674 -2570.00000000 1917.80003323 -2437.17011894 2133.47829523 -2570.00000000 2215.28430173 -2437.17011894 2430.96256372 -2570.00000000 2512.76857022 -2437.17011894 2728.44683222 -2570.00000000 2810.25283871 -2437.17011894 2869.85599047 -2473.87794237 2970.78358229 -2310.00000000 140.74867592 -2310.00000000))
+(lmx-dim-aligned '(140.74867592 -2310.00000000) '(2970.78358229 -2310.00000000) '(1555.76612911 -2210.00000000) nil 1)
+(lmx-dim-rotated '(2970.78358229 -2570.00000000) '(2970.78358229 -2310.00000000) '(3070.78358229 -2440.00000000) 1.57079633 1)
+(lmx-dim-aligned '(0.00000000 -2538.53615135) '(51.08841579 -2570.00000000) '(-40.00000000 -2558.53615135) nil 1)
+(lmx-dim-aligned '(2810.25283871 -2437.17011894) '(2869.85599047 -2473.87794237) '(2909.85599047 -2493.87794237) nil 1)
+(lmx-dim-aligned '(2512.76857022 -2437.17011894) '(2728.44683222 -2570.00000000) '(1434.92799523 -2720.00000000) '(2640.60770122 -2483.58505947) 1)
+(lmx-dim-aligned '(2728.44683222 -2570.00000000) '(2810.25283871 -2437.17011894) '(2749.34983546 -2483.58505947) nil 1)
+(lmx-text "3\\U+53F7" '(-400.00000000 -2440.00000000) 80.00000000 7)
+;; 4: a=155 b=253.3 c=30 d=60 h=260 n=10
+(lmx-pline '(0.00000000 -3798.68276600 51.17842176 -3830.00000000 132.08127628 -3697.78907711 348.13951349 -3830.00000000 429.04236800 -3697.78907711 645.10060522 -3830.00000000 726.00345973 -3697.78907711 942.06169695 -3830.00000000 1022.96455146 -3697.78907711 1239.02278867 -3830.00000000 1319.92564319 -3697.78907711 1535.98388040 -3830.00000000 1616.88673491 -3697.78907711 1832.94497213 -3830.00000000 1913.84782664 -3697.78907711 2129.90606386 -3830.00000000 2210.80891837 -3697.78907711 2426.86715558 -3830.00000000 2507.77001010 -3697.78907711 2723.82824731 -3830.00000000 2804.73110182 -3697.78907711 2830.32031271 -3713.44769411 2918.09920172 -3570.00000000 139.93615764 -3570.00000000))
+(lmx-dim-aligned '(139.93615764 -3570.00000000) '(2918.09920172 -3570.00000000) '(1529.01767968 -3470.00000000) nil 1)
+(lmx-dim-rotated '(2918.09920172 -3830.00000000) '(2918.09920172 -3570.00000000) '(3018.09920172 -3700.00000000) 1.57079633 1)
+(lmx-dim-aligned '(0.00000000 -3798.68276600) '(51.17842176 -3830.00000000) '(-40.00000000 -3818.68276600) nil 1)
+(lmx-dim-aligned '(2804.73110182 -3697.78907711) '(2830.32031271 -3713.44769411) '(2870.32031271 -3733.44769411) nil 1)
+(lmx-dim-aligned '(2507.77001010 -3697.78907711) '(2723.82824731 -3830.00000000) '(1415.16015635 -3980.00000000) '(2635.79912870 -3743.89453855) 1)
+(lmx-dim-aligned '(2723.82824731 -3830.00000000) '(2804.73110182 -3697.78907711) '(2744.27967457 -3743.89453855) nil 1)
+(lmx-text "4\\U+53F7" '(-400.00000000 -3700.00000000) 80.00000000 7)
+(vla-EndUndoMark lmx-doc)
+(vla-ZoomExtents (vlax-get-acad-object))
+(princ)
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+from lmxLayout import Sheet
+from lmxScripts import HERE, fixture_data
+
+# autocad/ 下的脚本按目录内导入(from stairs import ...)，不用 pyautocad 也能加载
+sys.path.insert(0, os.path.join(HERE, "autocad"))
+from acadPipeline import Recorder, draw_pipelined, draw_sequential  # noqa: E402
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"sheet": Sheet(20000, 20000)}])
+def test_pipelined_matches_sequential(kwargs):
+    """The pipelined AutoCAD driver must draw the same entities as the plain loop, with fewer calls and retries."""
+    data = fixture_data() * 10
+    sequential = Recorder()
+    draw_sequential(sequential, data, **kwargs)
+    pipelined = Recorder(reject=0.05, seed=1)
+    stats = draw_pipelined(pipelined, data, chunk=7, delay=0.0, **kwargs)
+    assert pipelined.drawing() == sequential.drawing()
+    assert pipelined.rejected and stats["retries"] == pipelined.rejected
+    assert sum(pipelined.counts.values()) - pipelined.rejected < sum(sequential.counts.values())
@@ -0,0 +1,92 @@
+import math
+import os
+import re
+import sys
+import types
+
+import pytest
+
+from lmxScripts import HERE
+
+# autocad/ 下的脚本按目录内导入(from stairs import ...)，不用 pyautocad 也能加载
+sys.path.insert(0, os.path.join(HERE, "autocad"))
+from acadPipeline import Recorder  # noqa: E402
+from acadScript import export_lisp, iter_lisp  # noqa: E402
+from stairs import DATA  # noqa: E402
+
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "stairs.lsp")
+_POINT = r"'\((\S+) (\S+)\)"
+
+
+def _point(match, first):
+    return float(match.group(first)), float(match.group(first + 1)), 0.0
+
+
+def parse_lisp(lines):
+    """The entity lines of an acadScript file as (method, args, properties), like Recorder entities."""
+    entities = []
+    for line in lines:
+        if line.startswith("(lmx-pline "):
+            coords = tuple(float(v) for v in line[len("(lmx-pline '("):-2].split())
+            entities.append(("AddLightWeightPolyline", (coords,), {"Closed": True}))
+        elif line.startswith("(lmx-dim-aligned "):
+            m = re.fullmatch(rf"\(lmx-dim-aligned {_POINT} {_POINT} {_POINT} (nil|{_POINT}) (\d+)\)", line)
+            properties = {"Color": int(m.group(10))}
+            if m.group(7) != "nil":
+                properties["TextPosition"] = _point(m, 8)
+            entities.append(("AddDimAligned", (_point(m, 1), _point(m, 3), _point(m, 5)), properties))
+        elif line.startswith("(lmx-dim-rotated "):
+            m = re.fullmatch(rf"\(lmx-dim-rotated {_POINT} {_POINT} {_POINT} (\S+) (\d+)\)", line)
+            entities.append(("AddDimRotated", (_point(m, 1), _point(m, 3), _point(m, 5), float(m.group(7))),
+                             {"Color": int(m.group(8))}))
+        elif line.startswith("(lmx-text "):
+            m = re.fullmatch(rf'\(lmx-text "(.*)" {_POINT} (\S+) (\d+)\)', line)
+            text = re.sub(r"\\\\U\+([0-9A-F]{4})", lambda u: chr(int(u.group(1), 16)), m.group(1))
+            entities.append(("AddText", (text, _point(m, 2), float(m.group(4))), {"Color": int(m.group(5))}))
+    return entities
+
+
+def same(value, expected):
+    if isinstance(expected, str) or isinstance(value, str):
+        return value == expected
+    if isinstance(expected, (int, float)) and not isinstance(expected, bool):
+        return math.isclose(value, expected, abs_tol=1e-6)
+    if isinstance(expected, bool):
+        return value is expected
+    expected = list(expected)
+    return len(value) == len(expected) and all(same(v, e) for v, e in zip(value, expected))
+
+
+def test_golden(tmp_path):
+    """The fixture rows must produce exactly the checked-in stairs.lsp, on any platform."""
+    filename = str(tmp_path / "stairs.lsp")
+    export_lisp(filename, DATA)
+    with open(filename, "rb") as f, open(GOLDEN, "rb") as golden:
+        assert f.read() == golden.read()
+
+
+@pytest.mark.parametrize("pipelined", (False, True))
+def test_matches_create_stairs_drawing(monkeypatch, pipelined):
+    """Every polyline, dimension and text of the script must match what create_stairs_drawing draws."""
+    recorder = Recorder()
+    monkeypatch.setitem(sys.modules, "pyautocad", types.SimpleNamespace(Autocad=lambda **kwargs: recorder))
+    monkeypatch.delitem(sys.modules, "autocad", raising=False)
+    import autocad
+    autocad.create_stairs_drawing(DATA, pipelined=pipelined)
+    drawn = [(entity.method, entity.args, entity.properties) for entity in recorder.entities]
+    if pipelined:
+        # 流水线按类型成批绘制，顺序不同，按类型分组后比较
+        order = ("AddLightWeightPolyline", "AddDimAligned", "AddDimRotated", "AddText")
+        key = lambda entity: order.index(entity[0])  # noqa: E731
+    else:
+        key = None
+    script = parse_lisp("".join(iter_lisp(DATA)).splitlines())
+    if key is not None:
+        drawn.sort(key=key)
+        script.sort(key=key)
+    assert drawn and len(script) == len(drawn)
+    for k, ((method, args, properties), expected) in enumerate(zip(script, drawn)):
+        assert method == expected[0], f"第 {k + 1} 个实体"
+        assert same(args, expected[1]), f"第 {k + 1} 个实体 {method} 的参数"
+        assert properties.keys() == expected[2].keys() and all(
+            same(value, expected[2][name]) for name, value in properties.items()), f"第 {k + 1} 个实体 {method} 的属性"
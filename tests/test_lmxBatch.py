@@ -0,0 +1,79 @@
+import math
+import os
+
+import ezdxf
+import pytest
+
+from lmxBatch import draw_batch, profile_points
+from lmxScripts import HERE, fixture_data, load_script
+from rawDxf import save_polylines
+
+
+def check_round_trip(filename, x, y, offsets):
+    """Reads filename back with ezdxf and checks every polyline against the batch vertices."""
+    doc = ezdxf.readfile(filename)
+    auditor = doc.audit()
+    assert not auditor.has_errors, f"{filename}: ezdxf 审核发现错误 {auditor.errors}"
+    polylines = doc.modelspace().query("LWPOLYLINE")
+    assert len(polylines) == len(offsets) - 1
+    for i, polyline in enumerate(polylines):
+        expected = profile_points(x, y, offsets, i)
+        actual = [(px, py) for px, py, *_ in polyline.get_points()]
+        assert polyline.closed and len(actual) == len(expected), f"第 {i + 1} 个多段线"
+        assert all(math.isclose(p, q, abs_tol=1e-9) for pa, pe in zip(actual, expected) for p, q in zip(pa, pe)), \
+            f"{filename}: 第 {i + 1} 个多段线与计算结果不一致"
+
+
+# 脚本 -> 复现它的 draw_single 的 lmxBatch 变体
+REFERENCES = {
+    "multiLmx": "multiLmx",
+    "数据录入": "数据录入",
+    "deepseek-multi": "lmx",
+    "multi-super": "multi-super",
+    "Gemini2.5": "Gemini2.5",
+}
+
+
+@pytest.mark.parametrize("script", REFERENCES)
+def test_matches_draw_single(script):
+    """Every variant must produce the vertices of its script's draw_single, including c = 0 and d = 0 rows."""
+    data = fixture_data() + [[150, 250, 0, 60, 260, 3], [150, 250, 30, 0, 260, 3], [150, 250, 0, 0, 260, 2],
+                             [300, 100, 40, 20, 900, 2]]
+    draw_single = load_script(script).draw_single
+    x, y, offsets = draw_batch(data, REFERENCES[script])
+    for i, row in enumerate(data):
+        expected = draw_single(*row[:5], int(row[5]))
+        actual = profile_points(x, y, offsets, i)
+        assert len(actual) == len(expected), f"第 {i + 1} 行的顶点个数"
+        assert all(math.isclose(p, q, abs_tol=1e-9) for pa, pe in zip(actual, expected) for p, q in zip(pa, pe)), \
+            f"{script} 第 {i + 1} 行与 draw_single 不一致"
+
+
+def test_fixtures(tmp_path):
+    """dxf/lmx1..4.dxf were generated from multiLmx.data: the batch kernel and
+    the raw writer must still reproduce them."""
+    data = load_script("multiLmx").data
+    x, y, offsets = draw_batch(data, "multiLmx")
+    for i in range(len(data)):
+        sub = slice(offsets[i], offsets[i + 1])
+        check_round_trip(os.path.join(HERE, "dxf", f"lmx{i + 1}.dxf"), x[sub], y[sub],
+                         [0, offsets[i + 1] - offsets[i]])
+    filename = str(tmp_path / "round_trip.dxf")
+    save_polylines(filename, [(x[offsets[i]:offsets[i + 1]], y[offsets[i]:offsets[i + 1]])
+                              for i in range(len(data))],
+                   [(f"{i + 1}号", (0.0, -30.0), 25) for i in range(len(data))])
+    check_round_trip(filename, x, y, offsets)
+
+
+@pytest.mark.parametrize("row, message", [
+    ([0, 250, 30, 60, 260, 3], "必须大于 0"),
+    ([150, -250, 30, 60, 260, 3], "必须大于 0"),
+    ([150, 250, float("nan"), 60, 260, 3], "有限数字"),
+    ([150, 250, 30, 60, float("inf"), 3], "有限数字"),
+    ([150, 250, 30, 60, 260, 3.7], "必须是整数"),
+    ([150, 250, 30, 60, 260, 0], "至少为 1"),
+])
+def test_rejects_bad_rows(row, message):
+    """draw_batch must name the bad row instead of returning NaN vertices."""
+    with pytest.raises(ValueError, match=f"第 2 行.*{message}"):
+        draw_batch([[150, 250, 30, 60, 260, 3], row], "multiLmx")
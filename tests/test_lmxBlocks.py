@@ -0,0 +1,44 @@
+import ezdxf
+
+from lmxBlocks import block_name, profile_block, row_key, unique_rows
+from lmxProfile import profiles_from_batch
+from lmxScripts import fixture_data, load_script
+
+
+def test_row_key_and_unique_rows():
+    assert row_key([150, 250, 30, 60, 260, 3.0]) == row_key((150.0, 250.0, 30.0, 60.0, 260.0, 3))
+    data = [[1, 2, 3, 4, 5, 6], [7, 8, 9, 10, 11, 2], [1.0, 2.0, 3.0, 4.0, 5.0, 6], [7, 8, 9, 10, 11, 3]]
+    uniques, inverse = unique_rows(data)
+    assert uniques == [row_key(data[0]), row_key(data[1]), row_key(data[3])]
+    assert inverse == [0, 1, 0, 2]
+
+
+def test_block_name():
+    row = [150, 250, 30, 60, 260, 3]
+    name = block_name(row, "multi-super")
+    assert name.startswith("LMX_") and name == block_name(row_key(row), "multi-super")
+    assert len({name, block_name(row, "Gemini2.5"), block_name(row, "multi-super", "light"),
+                block_name(row[:5] + [4], "multi-super")}) == 4
+
+
+def test_profile_block():
+    row = [150, 250, 30, 60, 260, 3]
+    profile = profiles_from_batch([row], "multi-super")[0]
+    doc = ezdxf.new()
+    block = profile_block(doc, profile, "multi-super")
+    assert block.name == block_name(row, "multi-super")
+    (polyline,) = block.query("LWPOLYLINE")
+    assert polyline.closed and [tuple(p) for p in polyline.get_points("xy")] == profile.points()
+
+
+def test_repeated_rows_share_blocks(tmp_path):
+    """Each distinct row is defined once and every row is one INSERT of it."""
+    data = fixture_data() * 3
+    filename = str(tmp_path / "blocks.dxf")
+    load_script("multi-super").draw_all_in_one(data, filename, use_blocks=True)
+    doc = ezdxf.readfile(filename)
+    inserts = doc.modelspace().query("INSERT")
+    names = {block.name for block in doc.blocks if block.name.startswith("LMX_")}
+    assert len(names) == len(unique_rows(data)[0])
+    assert len(inserts) == len(data) and {insert.dxf.name for insert in inserts} == names
+    assert not doc.modelspace().query("LWPOLYLINE")
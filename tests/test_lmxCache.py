@@ -0,0 +1,83 @@
+import os
+
+import lmxCache
+from lmxCache import DxfCache, GeometryCache, LmxCache, param_key
+from lmxScripts import load_script
+
+ROW = [150, 250, 30, 60, 260, 3]
+
+
+def test_param_key(monkeypatch):
+    key = param_key(ROW)
+    assert param_key([150.0, 250.0, 30, 60, 260, 3.0]) == key
+    assert param_key(ROW, "multi-super") != key
+    assert param_key(ROW, kind="raw") != key
+    monkeypatch.setattr(lmxCache, "GENERATOR_VERSION", lmxCache.GENERATOR_VERSION + 1)
+    assert param_key(ROW) != key
+
+
+def test_geometry_lru():
+    cache = GeometryCache(maxsize=2)
+    rows = [ROW[:5] + [n] for n in (2, 3, 4)]
+    first = cache.profile(rows[0])
+    first.translate(100.0, 0.0)
+    # 调用方改动的是副本
+    assert cache.profile(rows[0]).bbox() != first.bbox()
+    cache.profile(rows[1])
+    cache.profile(rows[0])          # rows[0] 变成最近使用
+    cache.profile(rows[2])          # 淘汰 rows[1]
+    assert (cache.hits, cache.misses) == (2, 3)
+    cache.profile(rows[0])
+    cache.profile(rows[1])
+    assert (cache.hits, cache.misses) == (3, 4)
+
+
+def _write(path, size):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+
+def test_dxf_copy_on_hit(tmp_path):
+    cache = DxfCache(str(tmp_path / "cache"))
+    src = str(tmp_path / "src.dxf")
+    _write(src, 100)
+    cache.store("ab01", src)
+    dst = str(tmp_path / "dst.dxf")
+    assert cache.fetch("ab01", dst)
+    assert not os.path.samefile(dst, cache._path("ab01"))
+    # 改写输出文件不能改动缓存
+    _write(dst, 5)
+    assert os.path.getsize(cache._path("ab01")) == 100
+    assert not cache.fetch("cd02", dst)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_dxf_evicts_to_low_water(tmp_path):
+    cache = DxfCache(str(tmp_path / "cache"), max_bytes=1000)
+    src = str(tmp_path / "src.dxf")
+    _write(src, 100)
+    keys = [f"{i:02d}{i}" for i in range(10)]
+    for key in keys:
+        cache.store(key, src)
+    assert cache.total_bytes == 1000 and cache.evictions == 0
+    # 最旧的 00 被用过，淘汰从 01 开始
+    assert cache.fetch(keys[0], str(tmp_path / "dst.dxf"))
+    cache.store("aa10", src)
+    assert cache.total_bytes <= 0.9 * 1000 and cache.evictions == 2
+    assert not os.path.exists(cache._path(keys[1])) and not os.path.exists(cache._path(keys[2]))
+    assert os.path.exists(cache._path(keys[0]))
+    # 重新打开时从磁盘建立同样的索引
+    assert DxfCache(str(tmp_path / "cache"), max_bytes=1000).total_bytes == cache.total_bytes
+
+
+def test_draw_multiple_with_cache(tmp_path):
+    draw_multiple = load_script("multiLmx").draw_multiple
+    data = [ROW, ROW[:5] + [4]]
+    cache = LmxCache(str(tmp_path / "cache"))
+    draw_multiple(data, str(tmp_path / "a"), cache=cache)
+    manifest = draw_multiple(data, str(tmp_path / "b"), cache=cache)
+    assert [item["pid"] for item in manifest] == [None, None]
+    assert cache.stats()["dxf_hits"] == 2
+    for i in (1, 2):
+        with open(tmp_path / "a" / f"lmx{i}.dxf", "rb") as a, open(tmp_path / "b" / f"lmx{i}.dxf", "rb") as b:
+            assert a.read() == b.read()
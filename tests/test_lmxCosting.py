@@ -0,0 +1,29 @@
+import ezdxf
+import numpy as np
+import pytest
+
+from lmxBatch import VARIANTS
+from lmxCosting import cutting_list, measure
+from lmxProfile import profiles_from_batch
+from lmxScripts import fixture_data
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_measure(variant):
+    """Vectorized areas, perimeters and boxes must match a per-profile computation with ezdxf.math."""
+    data = fixture_data()
+    sizes = measure(data, variant)
+    for i, profile in enumerate(profiles_from_batch(data, variant)):
+        points = [ezdxf.math.Vec2(p) for p in profile.points()]
+        perimeter = sum(p.distance(q) for p, q in zip(points, points[1:] + points[:1]))
+        box = [sizes[key][i] for key in ("min_x", "min_y", "max_x", "max_y")]
+        assert np.isclose(sizes["area"][i], ezdxf.math.area(points)), f"第 {i + 1} 行的面积"
+        assert np.isclose(sizes["perimeter"][i], perimeter), f"第 {i + 1} 行的周长"
+        assert np.allclose(box, profile.bbox()), f"第 {i + 1} 行的外框"
+
+
+def test_repeats_merged():
+    data = fixture_data()
+    report = cutting_list(data + data[:3], thickness=12)
+    assert [item["count"] for item in report["items"][:4]] == [2, 2, 2, 1]
+    assert report["profiles"] == len(data) + 3
@@ -0,0 +1,80 @@
+import ezdxf
+import numpy as np
+
+from lmxDims import DIMASZ, LightDims
+from lmxPlacement import Placer
+from lmxProfile import profiles_from_batch
+from lmxScripts import fixture_data, load_script
+
+ROWS = fixture_data() + [[150, 250, 0, 60, 260, 3], [150, 250, 30, 0, 260, 1]]
+
+
+def rendered_dimensions(row, profile):
+    # multi-super.add_dimensions 渲染出的每个标注: (两条尺寸界线, 尺寸线各段, 文字, 文字角度)
+    module = load_script("multi-super")
+    doc = ezdxf.new()
+    module.setup_dimstyle(doc)
+    msp = doc.modelspace()
+    module.add_dimensions(msp, profile, row)
+    dimensions = []
+    for dimension in msp.query("DIMENSION"):
+        block = doc.blocks.get(dimension.dxf.geometry)
+        lines = [(e.dxf.start.vec2, e.dxf.end.vec2) for e in block.query("LINE")]
+        mtext = block.query("MTEXT").first
+        dimensions.append((lines[:2], lines[2:], mtext.text, mtext.dxf.rotation))
+    return dimensions
+
+
+def test_matches_dimension_entities():
+    """Extension lines, dimension line, text and angle must match ezdxf's rendering of the DIMENSION entities."""
+    profiles = profiles_from_batch(ROWS, "multi-super")
+    light = LightDims(profiles, ROWS)
+    for i, (row, profile) in enumerate(zip(ROWS, profiles)):
+        expected = rendered_dimensions(row, profile)
+        start, stop = light.offsets[i], light.offsets[i + 1]
+        assert stop - start == len(expected), f"第 {i + 1} 行的标注个数"
+        for k, (extension, pieces, text, rotation) in zip(range(start, stop), expected):
+            assert np.allclose([light.ext1[k], light.ext2[k]], extension, atol=1e-6)
+            # 渲染的尺寸线被箭头和文字截断，每一段都落在 LightDims 的尺寸线上; 标注太短时 ezdxf 把箭头放到外侧，
+            # 尺寸线两端各伸出两个箭头长
+            (x1, y1), (x2, y2) = light.line[k]
+            length = np.hypot(x2 - x1, y2 - y1)
+            for point in np.reshape(pieces, (-1, 2)):
+                along = ((point[0] - x1) * (x2 - x1) + (point[1] - y1) * (y2 - y1)) / length
+                across = ((point[0] - x1) * (y2 - y1) - (point[1] - y1) * (x2 - x1)) / length
+                assert abs(across) < 1e-6 and -2 * DIMASZ - 1e-6 < along < length + 2 * DIMASZ + 1e-6
+            # ezdxf 按图层设置用逗号作小数点
+            assert light.texts[k] == text.replace(",", ".")
+            turn = (light.rotation[k] - rotation) % 180
+            assert np.isclose(turn, 0) or np.isclose(turn, 180)
+
+
+def test_add_to_and_reserve():
+    profiles = profiles_from_batch(ROWS[:2], "multi-super")
+    light = LightDims(profiles, ROWS[:2])
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    light.add_to(msp, 1, dx=1000.0, dy=-500.0)
+    count = light.offsets[2] - light.offsets[1]
+    kinds = [entity.dxftype() for entity in msp]
+    assert kinds.count("LINE") == 3 * count and kinds.count("SOLID") == 2 * count and kinds.count("MTEXT") == count
+    assert sorted(e.text for e in msp.query("MTEXT")) == sorted(light.texts[light.offsets[1]:light.offsets[2]])
+    line = msp.query("LINE").first
+    assert np.allclose([line.dxf.start.vec2, line.dxf.end.vec2], light.ext1[light.offsets[1]] + (1000.0, -500.0))
+
+
+def test_reserve():
+    """Reserved dimension lines block the placer; with texts the default text spot is taken too."""
+    profiles = profiles_from_batch(ROWS[:1], "multi-super")
+    light = LightDims(profiles, ROWS[:1])
+    (x1, y1), (x2, y2) = light.line[0] + (10.0, 20.0)
+    mx, my = (x1 + x2) / 2, (y1 + y2) / 2
+    on_line = (mx - 1, my - 1, mx + 1, my + 1)
+    tx, ty = light.text_pos[0] + (10.0, 20.0)
+    on_text = (tx - 0.5, ty - 0.5, tx + 0.5, ty + 0.5)
+    placer = Placer()
+    light.reserve(placer, 0, 10.0, 20.0)
+    assert placer.index.hits(on_line) and not placer.index.hits(on_text)
+    placer = Placer()
+    light.reserve(placer, 0, 10.0, 20.0, texts=True)
+    assert placer.index.hits(on_text)
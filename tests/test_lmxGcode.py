@@ -0,0 +1,50 @@
+import numpy as np
+
+from lmxGcode import export_gcode, order_cuts
+from lmxLayout import Sheet
+
+
+def gcode_contours(filename):
+    # (穿孔点, 切割经过的顶点) 列表，只认 export_gcode 写出的格式
+    contours = []
+    with open(filename, encoding="ascii") as f:
+        blocks = f.read().split("M5\n")[:-1]
+    for block in blocks:
+        moves = [line.split() for line in block.splitlines() if line.startswith(("G0 X", "G1 X"))]
+        xy = np.array([[float(move[1][1:]), float(move[2][1:])] for move in moves])
+        contours.append((xy[0], xy[1:]))
+    return contours
+
+
+def test_export(tmp_path):
+    """Cuts must be closed, clockwise, inside the table and pierced outside the part; ordering must beat input order."""
+    rng = np.random.default_rng(7)
+    data = [[rng.uniform(150, 200), rng.uniform(240, 300), rng.choice([0, 30]), rng.choice([0, 40]), 400,
+             int(rng.integers(2, 6))] for _ in range(300)]
+    table = Sheet(6000, 3000, gap=5.0, sheet_gap=0.0)
+    reports = export_gcode(data, str(tmp_path / "job.nc"), table=table)
+    assert sorted(row for report in reports for row in report["order"]) == list(range(1, len(data) + 1))
+    for report in reports:
+        assert report["travel_length"] <= report["baseline_travel"]
+        for pierce, cut in gcode_contours(report["path"]):
+            outline = cut[:-1]
+            area = np.dot(outline[:, 0], np.roll(outline[:, 1], -1)) - np.dot(np.roll(outline[:, 0], -1), outline[:, 1])
+            # 穿孔点向右的射线与轮廓交点个数为偶数，即在零件外面
+            x0, y0 = outline.T
+            x1, y1 = np.roll(outline, -1, axis=0).T
+            with np.errstate(divide="ignore", invalid="ignore"):
+                crossings = ((y0 > pierce[1]) != (y1 > pierce[1])) & \
+                    (pierce[0] < x0 + (x1 - x0) * (pierce[1] - y0) / (y1 - y0))
+            assert np.allclose(cut[0], cut[-1]) and area < 0 and crossings.sum() % 2 == 0
+            assert np.r_[pierce, cut.ravel()].min() >= 0
+            assert cut[:, 0].max() <= table.width and cut[:, 1].max() <= table.height
+
+
+def test_two_opt_shortens():
+    rng = np.random.default_rng(7)
+    points = rng.uniform(0, 3000, (2000, 2))
+    lengths = []
+    for passes in (0, 20):
+        path = np.vstack([[0, 0], points[order_cuts(points, passes=passes)]])
+        lengths.append(np.hypot(*np.diff(path, axis=0).T).sum())
+    assert lengths[1] < lengths[0]
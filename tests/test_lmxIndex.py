@@ -0,0 +1,95 @@
+import os
+import tracemalloc
+
+import ezdxf
+import pytest
+
+from lmxIndex import FITTED, DxfIndex, scan_polylines
+from lmxOutput import save_dxf
+from lmxProfile import profiles_from_batch
+from lmxScripts import fixture_data
+
+
+def test_find_moved_outlines(tmp_path):
+    """Every fixture row, drawn by each variant and moved elsewhere, must be found again by lmxIndex."""
+    data = fixture_data()
+    drawings = tmp_path / "dxf"
+    drawings.mkdir()
+    for variant in FITTED:
+        for i, profile in enumerate(profiles_from_batch(data, variant)):
+            profile.translate(1000.0 * i, -500.0)
+            backend, fmt = (("raw", "asc"), ("ezdxf", "asc"), ("ezdxf", "bin"))[i % 3]
+            save_dxf(str(drawings / f"{variant}{i}.dxf"), [profile], backend=backend, fmt=fmt)
+    with DxfIndex(str(tmp_path / "index.sqlite")) as index:
+        assert not index.update(str(drawings))["unfitted"]
+        for variant in FITTED:
+            for i, row in enumerate(data):
+                names = [os.path.basename(path) for path, _, _, _ in index.lookup(row, variant)]
+                assert f"{variant}{i}.dxf" in names, f"找不到 {variant} 第 {i + 1} 行"
+
+
+def test_padded_group_codes_and_tolerance(tmp_path):
+    """Group codes padded with spaces (as other CAD programs write them) still parse;
+    lookups match within the tolerance and no further."""
+    row = [150.3, 250, 30, 60, 260, 3]
+    filename = str(tmp_path / "raw.dxf")
+    save_dxf(filename, profiles_from_batch([row], "multiLmx"), backend="raw", fmt="asc")
+    with open(filename, encoding="ascii") as f:
+        lines = f.read().splitlines()
+    lines[0::2] = [code.rjust(3) for code in lines[0::2]]
+    with open(filename, "w", encoding="ascii") as f:
+        f.write("\n".join(lines) + "\n")
+    with DxfIndex(str(tmp_path / "index.sqlite")) as index:
+        index.update(str(tmp_path))
+        assert len(index) == 1
+        assert index.lookup([150.3 + 1e-6, 250, 30, 60, 260, 3])
+        assert not index.lookup([150.4, 250, 30, 60, 260, 3])
+
+
+def test_gemini_not_fitted(tmp_path):
+    """Gemini2.5 outlines are not mistaken for another variant's, and cannot be looked up."""
+    row = [181, 217.5, 120, 50, 240, 5]
+    save_dxf(str(tmp_path / "gemini.dxf"), profiles_from_batch([row], "Gemini2.5"))
+    with DxfIndex(str(tmp_path / "index.sqlite")) as index:
+        assert index.update(str(tmp_path))["unfitted"] == 1
+        with pytest.raises(ValueError, match="Gemini2.5"):
+            index.lookup(row, "Gemini2.5")
+
+
+@pytest.mark.parametrize("fmt", ["asc", "bin"])
+def test_scan_matches_ezdxf(tmp_path, fmt):
+    """The streaming scan finds the same polylines as ezdxf, in model space and in blocks,
+    without holding the file in memory."""
+    fixtures = fixture_data()
+    filename = str(tmp_path / f"{fmt}.dxf")
+    doc = ezdxf.new()
+    for i, profile in enumerate(profiles_from_batch([fixtures[i % len(fixtures)] for i in range(2000)], "multiLmx")):
+        profile.translate(0.0, -400.0 * i)
+        profile.add_to(doc.modelspace())
+    block = doc.blocks.new("EXTRA")
+    block.add_lwpolyline([(0, 0), (1, 0), (1, 1)], close=True)
+    block.add_lwpolyline([(0, 0), (2, 2)])
+    doc.saveas(filename, fmt=fmt)
+    expected = [(e.dxf.handle, e.closed, [tuple(p) for p in e.get_points("xy")])
+                for layout in ezdxf.readfile(filename).layouts_and_blocks() for e in layout.query("LWPOLYLINE")]
+    assert sorted(scan_polylines(filename)) == sorted(expected)
+
+    tracemalloc.start()
+    try:
+        for _ in scan_polylines(filename):
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < os.path.getsize(filename) / 10
+
+
+def test_truncated_binary(tmp_path):
+    filename = str(tmp_path / "cut.dxf")
+    save_dxf(filename, profiles_from_batch(fixture_data()[:3], "multiLmx"), fmt="bin")
+    with open(filename, "rb") as f:
+        data = f.read()
+    with open(filename, "wb") as f:
+        f.write(data[:len(data) // 2])
+    with pytest.raises(ValueError, match="不完整"):
+        list(scan_polylines(filename))
@@ -0,0 +1,46 @@
+import os
+
+import ezdxf
+import numpy as np
+import pytest
+
+from lmxLayout import Sheet, find_overlaps
+from lmxScripts import fixture_data, load_script
+
+
+def polyline_boxes(filename):
+    boxes = []
+    for polyline in ezdxf.readfile(filename).modelspace().query("LWPOLYLINE"):
+        xy = np.array(polyline.get_points("xy"))
+        boxes.append((*xy.min(axis=0), *xy.max(axis=0)))
+    return boxes
+
+
+@pytest.mark.parametrize("sort", (True, False))
+def test_random_boxes(sort):
+    """Sheet packing must never overlap, including boxes larger than the sheet."""
+    rng = np.random.default_rng(0)
+    sizes = rng.uniform(50, 3000, size=(2000, 2))
+    sizes[::97] *= 10  # 超出图纸大小的框
+    boxes = np.concatenate([np.zeros_like(sizes), sizes], axis=1)
+    offsets = Sheet(8000, 6000, sort=sort).place(boxes)
+    assert not find_overlaps(boxes + np.tile(offsets, 2))
+
+
+def test_combined_drawings(tmp_path):
+    """The combined drawings placed on a sheet must not overlap either."""
+    fixtures = fixture_data()
+    data = [fixtures[i % len(fixtures)][:5] + [10] for i in range(60)]
+    sheet = Sheet(8000, 3000)
+    outputs = []
+    filename = str(tmp_path / "gemini.dxf")
+    load_script("Gemini2.5").draw_multiple_in_one_file(data, filename, use_blocks=False, sheet=sheet)
+    outputs.append(filename)
+    load_script("deepseek-multi").draw_multiple(data, str(tmp_path), backend="raw", sheet=sheet)
+    outputs.append(str(tmp_path / "lmx.dxf"))
+    filename = str(tmp_path / "super.dxf")
+    load_script("multi-super").draw_all_in_one(data, filename, use_blocks=False, light_dims=True, sheet=sheet)
+    outputs.append(filename)
+    for filename in outputs:
+        boxes = polyline_boxes(filename)
+        assert len(boxes) == len(data) and not find_overlaps(boxes), f"{os.path.basename(filename)}: 图形在图纸上重叠"
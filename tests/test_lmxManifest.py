@@ -0,0 +1,56 @@
+import os
+
+import lmxCache
+import lmxManifest
+from lmxManifest import load_manifest, prepare_incremental, save_manifest
+from lmxScripts import fixture_data, load_script
+
+
+def run(output_dir, data, filename_of=lambda i: f"lmx{i + 1}.dxf"):
+    # 模拟一次生成: 写出 todo 里的文件并保存清单
+    entries, todo = prepare_incremental(output_dir, data, "multiLmx", "ezdxf", filename_of)
+    for i in todo:
+        with open(os.path.join(output_dir, entries[i]["file"]), "w", encoding="ascii") as f:
+            f.write(str(data[i]))
+    save_manifest(output_dir, entries)
+    return todo
+
+
+def test_incremental(tmp_path):
+    output_dir = str(tmp_path)
+    data = [list(row) for row in fixture_data()[:5]]
+    assert run(output_dir, data) == [0, 1, 2, 3, 4]
+    assert run(output_dir, data) == []
+    (tmp_path / "notes.txt").write_text("kept", encoding="ascii")
+    data[2][0] += 1
+    stamp = os.stat(tmp_path / "lmx1.dxf").st_mtime_ns
+    assert run(output_dir, data) == [2]
+    assert (tmp_path / "lmx3.dxf").read_text(encoding="ascii") == str(data[2])
+    assert os.stat(tmp_path / "lmx1.dxf").st_mtime_ns == stamp
+    # 删掉的行的文件被删除，清单以外的文件不动
+    assert run(output_dir, data[:3]) == []
+    assert sorted(os.listdir(output_dir)) == ["lmx1.dxf", "lmx2.dxf", "lmx3.dxf", "lmx_manifest.json", "notes.txt"]
+    # 输出文件被删掉时重画
+    os.remove(tmp_path / "lmx2.dxf")
+    assert run(output_dir, data[:3]) == [1]
+
+
+def test_shared_file(tmp_path):
+    """Rows drawn into one combined file are all regenerated when any of them changes or goes away."""
+    data = [list(row) for row in fixture_data()[:4]]
+    assert run(str(tmp_path), data, lambda i: "all.dxf") == [0, 1, 2, 3]
+    assert run(str(tmp_path), data[:3], lambda i: "all.dxf") == [0, 1, 2]
+    assert run(str(tmp_path), data[:3], lambda i: "all.dxf") == []
+
+
+def test_version_bump_rebuilds(tmp_path, monkeypatch):
+    output_dir = str(tmp_path)
+    data = fixture_data()[:3]
+    manifest = load_script("multiLmx").draw_multiple(data, output_dir)
+    assert len(manifest) == 3 and load_manifest(output_dir)
+    assert load_script("multiLmx").draw_multiple(data, output_dir) == []
+    version = lmxCache.GENERATOR_VERSION + 1
+    monkeypatch.setattr(lmxCache, "GENERATOR_VERSION", version)
+    monkeypatch.setattr(lmxManifest, "GENERATOR_VERSION", version)
+    assert load_manifest(output_dir) == []
+    assert len(load_script("multiLmx").draw_multiple(data, output_dir)) == 3
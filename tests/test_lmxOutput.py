@@ -0,0 +1,77 @@
+import io
+import os
+import tempfile
+import zipfile
+
+import ezdxf
+import pytest
+
+from lmxOutput import check_format, dxf_bytes, write_zip
+from lmxProfile import profiles_from_batch
+from lmxScripts import fixture_data, load_script
+
+BINARY = b"AutoCAD Binary DXF\r\n\x1a\x00"
+
+
+def polylines(filename):
+    return [[tuple(p) for p in e.get_points("xy")] for e in ezdxf.readfile(filename).modelspace().query("LWPOLYLINE")]
+
+
+@pytest.fixture
+def no_temp(tmp_path, monkeypatch):
+    """Working directory and tempfile directory that must stay empty apart from the outputs."""
+    work = tmp_path / "work"
+    temp = tmp_path / "temp"
+    work.mkdir()
+    temp.mkdir()
+    monkeypatch.chdir(work)
+    monkeypatch.setattr(tempfile, "tempdir", str(temp))
+    yield work
+    assert os.listdir(temp) == []
+
+
+@pytest.mark.parametrize("backend, fmt", [("ezdxf", "asc"), ("ezdxf", "bin"), ("raw", "asc")])
+def test_write_zip(no_temp, tmp_path, backend, fmt):
+    """Every member reads back with ezdxf as the profile written into it, and nothing else lands on disk."""
+    data = fixture_data()
+    profiles = profiles_from_batch(data, "multiLmx")
+    count = load_script("multiLmx").draw_zip(data, "lmx.zip", backend, fmt)
+    assert count == len(data) and os.listdir(no_temp) == ["lmx.zip"]
+    with zipfile.ZipFile(no_temp / "lmx.zip") as archive:
+        names = archive.namelist()
+        assert names == [f"lmx{i + 1}.dxf" for i in range(len(data))]
+        for name, profile in zip(names, profiles):
+            content = archive.read(name)
+            assert content.startswith(BINARY) == (fmt == "bin")
+            # ezdxf 不能直接从 zip 里读二进制 DXF，先解到测试自己的目录
+            member = tmp_path / name
+            member.write_bytes(content)
+            assert polylines(str(member)) == [pytest.approx(profile.points())]
+
+
+def test_write_zip_to_stream():
+    profiles = profiles_from_batch(fixture_data()[:3], "multiLmx")
+    buffer = io.BytesIO()
+    assert write_zip(buffer, ((f"{i}.dxf", p) for i, p in enumerate(profiles)), fmt="bin") == 3
+    with zipfile.ZipFile(buffer) as archive:
+        # 时间戳和 GUID 每次不同，只比较文件头和大小
+        expected = dxf_bytes([profiles[0]], fmt="bin")
+        assert archive.read("0.dxf")[:len(BINARY)] == BINARY and len(archive.read("0.dxf")) == len(expected)
+
+
+def test_draw_multiple_bin(no_temp):
+    data = fixture_data()
+    load_script("multiLmx").draw_multiple(data, "dxf", fmt="bin")
+    profiles = profiles_from_batch(data, "multiLmx")
+    for i, profile in enumerate(profiles):
+        filename = no_temp / "dxf" / f"lmx{i + 1}.dxf"
+        assert filename.read_bytes().startswith(BINARY)
+        assert polylines(str(filename)) == [pytest.approx(profile.points())]
+
+
+def test_check_format():
+    check_format("raw", "asc")
+    with pytest.raises(ValueError, match="raw"):
+        check_format("raw", "bin")
+    with pytest.raises(ValueError, match="未知的 fmt"):
+        load_script("multiLmx").draw_zip([[150, 250, 30, 60, 260, 3]], io.BytesIO(), fmt="dwg")
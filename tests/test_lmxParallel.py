@@ -0,0 +1,32 @@
+import os
+
+import ezdxf
+import pytest
+
+from lmxScripts import fixture_data, load_script
+
+
+def polylines(filename):
+    return [polyline.get_points("xy") for polyline in ezdxf.readfile(filename).modelspace().query("LWPOLYLINE")]
+
+
+@pytest.mark.parametrize("script", ("multiLmx", "数据录入"))
+@pytest.mark.parametrize("backend", ("ezdxf", "raw"))
+def test_pool_matches_serial(tmp_path, script, backend):
+    """A chunked pool must write the same files and return the same manifest entries as the serial path."""
+    data = fixture_data() * 3
+    draw_multiple = load_script(script).draw_multiple
+    serial = draw_multiple(data, str(tmp_path / "serial"), backend=backend)
+    pooled = draw_multiple(data, str(tmp_path / "pool"), workers=2, chunk_size=4, backend=backend)
+    for manifest, folder in ((serial, "serial"), (pooled, "pool")):
+        assert [item["index"] for item in manifest] == list(range(1, len(data) + 1))
+        assert [item["path"] for item in manifest] == [str(tmp_path / folder / f"lmx{i + 1}.dxf")
+                                                       for i in range(len(data))]
+        assert all(item["seconds"] >= 0 for item in manifest)
+    assert {item["pid"] for item in serial} == {os.getpid()}
+    assert os.getpid() not in {item["pid"] for item in pooled}
+    for a, b in zip(serial, pooled):
+        assert polylines(a["path"]) == polylines(b["path"])
+    # 第二次什么都没变，两种模式都不重画
+    assert draw_multiple(data, str(tmp_path / "serial"), backend=backend) == []
+    assert draw_multiple(data, str(tmp_path / "pool"), workers=2, chunk_size=4, backend=backend) == []
@@ -0,0 +1,64 @@
+import os
+
+import ezdxf
+import numpy as np
+import pytest
+
+from lmxPatch import patch_rows
+from lmxScripts import fixture_data, load_script
+
+
+def model_space(filename):
+    # 与句柄、顺序无关的模型空间内容: 类型、多段线外框、块名和插入点、文字
+    doc = ezdxf.readfile(filename)
+    assert not doc.audit().has_errors, f"{os.path.basename(filename)}: ezdxf 审核发现错误"
+    items = []
+    for entity in doc.modelspace():
+        kind = entity.dxftype()
+        if kind == "LWPOLYLINE":
+            xy = np.array(entity.get_points("xy"))
+            items.append((kind, tuple(np.round(np.r_[xy.min(axis=0), xy.max(axis=0)], 6))))
+        elif kind == "INSERT":
+            items.append((kind, entity.dxf.name, tuple(np.round(entity.dxf.insert, 6))))
+        elif kind == "TEXT":
+            items.append((kind, entity.dxf.text, tuple(np.round(entity.dxf.insert, 6))))
+        else:
+            items.append((kind,))
+    return sorted(items)
+
+
+@pytest.mark.parametrize("script, function, kwargs", [
+    ("multi-super", "draw_all_in_one", {"use_blocks": False}),
+    ("multi-super", "draw_all_in_one", {"use_blocks": True}),
+    ("Gemini2.5", "draw_multiple_in_one_file", {"use_blocks": True}),
+])
+def test_patch_matches_rebuild(tmp_path, script, function, kwargs):
+    """A drawing patched row by row with lmxPatch must match the same rows drawn from scratch at the same slots."""
+    data = fixture_data() * 3
+    changes = {2: [190, 230, 110, 50, 260, 4], 5: [198, 230, 30, 0, 260, 5], 40: [151.2, 250, 60, 70, 290, 14]}
+    if script == "Gemini2.5":
+        # 后两行按 Gemini2.5 的 F 点会自相交，预检不让更新
+        changes.update({5: [181, 217.5, 120, 50, 240, 5], 40: [173, 251, 70, 70, 250, 13]})
+    changed = [list(row) for row in data]
+    for number, row in changes.items():
+        changed[number - 1] = row
+    patched = str(tmp_path / "patched.dxf")
+    rebuilt = str(tmp_path / "rebuilt.dxf")
+    module = load_script(script)
+    offsets = module.layout_rows(data)
+    getattr(module, function)(data, patched, offsets=offsets, row_map=True, **kwargs)
+    patch_rows(patched, changes)
+    getattr(module, function)(changed, rebuilt, offsets=offsets, **kwargs)
+    assert model_space(patched) == model_space(rebuilt)
+
+
+def test_gemini_rows_preflighted(tmp_path):
+    """Rows that Gemini2.5 would draw crossing themselves are refused before the drawing is touched."""
+    filename = str(tmp_path / "gemini.dxf")
+    load_script("Gemini2.5").draw_multiple_in_one_file([[181, 217.5, 120, 50, 240, 5]] * 3, filename, row_map=True)
+    with open(filename, "rb") as f:
+        before = f.read()
+    with pytest.raises(ValueError, match="F-A"):
+        patch_rows(filename, {2: [198, 230, 30, 0, 260, 5]})
+    with open(filename, "rb") as f:
+        assert f.read() == before
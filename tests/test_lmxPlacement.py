@@ -0,0 +1,53 @@
+import numpy as np
+
+from lmxPlacement import GridIndex, Placer, _boxes_hit, _segment_hits_box, rotated_text_box
+from lmxProfile import profiles_from_batch
+
+
+def test_segment_hits_box():
+    box = (0, 0, 10, 10)
+    assert _segment_hits_box(-5, 5, 15, 5, box)
+    assert _segment_hits_box(2, 2, 3, 3, box)            # 整段在框内
+    assert not _segment_hits_box(-5, 10, 15, 10, box)    # 沿边不算
+    assert not _segment_hits_box(-5, -5, -1, 20, box)
+    assert not _segment_hits_box(10, 5, 20, 5, box)      # 只碰到边
+
+
+def test_grid_matches_brute_force():
+    """GridIndex must answer exactly like checking every item, for any cell size."""
+    rng = np.random.default_rng(5)
+    segments = rng.uniform(0, 2000, (300, 4))
+    corners = rng.uniform(0, 2000, (100, 2))
+    boxes = np.concatenate([corners, corners + rng.uniform(1, 300, (100, 2))], axis=1)
+    queries = rng.uniform(0, 2000, (500, 2))
+    queries = np.concatenate([queries, queries + rng.uniform(1, 100, (500, 2))], axis=1).tolist()
+    expected = [any(_segment_hits_box(*s, q) for s in segments.tolist())
+                or any(_boxes_hit(q, b) for b in boxes.tolist()) for q in queries]
+    for cell_size in (37.0, 200.0, 5000.0):
+        index = GridIndex(cell_size)
+        for segment in segments.tolist():
+            index.add_segment(*segment)
+        for box in boxes.tolist():
+            index.add_box(box)
+        assert [index.hits(q) for q in queries] == expected
+
+
+def test_placer():
+    placer = Placer()
+    profile = profiles_from_batch([[150, 250, 30, 60, 260, 3]], "multi-super")[0]
+    placer.add_profile(profile, 1000.0, 0.0)
+    # 顶边 E-F 中点上的小框
+    (x1, h), (x2, _) = profile.point(profile.idx_E), profile.point(profile.idx_F)
+    on_top = (1000 + (x1 + x2) / 2 - 5, h - 5, 1000 + (x1 + x2) / 2 + 5, h + 5)
+    free = (0, 0, 10, 10)
+    assert placer.place([on_top, free]) == 1
+    # 刚放下的框已被占用，下一个候选生效
+    assert placer.place([free, (20, 0, 30, 10)]) == 1
+    assert placer.collisions == 0
+    assert placer.place([on_top, free]) == 0 and placer.collisions == 1
+
+
+def test_rotated_text_box():
+    assert rotated_text_box(0, 0, "ab", 10) == (-10, -5, 10, 5)
+    assert np.allclose(rotated_text_box(0, 0, "ab", 10, 90), (-5, -10, 5, 10))
+    assert np.allclose(rotated_text_box(0, 0, "ab", 10, 0, 0.5), (-5, -5, 5, 5))
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from lmxBatch import VARIANTS, draw_batch
+from lmxPreflight import STATUSES, classify, preflight
+from lmxScripts import fixture_data, load_script
+
+ROWS = [
+    ([150, 250, 30, 60, 260, 3], "ok"),
+    ([0, 250, 30, 60, 260, 3], "degenerate"),
+    ([150, 0, 30, 60, 260, 3], "degenerate"),
+    ([150, 250, 30, 60, 260, 0], "degenerate"),
+    ([150, 250, 30, 60, 260, 2.5], "degenerate"),
+    ([float("nan"), 250, 30, 60, 260, 3], "degenerate"),
+    ([150, 250, 30, 60, 100, 3], "inverted_top"),
+    ([150, 250, -30, 60, 260, 3], "self_overlapping"),
+    ([150, 250, 0, 0, 260, 1], "self_overlapping"),
+]
+
+
+def test_known_rows():
+    """Known bad rows must get their status."""
+    assert [STATUSES[k] for k in classify([row for row, _ in ROWS]).tolist()] == [status for _, status in ROWS]
+
+
+# Gemini2.5 的 F 点让大多数示例行自相交，见 test_gemini_matches_draw_single
+@pytest.mark.parametrize("variant", [variant for variant in VARIANTS if variant != "Gemini2.5"])
+def test_fixtures_pass(variant):
+    assert not preflight(fixture_data(), variant)["problems"]
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_ok_rows_have_area(variant):
+    """Every row preflight lets through must draw an outline with positive area."""
+    rng = np.random.default_rng(3)
+    data = np.column_stack([rng.uniform(50, 300, 2000), rng.uniform(50, 300, 2000), rng.choice([0, 40], 2000),
+                            rng.choice([0, 60], 2000), rng.uniform(100, 600, 2000), rng.integers(1, 6, 2000)])
+    data = data[preflight(data.tolist(), variant)["ok"]].tolist()
+    x, y, offsets = draw_batch(data, variant)
+    for i in range(len(data)):
+        px, py = x[offsets[i]:offsets[i + 1]], y[offsets[i]:offsets[i + 1]]
+        assert abs(np.dot(px, np.roll(py, -1)) - np.dot(np.roll(px, -1), py)) > 1e-6, data[i]
+
+
+def _cross(o, p, q):
+    return (p[0] - o[0]) * (q[1] - o[1]) - (p[1] - o[1]) * (q[0] - o[0])
+
+
+def _segments_touch(p, q, r, s):
+    d1, d2, d3, d4 = _cross(r, s, p), _cross(r, s, q), _cross(p, q, r), _cross(p, q, s)
+    if d1 * d2 < 0 and d3 * d4 < 0:
+        return True
+
+    def on(u, v, w):
+        return (abs(_cross(u, v, w)) < 1e-9 and min(u[0], v[0]) - 1e-9 <= w[0] <= max(u[0], v[0]) + 1e-9
+                and min(u[1], v[1]) - 1e-9 <= w[1] <= max(u[1], v[1]) + 1e-9)
+    return on(r, s, p) or on(r, s, q) or on(p, q, r) or on(p, q, s)
+
+
+def is_simple(points):
+    """Brute force: no two non-adjacent edges of the closed outline touch (repeated points merged first),
+    and it winds counterclockwise like every correct outline (not turned inside out)."""
+    points = [p for i, p in enumerate(points) if not np.allclose(p, points[i - 1])]
+    edges = [(points[i], points[(i + 1) % len(points)]) for i in range(len(points))]
+    for i in range(len(edges)):
+        for j in range(i + 2, len(edges) - (i == 0)):
+            if _segments_touch(*edges[i], *edges[j]):
+                return False
+    x, y = np.array(points).T
+    return len(points) >= 3 and np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y) > 0
+
+
+def test_gemini_matches_draw_single():
+    """Gemini2.5 rows are ok exactly when Gemini2.5.draw_single draws a simple polygon."""
+    draw_single = load_script("Gemini2.5").draw_single
+    rng = np.random.default_rng(7)
+    data = np.column_stack([rng.uniform(50, 300, 500), rng.uniform(50, 300, 500), rng.choice([0, 40, 120], 500),
+                            rng.choice([0, 60], 500), rng.uniform(100, 1500, 500), rng.integers(1, 6, 500)])
+    data = fixture_data() + data.tolist()
+    status = classify(data, "Gemini2.5").tolist()
+    assert STATUSES.index("self_overlapping") in status and 0 in status
+    for row, code in zip(data, status):
+        assert (code == 0) == is_simple(draw_single(*row[:5], int(row[5]))), row
+
+
+def test_abort():
+    with pytest.raises(ValueError, match="第 2 行"):
+        preflight([row for row, _ in ROWS], policy="abort")
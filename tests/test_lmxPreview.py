@@ -0,0 +1,44 @@
+import io
+import xml.etree.ElementTree as ElementTree
+
+import numpy as np
+import pytest
+
+from lmxBatch import VARIANTS, draw_batch
+from lmxPreflight import preflight
+from lmxPreview import PreviewCache, _error_svg, previews
+from lmxScripts import fixture_data
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_svg(variant):
+    """Thumbnails must hold each row's vertices inside the square; bad rows get a placeholder, repeats hit the cache."""
+    data = fixture_data()
+    # Gemini2.5 的示例行多数自相交，只画能通过预检的
+    data = [data[i] for i in preflight(data, variant)["ok"]]
+    size = 100
+    x, y, offsets = draw_batch(data, variant)
+    cache = PreviewCache()
+    images = previews(data + [[1, 2, 3, 4, -5, 3]], variant, "svg", size, cache)
+    for i, image in enumerate(images[:-1]):
+        polygon = ElementTree.fromstring(image).find("{*}polygon").get("points")
+        points = np.array([p.split(",") for p in polygon.split()], dtype=float)
+        assert len(points) == offsets[i + 1] - offsets[i], f"第 {i + 1} 行的顶点个数"
+        assert points.min() >= 0 and points.max() <= size, f"第 {i + 1} 行超出缩略图"
+    assert ElementTree.fromstring(images[-1]).find("{*}title") is not None
+    assert previews(data, variant, "svg", size, cache) == images[:-1]
+    assert cache.hits == len(data)
+
+
+def test_error_svg_escapes_reason():
+    title = ElementTree.fromstring(_error_svg(100, '<b>"a" & b</b>')).find("{*}title")
+    assert title.text == '<b>"a" & b</b>'
+
+
+def test_png():
+    Image = pytest.importorskip("PIL.Image")
+    data = fixture_data()
+    images = previews(data + [[0, 2, 3, 4, 5, 3]], "multiLmx", "png", 64, workers=2)
+    for png in images:
+        image = Image.open(io.BytesIO(png))
+        assert image.format == "PNG" and image.size == (64, 64)
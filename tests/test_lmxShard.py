@@ -0,0 +1,55 @@
+import json
+
+import ezdxf
+import numpy as np
+import pytest
+
+from lmxPreflight import preflight
+from lmxScripts import fixture_data, load_script
+from lmxShard import draw_sharded
+
+
+def polyline_boxes(filename):
+    boxes = []
+    for polyline in ezdxf.readfile(filename).modelspace().query("LWPOLYLINE"):
+        xy = np.array(polyline.get_points("xy"))
+        boxes.append((*xy.min(axis=0), *xy.max(axis=0)))
+    return boxes
+
+
+def test_merged_shards(tmp_path):
+    """Merged shards must hold the same polylines as the single-process drawing and pass the ezdxf audit."""
+    fixtures = fixture_data()
+    data = [fixtures[i % len(fixtures)][:5] + [10] for i in range(250)]
+    single = str(tmp_path / "single.dxf")
+    merged = str(tmp_path / "merged.dxf")
+    load_script("multi-super").draw_all_in_one(data, single, use_blocks=False, light_dims=True)
+    draw_sharded(data, merged, shard_size=64, workers=2, light_dims=True)
+    auditor = ezdxf.readfile(merged).audit()
+    assert not auditor.has_errors, f"合并的分片: ezdxf 审核发现错误 {auditor.errors}"
+    assert np.allclose(polyline_boxes(single), polyline_boxes(merged))
+
+
+@pytest.mark.parametrize("script", ["multi-super", "Gemini2.5"])
+def test_skip_keeps_row_numbers(tmp_path, script):
+    """Skipped rows leave gaps in the labels and the shard index, like lmxStream."""
+    data = [[181, 217.5, 120, 50, 240, 5], [181, 217.5, 120, 50, -240, 5], [181, 217.5, 120, 50, 240, 5],
+            [181, 217.5, 120, 50, 240, 0], [190, 230, 110, 50, 260, 3]]
+    options = {"light_dims": True} if script == "multi-super" else {}
+    merged = str(tmp_path / "merged.dxf")
+    draw_sharded(data, merged, script, shard_size=2, workers=2, policy="skip", **options)
+    labels = [e.dxf.text for e in ezdxf.readfile(merged).modelspace().query("TEXT")]
+    assert labels == ["1号", "3号", "5号"]
+    index = draw_sharded(data, str(tmp_path / "kept.dxf"), script, shard_size=2, workers=2, merge=False,
+                         policy="skip", **options)
+    with open(index, encoding="utf-8") as f:
+        shards = json.load(f)["shards"]
+    assert [(shard["first"], shard["last"]) for shard in shards] == [(1, 3), (5, 5)]
+
+
+def test_gemini_preflight(tmp_path):
+    """Gemini2.5 rows are checked with its own F point: a row fine for lmx.py but crossing itself is refused."""
+    row = [150, 250, 30, 60, 260, 3]
+    assert not preflight([row], "lmx")["problems"]
+    with pytest.raises(ValueError, match="F-A"):
+        draw_sharded([row], str(tmp_path / "gemini.dxf"), "Gemini2.5")
@@ -0,0 +1,28 @@
+import json
+
+import ezdxf
+import pytest
+
+from lmxScripts import fixture_data
+from lmxStream import read_rows, stream_dxf
+
+
+def test_stream(tmp_path):
+    """Bad rows are skipped and the rest are read back as polylines, from a .json parameter file."""
+    data = fixture_data() + [[0, 250, 30, 60, 260, 3]]
+    rows = tmp_path / "rows.json"
+    rows.write_text(json.dumps(data), encoding="utf-8")
+    output = str(tmp_path / "out.dxf")
+    assert stream_dxf(read_rows(str(rows)), output, chunk_size=5) == (len(data) - 1, 1)
+    assert len(ezdxf.readfile(output).modelspace().query("LWPOLYLINE")) == len(data) - 1
+
+
+def test_abort_keeps_previous_output(tmp_path):
+    """An aborted run must neither touch the previous output nor leave its temp file behind."""
+    output = tmp_path / "out.dxf"
+    output.write_text("previous", encoding="ascii")
+    data = fixture_data() * 3 + [[0, 250, 30, 60, 260, 3]]
+    with pytest.raises(ValueError):
+        stream_dxf(data, str(output), chunk_size=5, policy="abort")
+    assert output.read_text(encoding="ascii") == "previous"
+    assert [path.name for path in tmp_path.iterdir()] == ["out.dxf"]
@@ -0,0 +1,80 @@
+import sys
+import time
+
+import pytest
+
+import lmxTiming
+from lmxScripts import SCRIPTS, fixture_data, load_script, loaded_scripts
+
+
+def wrapped_attributes():
+    """Every (owner, attribute) that enable() may wrap, with its current value."""
+    owners = []
+    for name, methods in lmxTiming._METHODS.items():
+        for module_name, class_name, attributes in methods:
+            owner = getattr(__import__(module_name, fromlist=[class_name]), class_name)
+            owners.extend((owner, attribute) for attribute in attributes)
+    modules = [module for module_name, module in list(sys.modules.items())
+               if module is not None and module_name.startswith("lmx")]
+    for module in modules + list(loaded_scripts().values()):
+        for functions in lmxTiming._FUNCTIONS.values():
+            owners.extend((module, attribute) for attribute in functions if hasattr(module, attribute))
+    return {(owner, attribute): getattr(owner, attribute) for owner, attribute in owners}
+
+
+def test_disable_restores_everything():
+    for name in SCRIPTS:
+        load_script(name)
+    before = wrapped_attributes()
+    lmxTiming.enable()
+    try:
+        during = wrapped_attributes()
+        changed = [key for key in before if during[key] is not before[key]]
+        assert changed and all(during[key].lmx_timing_original is before[key] for key in changed)
+        with pytest.raises(ValueError, match="已经启用"):
+            lmxTiming.enable()
+    finally:
+        lmxTiming.disable()
+    after = wrapped_attributes()
+    assert all(after[key] is before[key] for key in before)
+    assert not lmxTiming._patched
+
+
+def test_failed_enable_restores(monkeypatch):
+    before = wrapped_attributes()
+    original = lmxTiming._patch_all
+
+    def failing():
+        original()
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(lmxTiming, "_patch_all", failing)
+    with pytest.raises(RuntimeError):
+        lmxTiming.enable()
+    after = wrapped_attributes()
+    assert all(after[key] is before[key] for key in before)
+    # 失败之后可以重新启用
+    monkeypatch.setattr(lmxTiming, "_patch_all", original)
+    lmxTiming.enable()
+    lmxTiming.disable()
+
+
+def test_self_times_add_up(tmp_path):
+    """Self times plus "other" make the wall time, and the wall time is the time inside timed()."""
+    module = load_script("multi-super")
+    data = fixture_data()
+    start = time.perf_counter()
+    with lmxTiming.timed():
+        module.draw_all_in_one(data, str(tmp_path / "out.dxf"))
+    outside = time.perf_counter() - start
+    records = lmxTiming.timings()
+    other = records[-1]
+    assert other["stage"] == "other" and other["self_seconds"] >= 0
+    assert sum(item["self_seconds"] for item in records) == pytest.approx(other["seconds"], abs=1e-9)
+    assert 0 < other["seconds"] <= outside
+    stages = {item["stage"]: item for item in records[:-1]}
+    assert {"geometry", "dimensions", "entities", "save"} <= set(stages)
+    for item in stages.values():
+        assert 0 <= item["self_seconds"] <= item["seconds"] + 1e-9 and item["calls"] > 0
+    # 阶段互相嵌套，外层的总时间包含内层，但自身时间之和不超过墙钟时间
+    assert sum(item["self_seconds"] for item in stages.values()) <= other["seconds"]
@@ -0,0 +1,68 @@
+import io
+import json
+import threading
+import urllib.error
+import urllib.request
+import zipfile
+
+import ezdxf
+import pytest
+
+import server
+from lmxCosting import cutting_list
+from lmxPreview import previews
+from lmxScripts import fixture_data
+
+
+@pytest.fixture(scope="module")
+def url():
+    """A real server on a free port with one worker process."""
+    httpd = server.make_server(port=0, workers=1, quiet=True)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+    server.Handler.pool.shutdown()
+
+
+def post(url, data):
+    request = urllib.request.Request(url, json.dumps(data).encode("utf-8"), {"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return response.headers, response.read()
+
+
+def test_generate(url):
+    data = fixture_data()
+    headers, body = post(url + "/generate", data)
+    assert headers["Content-Type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.namelist() == [f"lmx{i + 1}.dxf" for i in range(len(data))]
+        doc = ezdxf.read(io.StringIO(archive.read("lmx1.dxf").decode("utf-8")))
+    assert len(doc.modelspace().query("LWPOLYLINE")) == 1
+
+    headers, body = post(url + "/generate?mode=dxf&variant=multi-super&sheet=1", data)
+    assert 'filename="lmx.dxf"' in headers["Content-Disposition"]
+    doc = ezdxf.read(io.StringIO(body.decode("utf-8")))
+    assert len(doc.modelspace().query("LWPOLYLINE")) == len(data)
+
+
+def test_quote_and_preview(url):
+    data = fixture_data()
+    _, body = post(url + "/quote?variant=multi-super&thickness=12", data)
+    assert json.loads(body) == json.loads(json.dumps(cutting_list(data, "multi-super", 12.0)))
+    _, body = post(url + "/preview?size=80", data + [[1, 2, 3, 4, -5, 3]])
+    assert json.loads(body)["previews"] == previews(data + [[1, 2, 3, 4, -5, 3]], "multiLmx", "svg", 80)
+
+
+@pytest.mark.parametrize("path, data, message", [
+    ("/generate?variant=nope", [[150, 250, 30, 60, 260, 3]], "未知的 variant"),
+    ("/generate", [[150, 250, 30, 60, -260, 3]], "第 1 行"),
+    ("/quote?thickness=x", [[150, 250, 30, 60, 260, 3]], "thickness"),
+    ("/preview", [[150, 250, 30]], "6 个数字"),
+])
+def test_bad_requests(url, path, data, message):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        post(url + path, data)
+    assert error.value.code == 400
+    assert message in json.loads(error.value.read())["error"]
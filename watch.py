@@ -0,0 +1,68 @@
+"""Watch mode: regenerates DXF files whenever a JSON parameter file is saved.
+
+    python watch.py rows.json                          # multiLmx, 输出到 dxf/
+    python watch.py rows.json --script 数据录入 --output out --backend raw
+
+rows.json holds the array the HTML forms produce, [[a, b, c, d, h, n], ...].
+The process stays resident with ezdxf imported; on every save only the rows
+that changed are regenerated (see lmxManifest). Stop with Ctrl+C.
+"""
+import argparse
+import os
+import time
+
+from lmxScripts import load_script
+from lmxStream import read_rows
+
+# 有 draw_multiple(data, output_dir, backend=...) 的脚本
+SCRIPTS = ("multiLmx", "数据录入", "deepseek-multi")
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        # 编辑器保存时可能先删后写
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def watch(path, script="multiLmx", output_dir="dxf", backend="ezdxf", interval=0.05):
+    """Polls path every interval seconds and calls the script's draw_multiple after each change."""
+    draw_multiple = load_script(script).draw_multiple
+    last = None
+    print(f"正在监视 {path}，输出到 {output_dir} (Ctrl+C 退出)")
+    while True:
+        signature = _signature(path)
+        if signature is not None and signature != last:
+            last = signature
+            t0 = time.perf_counter()
+            try:
+                data = list(read_rows(path))
+                draw_multiple(data, output_dir, backend=backend)
+            except (OSError, ValueError, TypeError) as e:
+                # 保存到一半或数据有误时不退出，等下一次保存
+                print(f"[{time.strftime('%H:%M:%S')}] 生成失败: {e}")
+            else:
+                # 哪些行要重画由 draw_multiple 对比输出目录里的清单决定
+                ms = (time.perf_counter() - t0) * 1000
+                print(f"[{time.strftime('%H:%M:%S')}] {len(data)} 行已更新 ({ms:.0f} ms)")
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="监视参数 JSON 文件并增量生成 DXF")
+    parser.add_argument("input", help="参数 JSON 文件")
+    parser.add_argument("--script", default="multiLmx", choices=SCRIPTS)
+    parser.add_argument("--output", default="dxf")
+    parser.add_argument("--backend", default="ezdxf", choices=("ezdxf", "raw"))
+    parser.add_argument("--interval", type=float, default=0.05, help="检查间隔，秒")
+    args = parser.parse_args()
+    try:
+        watch(args.input, args.script, args.output, args.backend, args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
 import os
 import shutil
 import math
+import time
 import ezdxf
 
+from lmxManifest import prepare_incremental, save_manifest
+from lmxParallel import draw_multiple_parallel
+from lmxPreflight import preflight
+from lmxProfile import profiles_from_batch
+from rawDxf import save_profiles
+
 
 def draw_single(a, b, c, d, h, n):
     # 调整顶点个数
@@ -50,30 +57,60 @@ def draw_single(a, b, c, d, h, n):
     return points
 
 
-def draw_multiple(data, output_dir="dxf"):
+def draw_multiple(data, output_dir="dxf", workers=None, chunk_size=64, backend="ezdxf", cache=None):
     """Draws multiple shapes, saving each to a separate DXF file in a specified directory.
-       Clears the directory before saving.
+       Only rows whose parameters changed since the last run are regenerated; files of
+       rows that no longer exist are removed (see lmxManifest).
+       Returns the manifest of the rows written: one dict per row with its index, path,
+       write time in seconds and pid (None for cache hits), sorted by index.
+       With workers set, rows are written on a process pool of that many workers
+       in chunks of chunk_size.
+       backend="raw" streams the files with rawDxf instead of building ezdxf documents.
+       With an lmxCache.LmxCache as cache, rows seen before are copied from the cache.
+       Rows that lmxPreflight rejects raise ValueError before any file is written.
     """
-    # Create the output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Clear the contents of the output directory
-    for filename in os.listdir(output_dir):
-        file_path = os.path.join(output_dir, filename)
-        try:
-            if os.path.isfile(file_path):  # Only delete files, not directories
-                os.remove(file_path)
-        except Exception as e:
-            print(f"Error deleting file {file_path}: {e}")
-
-    for i, (a, b, c, d, h, n) in enumerate(data):
-        doc = ezdxf.new()
-        msp = doc.modelspace()
-        points = draw_single(a, b, c, d, h, n)
-        msp.add_lwpolyline(points, close=True)
+    # 有问题的行(a、b 为 0 等)在写任何文件之前就报错
+    preflight(data, "数据录入", "abort")
+    entries, todo = prepare_incremental(output_dir, data, "数据录入", backend, lambda i: f"lmx{i + 1}.dxf")
+
+    if workers:
+        manifest = draw_multiple_parallel(data, output_dir, "数据录入", workers, chunk_size, backend, cache,
+                                          indices=todo)
+        save_manifest(output_dir, entries)
+        return manifest
+
+    if cache is None:
+        profiles = profiles_from_batch([data[i] for i in todo], "数据录入")
+
+    # 与进程池模式相同的清单
+    manifest = []
+    for k, i in enumerate(todo):
+        row = tuple(data[i])
         filename = os.path.join(output_dir, f"lmx{i + 1}.dxf")
+        t0 = time.perf_counter()
+        if cache is not None:
+            if cache.fetch_dxf(row, "数据录入", backend, filename):
+                manifest.append({"index": i + 1, "path": filename, "seconds": time.perf_counter() - t0, "pid": None})
+                continue
+            profile = cache.profile(row, "数据录入")
+        else:
+            profile = profiles[k]
+
+        if backend == "raw":
+            save_profiles(filename, [profile])
+        else:
+            doc = ezdxf.new()
+            msp = doc.modelspace()
+            profile.add_to(msp)
+
+            doc.saveas(filename)
+
+        if cache is not None:
+            cache.store_dxf(row, "数据录入", backend, filename)
+        manifest.append({"index": i + 1, "path": filename, "seconds": time.perf_counter() - t0, "pid": os.getpid()})
 
-        doc.saveas(filename)
+    save_manifest(output_dir, entries)
+    return manifest
 
 
 # a 步高
@@ -150,4 +187,5 @@ data = [
   ]
 ]
 
-draw_multiple(data)
+if __name__ == '__main__':
+    draw_multiple(data)